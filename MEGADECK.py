@@ -1,12 +1,14 @@
 import sys
 import os
-import csv
 import json
 import hashlib
 import genanki
-import re
-import random
-from collections import Counter
+
+import media_manifest
+import apkg_writer
+import vocab_store
+import lexicon
+import kana
 
 # ==========================================
 # CONFIGURATION
@@ -16,29 +18,6 @@ CSV_FOLDER = "react-anime/public/csv"
 MEDIA_ROOT = "react-anime/public/anki/media"
 OUTPUT_PATH = "react-anime/public/anki"
 
-# Your Master Fixes
-MISTRANSLATION_FIXES = {
-    'ッ': {'reading': 'ッ', 'meaning': '(Emphasis marker / Glottal stop)'},
-    'メ': {'reading': 'め', 'meaning': 'Part of "Dame" (No) or part of a word'},
-    'リ': {'reading': 'り', 'meaning': '(Stuttering sound / Part of a name)'},
-    '・': {'reading': '・', 'meaning': '(Punctuation / Name separator)'},
-    'ねえ': {'reading': 'ねえ', 'meaning': 'Hey / Look / (Seeking agreement) / No (Slang "nai")'},
-    '奴': {'reading': 'やつ', 'meaning': 'Guy / Person / That thing / Fellow'},
-    'てる': {'reading': 'てる', 'meaning': 'is... -ing (Contraction of te-iru)'},
-    'いえ': {'reading': 'いえ', 'meaning': 'No / Not at all (Polite interjection)'},
-    '前': {'reading': 'まえ', 'meaning': 'Before / Front / Previous'},
-    '僕': {'reading': 'ぼく', 'meaning': 'I / Me (Male pronoun)'},
-    '様': {'reading': 'さま', 'meaning': 'Sama (Honorific suffix)'},
-    '人': {'reading': 'ひと', 'meaning': 'Person / People'},
-    '分': {'reading': 'ぶん', 'meaning': 'Part / Portion / Share / Amount'},
-    '決闘': {'reading': 'けっとう', 'meaning': 'Duel (Card Games)'},
-    '召喚': {'reading': 'しょうかん', 'meaning': 'Summon / Summoning'},
-    '術': {'reading': 'じゅつ', 'meaning': 'Jutsu / Ninja Technique'},
-    '喪女': {'reading': 'もじょ', 'meaning': 'Mojo (Unpopular woman slang)'},
-    'おっふ': {'reading': 'おっふ', 'meaning': 'Offu! (Awestruck sound)'},
-    '部長': {'reading': 'ぶちょう', 'meaning': 'Club President (School Context)'},
-}
-
 
 def generate_id(name, salt=0):
     hash_obj = hashlib.sha256((name + str(salt)).encode())
@@ -126,131 +105,243 @@ vocab_model = genanki.Model(
 # ==========================================
 # DATA PROCESSING
 # ==========================================
-word_entries = {}  # Key: Expression, Value: List of ALL rows found
-total_counts = Counter()
-word_shows = {}
-media_files = []
-media_path_map = {}  # Maps filename (e.g., 'img.jpg') to full path
-
-print("Mapping media files (Images & Audio)...")
-# We now scan for MP3s as well
-allowed_exts = ('.jpg', '.jpeg', '.png', '.webp', '.mp3')
-for root, dirs, files in os.walk(MEDIA_ROOT):
-    for f in files:
-        if f.lower().endswith(allowed_exts):
-            media_path_map[f] = os.path.join(root, f)
-
-print("Scanning CSVs...")
-for filename in os.listdir(CSV_FOLDER):
-    if filename.endswith("_Vocabulary_Full.csv"):
-        show = filename.replace("_Vocabulary_Full.csv", "")
-        with open(os.path.join(CSV_FOLDER, filename), 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                expr = row['Expression']
-                freq = int(row.get('Frequency', 1))
-                total_counts[expr] += freq
-
-                if expr not in word_shows: word_shows[expr] = set()
-                word_shows[expr].add(show)
+# Each show's vocab store (vocab_store.py) is folded once into a compact
+# per-word summary, cached in SUMMARY_DIR and keyed by the CSV's content hash.
+# A rebuild only re-reads the shows whose CSV changed and merges the cached
+# summaries for the rest.
+# Media is resolved through the manifest main.py maintains (media_manifest.py);
+# MEDIA_ROOT is only walked when a referenced file has no manifest entry.
+
+SUMMARY_DIR = "cache/mega"
+SUMMARY_VERSION = 3  # bump when the summary layout or ranking changes
+
+# Media quality tiers, best first
+TIER_PERFECT, TIER_IMAGE, TIER_AUDIO, TIER_TEXT = range(4)
+
+# Only the fields the deck needs are kept for a candidate row
+CANDIDATE_FIELDS = ['Reading', 'Meaning', 'Level', 'Sentence', 'Translation', 'Image', 'WordAudio',
+                    'SentenceAudio']
+
+# Summary / accumulator slots
+SUM_COUNT, SUM_RANK, SUM_CANDIDATE = range(3)
+
+# CSV header -> vocab store column (vocab_store.py)
+STORE_COLUMNS = dict(vocab_store.TEXT_COLUMNS, Frequency='frequency')
+ACC_COUNT, ACC_SHOWS, ACC_RANK, ACC_CANDIDATE = range(4)
+
+
+def media_tier(row):
+    has_image = bool(row.get('Image')) and '<img' in row['Image']
+    has_audio = bool(row.get('WordAudio')) and '[sound:' in row['WordAudio']
+    if has_image and has_audio:
+        return TIER_PERFECT
+    if has_image:
+        return TIER_IMAGE
+    if has_audio:
+        return TIER_AUDIO
+    return TIER_TEXT
+
+
+def candidate_rank(row, show):
+    """
+    Sort key for picking a word's example row, lower is better:
+    media tier, then sentence audio, then a usable translation, then how often
+    the word appears in that show. The last element is a hash of show + sentence,
+    so ties always resolve the same way no matter which order CSVs are read in.
+    """
+    translation = row.get('Translation', '')
+    return [
+        media_tier(row),
+        0 if '[sound:' in (row.get('SentenceAudio') or '') else 1,
+        1 if not translation or translation.startswith('[') else 0,  # [Translation Failed] / [Unavailable]
+        -int(row.get('Frequency', 1)),
+        hashlib.sha256(f"{show}\0{row.get('Sentence', '')}".encode('utf-8')).hexdigest()[:16],
+    ]
 
-                # IMPORTANT: Inject the specific show name into the row data
-                # This allows us to say "Source: Naruto" later
-                row['_source_show_name'] = show
 
-                if expr not in word_entries:
-                    word_entries[expr] = []
-                word_entries[expr].append(row)
+def summarize_show(show):
+    """
+    Folds one show's vocab store into {expression: [frequency, candidate rank, candidate]},
+    keeping only the best-ranked row per word (see candidate_rank).
+    """
+    headers = ['Expression', 'Frequency'] + CANDIDATE_FIELDS
+    data = vocab_store.load_show(show, [STORE_COLUMNS[header] for header in headers], CSV_FOLDER)
+    words = {}
+    for values in zip(*(data[STORE_COLUMNS[header]].tolist() for header in headers)):
+        row = dict(zip(headers, values))
+        entry = words.get(row['Expression'])
+        if entry is None:
+            entry = words[row['Expression']] = [0, None, None]
+        entry[SUM_COUNT] += row['Frequency']
+
+        rank = candidate_rank(row, show)
+        if entry[SUM_RANK] is None or rank < entry[SUM_RANK]:
+            entry[SUM_RANK] = rank
+            entry[SUM_CANDIDATE] = [row[field] for field in CANDIDATE_FIELDS]
+
+    # Pull the media filenames out of the kept rows once, at summary time
+    for entry in words.values():
+        candidate = entry[SUM_CANDIDATE]
+        candidate.append([media_manifest.media_filename(candidate[CANDIDATE_FIELDS.index(field)])
+                          for field in ('Image', 'WordAudio', 'SentenceAudio')])
+    return words
+
+
+def load_summary(csv_path, show):
+    """Returns (summary, rebuilt). Cached summaries are reused while the CSV content is unchanged."""
+    summary_path = os.path.join(SUMMARY_DIR, f"{show}.json")
+    st = os.stat(csv_path)
+    sig = [st.st_size, st.st_mtime_ns]
+    cached = None
+    if os.path.exists(summary_path):
+        with open(summary_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('version') != SUMMARY_VERSION:
+            cached = None
+        elif cached['sig'] == sig:
+            return cached, False
+
+    with open(csv_path, 'rb') as f:
+        csv_hash = hashlib.sha256(f.read()).hexdigest()
+    if cached and cached['csv_hash'] == csv_hash:
+        rebuilt = False  # touched but not changed
+        cached['sig'] = sig
+        summary = cached
+    else:
+        rebuilt = True
+        summary = {'version': SUMMARY_VERSION, 'csv_hash': csv_hash, 'sig': sig,
+                   'words': summarize_show(show)}
+
+    os.makedirs(SUMMARY_DIR, exist_ok=True)
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False)
+    return summary, rebuilt
+
+
+def merge_summary(acc, summary_words, show):
+    """Folds a show summary into the mega accumulator; the best-ranked candidate across shows wins."""
+    for expr, (count, rank, candidate) in summary_words.items():
+        entry = acc.get(expr)
+        if entry is None:
+            entry = acc[expr] = [0, set(), None, None]
+        entry[ACC_COUNT] += count
+        entry[ACC_SHOWS].add(show)
+        if entry[ACC_RANK] is None or rank < entry[ACC_RANK]:
+            entry[ACC_RANK] = rank
+            # IMPORTANT: keep the specific show name with the candidate
+            # This allows us to say "Source: Naruto" later
+            entry[ACC_CANDIDATE] = candidate + [show]
+
+
+print("Loading media manifest...")
+manifest = media_manifest.load_manifest()
+if not manifest:
+    print(f"No media manifest yet. Indexing {MEDIA_ROOT} once (main.py keeps it updated from now on)...")
+    manifest = media_manifest.rebuild_manifest(MEDIA_ROOT, shows=vocab_store.list_shows(CSV_FOLDER))
+    media_manifest.save_manifest(manifest)
+
+
+def resolve_media(show, filename):
+    """Manifest entry for a media file referenced by `show`, or None if it was never written / is gone."""
+    entry = media_manifest.lookup(manifest, show, filename) if filename else None
+    if entry and os.path.exists(entry['path']):
+        return entry
+    return None
+
+
+print("Loading per-show summaries...")
+word_acc = {}  # Key: Expression, Value: [total frequency, shows, candidate rank, candidate]
+csv_hashes = []
+rebuilt_shows = 0
+for filename in sorted(os.listdir(CSV_FOLDER)):
+    if filename.endswith("_Vocabulary_Full.csv"):
+        show = filename.replace("_Vocabulary_Full.csv", "")
+        summary, rebuilt = load_summary(os.path.join(CSV_FOLDER, filename), show)
+        rebuilt_shows += rebuilt
+        csv_hashes.append([show, summary['csv_hash']])
+        merge_summary(word_acc, summary['words'], show)
+print(f"Re-read {rebuilt_shows} changed CSVs, reused {len(csv_hashes) - rebuilt_shows} cached summaries.")
+
+# Shows built before main.py recorded its media have files on disk but no manifest
+# entries: if any referenced file is unresolved, index MEDIA_ROOT into the manifest
+# (only new or changed files are hashed) instead of dropping their media.
+unresolved = {(source_show, name) for entry in word_acc.values()
+              for source_show in [entry[ACC_CANDIDATE][-1]]
+              for name in entry[ACC_CANDIDATE][len(CANDIDATE_FIELDS)]
+              if name and resolve_media(source_show, name) is None}
+if unresolved:
+    print(f"{len(unresolved)} referenced media files missing from the manifest. Indexing {MEDIA_ROOT}...")
+    manifest = media_manifest.rebuild_manifest(MEDIA_ROOT, manifest, [show for show, csv_hash in csv_hashes])
+    media_manifest.save_manifest(manifest)
+    print(f"  {sum(resolve_media(show, name) is None for show, name in unresolved)} still missing on disk.")
 
 # ==========================================
 # DECK GENERATION
 # ==========================================
-mega_deck = genanki.Deck(DECK_ID_VOCAB, show_name)
-
-print(f"Building deck with {len(total_counts)} unique words...")
-for word, count in total_counts.most_common():
-    all_possible_rows = word_entries[word]
-
-    # SELECTION LOGIC: Find the "Perfect" Card
-    # Priority 1: Has Image AND Audio
-    # Priority 2: Has Image
-    # Priority 3: Has Audio
-    # Priority 4: Random
-
-    perfect_rows = [r for r in all_possible_rows if
-                    (r.get('Image') and '<img' in r['Image']) and (r.get('WordAudio') and '[sound:' in r['WordAudio'])]
-    image_rows = [r for r in all_possible_rows if r.get('Image') and '<img' in r['Image']]
-    audio_rows = [r for r in all_possible_rows if r.get('WordAudio') and '[sound:' in r['WordAudio']]
-
-    if perfect_rows:
-        chosen_row = random.choice(perfect_rows)
-    elif image_rows:
-        chosen_row = random.choice(image_rows)
-    elif audio_rows:
-        chosen_row = random.choice(audio_rows)
-    else:
-        chosen_row = random.choice(all_possible_rows)
-
-    # Reading and Meaning (Use chosen_row but allow manual overrides)
-    reading = chosen_row['Reading']
-    meaning = chosen_row['Meaning']
-    if word in MISTRANSLATION_FIXES:
-        reading = MISTRANSLATION_FIXES[word]['reading']
-        meaning = MISTRANSLATION_FIXES[word]['meaning']
-
-
-    # --- HELPER: Extract Media Function ---
-    def extract_media(tag):
-        """Finds [sound:...] or src="..." and adds to package list"""
-        if not tag: return ""
-        # Check for Image src
-        img_match = re.search(r'src="([^"]+)"', tag)
-        if img_match:
-            fname = img_match.group(1)
-            if fname in media_path_map:
-                media_files.append(media_path_map[fname])
-                return tag  # Return original tag if valid
-
-        # Check for Audio sound tag
-        aud_match = re.search(r'\[sound:([^\]]+)\]', tag)
-        if aud_match:
-            fname = aud_match.group(1)
-            if fname in media_path_map:
-                media_files.append(media_path_map[fname])
-                return tag
-        return ""
-
-
-    # Process Media Fields
-    final_img_tag = extract_media(chosen_row.get('Image', ''))
-    final_word_audio = extract_media(chosen_row.get('WordAudio', ''))
-    final_sent_audio = extract_media(chosen_row.get('SentenceAudio', ''))
-
-    # Get the specific show for this sentence
-    source_show = chosen_row.get('_source_show_name', 'Unknown')
+notes_data = []
+media_entries = {}
+
+print(f"Building deck with {len(word_acc)} unique words...")
+# Most frequent first (stable for ties, like Counter.most_common)
+for word, entry in sorted(word_acc.items(), key=lambda item: -item[1][ACC_COUNT]):
+    count = entry[ACC_COUNT]
+    reading, meaning, level, sentence, translation, image, word_audio, sentence_audio, media_names, source_show = \
+        entry[ACC_CANDIDATE]
+
+    # Reading and Meaning (Use the chosen candidate but allow manual overrides, shared with main.py)
+    fix_meaning, fix_reading, fix_source, _ = lexicon.lookup(word)
+    if fix_source == lexicon.MANUAL_FIX:
+        reading, meaning = fix_reading, fix_meaning
+    # Furigana in hiragana whichever show the reading came from (Sudachi readings are katakana)
+    if kana.is_katakana(reading) and not kana.is_katakana(word):
+        reading = kana.to_hiragana(reading)
+
+    # Process Media Fields: keep a tag only if its file exists
+    media_tags = []
+    for tag, filename in zip((image, word_audio, sentence_audio), media_names):
+        media_entry = resolve_media(source_show, filename)
+        if media_entry:
+            media_entries[media_entry['path']] = media_entry['sha256']
+        media_tags.append(tag if media_entry else "")
 
     # Assembly
-    fields_data = [
+    notes_data.append([
         word,
         reading,
         meaning,
-        chosen_row.get('Level', 'Unlabeled'),
+        level,
         str(count),
-        chosen_row['Sentence'],
-        chosen_row['Translation'],
-        ", ".join(sorted(list(word_shows[word]))),  # List of ALL shows
-        final_img_tag,
-        final_word_audio,
-        final_sent_audio,
+        sentence,
+        translation,
+        ", ".join(sorted(entry[ACC_SHOWS])),  # List of ALL shows
+        *media_tags,
         source_show  # The specific show for this sentence
-    ]
-    mega_deck.add_note(genanki.Note(model=vocab_model, fields=fields_data))
+    ])
 
-# Export
 os.makedirs(OUTPUT_PATH, exist_ok=True)
 out_file = os.path.join(OUTPUT_PATH, 'Anime_Mega_Deck.apkg')
+build_state_file = os.path.join(SUMMARY_DIR, "_build.json")
+build_fp = hashlib.sha256(json.dumps(
+    [notes_data, sorted(media_entries.items()), style_vocab, fields, vocab_model.name], ensure_ascii=False
+).encode('utf-8')).hexdigest()
+if os.path.exists(out_file) and os.path.exists(build_state_file):
+    with open(build_state_file, 'r', encoding='utf-8') as f:
+        if json.load(f).get('fingerprint') == build_fp:
+            print(f"Nothing changed since the last build. {out_file} is up to date.")
+            sys.exit(0)
+
+mega_deck = genanki.Deck(DECK_ID_VOCAB, show_name)
+for fields_data in notes_data:
+    # GUID depends only on the word, so re-imports update the existing note in place
+    mega_deck.add_note(genanki.Note(model=vocab_model, fields=fields_data,
+                                    guid=genanki.guid_for(show_name, fields_data[0])))
+
+# Export
 package = genanki.Package(mega_deck)
-package.media_files = list(set(media_files))
-package.write_to_file(out_file)
+package.media_files = sorted(media_entries)
+stats = apkg_writer.write_apkg(package, out_file, media_hashes=media_entries)
+with open(build_state_file, 'w', encoding='utf-8') as f:
+    json.dump({'fingerprint': build_fp}, f)
 print(f"Export complete: {out_file}")
-print(f"Total media files packaged: {len(package.media_files)}")
\ No newline at end of file
+print(f"Total media files packaged: {len(package.media_files)}")
+print(f"Packaging: {apkg_writer.format_report(stats)}")
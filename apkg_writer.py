@@ -0,0 +1,236 @@
+import os
+import time
+import json
+import zlib
+import struct
+import sqlite3
+import tempfile
+import itertools
+
+import media_manifest
+
+# ==========================================
+# INCREMENTAL APKG WRITER
+# ==========================================
+# genanki's Package.write_to_file rewrites the whole archive on every build,
+# copying every screenshot and MP3 again even if only one note changed.
+# An .apkg is just a zip: collection.anki2 + a 'media' JSON ({"0": "file.jpg"})
+# + one entry per media file named by its index. So the archive is updated in
+# place instead:
+#
+#   [media entries ...][collection.anki2][media][central directory]
+#
+# Media entries whose source file hash is unchanged keep their bytes where they
+# are; the db, the media map and the central directory are rewritten after the
+# last kept entry, with new/changed media appended before them. Removed media
+# leave holes that are reclaimed by a full rewrite once they exceed
+# COMPACT_RATIO of the archive. Already-compressed formats are stored, not
+# deflated again.
+
+STATE_DIR = 'cache/apkg'
+COMPACT_RATIO = 0.25
+STORED_EXTS = ('.jpg', '.jpeg', '.png', '.webp', '.mp3', '.ogg', '.m4a')
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+ZIP64_LIMIT = 0xFFFFFFFF
+LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+CENTRAL_HEADER = struct.Struct('<IHHHHHHIIIHHHHHII')
+
+
+def state_path_for(apkg_path):
+    return os.path.join(STATE_DIR, os.path.basename(apkg_path) + '.json')
+
+
+def load_state(apkg_path):
+    """Previous layout of apkg_path, or None if the archive changed since we wrote it."""
+    path = state_path_for(apkg_path)
+    if not os.path.exists(path) or not os.path.exists(apkg_path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    st = os.stat(apkg_path)
+    if [st.st_size, st.st_mtime_ns] != state.get('archive'):
+        return None
+    return state
+
+
+def save_state(apkg_path, state):
+    path = state_path_for(apkg_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def dos_datetime(timestamp):
+    t = time.localtime(timestamp)
+    return (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2), \
+           ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+
+
+def write_entry(out, name, chunks, method, dostime, dosdate):
+    """Writes one local header + data at the current position. Returns the central directory record."""
+    offset = out.tell()
+    encoded = name.encode('utf-8')
+    out.write(LOCAL_HEADER.pack(0x04034b50, 20, 0, method, dostime, dosdate, 0, 0, 0, len(encoded), 0))
+    out.write(encoded)
+    crc, size, csize = 0, 0, 0
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15) if method == ZIP_DEFLATED else None
+    for chunk in chunks:
+        crc = zlib.crc32(chunk, crc)
+        size += len(chunk)
+        if compressor:
+            chunk = compressor.compress(chunk)
+        csize += len(chunk)
+        out.write(chunk)
+    if compressor:
+        tail = compressor.flush()
+        csize += len(tail)
+        out.write(tail)
+    if size >= ZIP64_LIMIT or csize >= ZIP64_LIMIT:
+        raise ValueError(f"{name} is too large for an apkg entry")
+    end = out.tell()
+    # Sizes are only known now, so patch them into the local header
+    out.seek(offset + 14)
+    out.write(struct.pack('<III', crc, csize, size))
+    out.seek(end)
+    return {'name': name, 'offset': offset, 'method': method, 'crc': crc, 'csize': csize, 'size': size,
+            'dostime': dostime, 'dosdate': dosdate, 'end': end}
+
+
+def read_file_chunks(path, chunk_size=1 << 20):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            yield chunk
+
+
+def write_central_directory(out, records):
+    start = out.tell()
+    for rec in records:
+        encoded = rec['name'].encode('utf-8')
+        offset, extra, version = rec['offset'], b'', 20
+        if offset >= ZIP64_LIMIT:
+            extra = struct.pack('<HHQ', 0x0001, 8, offset)
+            offset, version = ZIP64_LIMIT, 45
+        out.write(CENTRAL_HEADER.pack(0x02014b50, version, version, 0, rec['method'], rec['dostime'],
+                                      rec['dosdate'], rec['crc'], rec['csize'], rec['size'], len(encoded),
+                                      len(extra), 0, 0, 0, 0, offset))
+        out.write(encoded)
+        out.write(extra)
+    end = out.tell()
+    count, size = len(records), end - start
+    if start >= ZIP64_LIMIT or count >= 0xFFFF:
+        # Zip64 end of central directory record + locator
+        out.write(struct.pack('<IQHHIIQQQQ', 0x06064b50, 44, 45, 45, 0, 0, count, count, size, start))
+        out.write(struct.pack('<IIQI', 0x07064b50, 0, end, 1))
+        out.write(struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, min(count, 0xFFFF), min(count, 0xFFFF),
+                              min(size, ZIP64_LIMIT), min(start, ZIP64_LIMIT), 0))
+    else:
+        out.write(struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, count, count, size, start, 0))
+
+
+def build_collection(package, timestamp):
+    """Runs genanki's own db export and returns the collection.anki2 bytes."""
+    fd, db_path = tempfile.mkstemp(suffix='.anki2')
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(db_path)
+        package.write_to_db(conn.cursor(), timestamp, itertools.count(int(timestamp * 1000)))
+        conn.commit()
+        conn.close()
+        with open(db_path, 'rb') as f:
+            return f.read()
+    finally:
+        os.remove(db_path)
+
+
+def media_hashes_for(media_files):
+    """sha256 per media path, taken from the media manifest when the file is unchanged."""
+    manifest = media_manifest.load_manifest()
+    hashes = {}
+    for path in media_files:
+        entry = manifest.get(media_manifest.media_key(path))
+        st = os.stat(path)
+        if entry and entry['path'] == path and entry['size'] == st.st_size and entry['mtime'] == st.st_mtime_ns:
+            hashes[path] = entry['sha256']
+        else:
+            hashes[path] = media_manifest.file_sha256(path)
+    return hashes
+
+
+def write_apkg(package, apkg_path, media_hashes=None, timestamp=None):
+    """
+    Writes `package` (a genanki.Package) to apkg_path, reusing media entries of
+    the previous archive. media_hashes: {path: sha256} for package.media_files;
+    looked up in the media manifest when not given.
+    Returns build stats: seconds, bytes_written, reused, written, compacted.
+    """
+    started = time.time()
+    timestamp = time.time() if timestamp is None else timestamp
+    dostime, dosdate = dos_datetime(timestamp)
+    media_files = list(package.media_files)
+    if media_hashes is None:
+        media_hashes = media_hashes_for(media_files)
+
+    # Media names must be unique inside the archive; the first path wins (like Anki)
+    wanted = {}
+    for path in media_files:
+        wanted.setdefault(os.path.basename(path), path)
+
+    state = load_state(apkg_path)
+    old_entries = state['entries'] if state else {}
+    kept = {name: entry for name, entry in old_entries.items()
+            if name in wanted and entry['sha256'] == media_hashes[wanted[name]]}
+    kept_bytes = sum(entry['end'] - entry['offset'] for entry in kept.values())
+    media_end = state['media_end'] if state else 0
+    compacted = bool(state) and (media_end - kept_bytes) > COMPACT_RATIO * media_end
+    if not state or compacted:
+        kept, media_end = {}, 0
+
+    entries = dict(kept)
+    next_index = max((int(entry['name']) for entry in kept.values()), default=-1) + 1
+    bytes_written = 0
+    tmp_path = apkg_path + '.tmp'
+    full_rewrite = not kept
+    out = open(tmp_path if full_rewrite else apkg_path, 'wb' if full_rewrite else 'r+b')
+    with out:
+        out.seek(media_end)
+        out.truncate()
+        for filename, path in wanted.items():
+            if filename in kept:
+                continue
+            method = ZIP_STORED if filename.lower().endswith(STORED_EXTS) else ZIP_DEFLATED
+            rec = write_entry(out, str(next_index), read_file_chunks(path), method, dostime, dosdate)
+            rec['sha256'] = media_hashes[path]
+            entries[filename] = rec
+            next_index += 1
+        new_media_end = out.tell()
+        bytes_written += new_media_end - media_end
+
+        media_map = {entry['name']: filename for filename, entry in entries.items()}
+        db = write_entry(out, 'collection.anki2', [build_collection(package, timestamp)],
+                         ZIP_DEFLATED, dostime, dosdate)
+        media_json = write_entry(out, 'media', [json.dumps(media_map).encode('utf-8')],
+                                 ZIP_DEFLATED, dostime, dosdate)
+        records = sorted(entries.values(), key=lambda entry: entry['offset']) + [db, media_json]
+        write_central_directory(out, records)
+        bytes_written += out.tell() - new_media_end
+    if full_rewrite:
+        os.replace(tmp_path, apkg_path)
+
+    st = os.stat(apkg_path)
+    save_state(apkg_path, {'archive': [st.st_size, st.st_mtime_ns], 'media_end': new_media_end,
+                           'entries': entries})
+    return {'seconds': time.time() - started, 'bytes_written': bytes_written, 'archive_bytes': st.st_size,
+            'reused': len(kept), 'written': len(entries) - len(kept), 'compacted': compacted}
+
+
+def format_report(stats):
+    return (f"{stats['archive_bytes'] / 1e6:.1f} MB archive, {stats['bytes_written'] / 1e6:.1f} MB written "
+            f"in {stats['seconds']:.1f}s ({stats['reused']} media reused, {stats['written']} written"
+            f"{', compacted' if stats['compacted'] else ''})")
@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import kana
+
+# ==========================================
+# BENCHMARK: katakana -> romaji, per-call dict vs precompiled table
+# ==========================================
+# Times main.py's old kana_to_romaji (kept here as legacy_kana_to_romaji) against
+# kana.to_romaji per word and kana.romaji_column over the whole list, on random
+# katakana names. Outputs differ where the old function was wrong (シャ -> "shya",
+# hiragana left as-is), so only the plain-syllable words are compared.
+#
+# Usage: python benchmarks/bench_kana.py [words]
+
+PLAIN = 'アイウエオカキクケコサスセソタテトナニヌネノハヒヘホマミムメモヤユヨラリルレロワンガギグゲゴザズゼゾダデドバビブベボパピプペポ'
+EXTRA = ['シャ', 'チュ', 'ジョ', 'キャ', 'ッ', 'ー']
+
+
+def legacy_kana_to_romaji(text):
+    consonants = {
+        'カ': 'ka', 'キ': 'ki', 'ク': 'ku', 'ケ': 'ke', 'コ': 'ko',
+        'サ': 'sa', 'シ': 'shi', 'ス': 'su', 'セ': 'se', 'ソ': 'so',
+        'タ': 'ta', 'チ': 'chi', 'ツ': 'tsu', 'テ': 'te', 'ト': 'to',
+        'ナ': 'na', 'ニ': 'ni', 'ヌ': 'nu', 'ネ': 'ne', 'ノ': 'no',
+        'ハ': 'ha', 'ヒ': 'hi', 'フ': 'fu', 'ヘ': 'he', 'ホ': 'ho',
+        'マ': 'ma', 'ミ': 'mi', 'ム': 'mu', 'メ': 'me', 'モ': 'mo',
+        'ヤ': 'ya', 'ユ': 'yu', 'ヨ': 'yo',
+        'ラ': 'ra', 'リ': 'ri', 'ル': 'ru', 'レ': 're', 'ロ': 'ro',
+        'ワ': 'wa', 'ヲ': 'wo', 'ン': 'n',
+        'ガ': 'ga', 'ギ': 'gi', 'グ': 'gu', 'ゲ': 'ge', 'ゴ': 'go',
+        'ザ': 'za', 'ジ': 'ji', 'ズ': 'zu', 'ゼ': 'ze', 'ゾ': 'zo',
+        'ダ': 'da', 'ヂ': 'ji', 'ヅ': 'zu', 'デ': 'de', 'ド': 'do',
+        'バ': 'ba', 'ビ': 'bi', 'ブ': 'bu', 'ベ': 'be', 'ボ': 'bo',
+        'パ': 'pa', 'ピ': 'pi', 'プ': 'pu', 'ペ': 'pe', 'ポ': 'po',
+        'ア': 'a', 'イ': 'i', 'ウ': 'u', 'エ': 'e', 'オ': 'o',
+        'ー': '', '・': ' '
+    }
+    res = ""
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == 'ッ' and i + 1 < len(text):
+            next_romaji = consonants.get(text[i + 1], '')
+            if next_romaji:
+                res += next_romaji[0]
+                i += 1
+                continue
+        if i + 1 < len(text) and text[i + 1] in ['ャ', 'ュ', 'ョ']:
+            base = consonants.get(char, '')[:-1]
+            small = {'ャ': 'ya', 'ュ': 'yu', 'ョ': 'yo'}
+            res += base + small.get(text[i + 1], '')
+            i += 2
+            continue
+        res += consonants.get(char, char)
+        i += 1
+    return res.capitalize()
+
+
+def synthetic_names(n_words, seed=0):
+    rng = random.Random(seed)
+    names = []
+    for _ in range(n_words):
+        parts = [rng.choice(PLAIN) for _ in range(rng.randint(2, 5))]
+        if rng.random() < 0.5:
+            parts.insert(rng.randint(1, len(parts)), rng.choice(EXTRA))
+        names.append(''.join(parts))
+    return names
+
+
+if __name__ == "__main__":
+    n_words = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    names = synthetic_names(n_words)
+    print(f"Converting {n_words} synthetic katakana names...")
+
+    start = time.perf_counter()
+    legacy = [legacy_kana_to_romaji(name) for name in names]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    per_word = [kana.to_romaji(name).capitalize() for name in names]
+    per_word_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    column = [romaji.capitalize() for romaji in kana.romaji_column(names)]
+    column_time = time.perf_counter() - start
+
+    assert per_word == column, "romaji_column differs from to_romaji"
+    plain = [i for i, name in enumerate(names) if all(ch in PLAIN for ch in name)]
+    # The legacy function never wrote the n' separator (ンア -> na instead of n'a)
+    assert all(legacy[i] == per_word[i].replace("'", "") for i in plain), \
+        "plain syllables differ from the legacy function"
+    print(f"Legacy (per call):  {legacy_time:.2f}s  ({n_words / legacy_time:,.0f} words/s)")
+    print(f"to_romaji:          {per_word_time:.2f}s  ({n_words / per_word_time:,.0f} words/s)")
+    print(f"romaji_column:      {column_time:.2f}s  ({n_words / column_time:,.0f} words/s, "
+          f"{legacy_time / column_time:.1f}x faster)")
@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+import random
+import itertools
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import sentence_scheduler
+
+# ==========================================
+# BENCHMARK: i+1 sentence scheduler on a Naruto-sized corpus
+# ==========================================
+# Builds a synthetic corpus (220 episodes x 400 sentences, Zipf-distributed
+# vocabulary) and times sentence_scheduler.schedule for a few K. It also reports
+# how many other unknown words each card brings, next to main.py's old static
+# ordering (unknown tokens x 100 + length, one sentence per word).
+#
+# Usage: python benchmarks/bench_sentence_scheduler.py [episodes] [sentences per episode]
+
+VOCAB_SIZE = 20000
+
+
+def synthetic_corpus(n_episodes, per_episode, seed=0):
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(VOCAB_SIZE)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(VOCAB_SIZE)))
+    sentences = []
+    for _ in range(n_episodes * per_episode):
+        tokens = rng.choices(words, cum_weights=cum_weights, k=rng.randint(2, 10))
+        sentences.append((tokens, rng.randint(1, 40), rng.randint(5, 60)))
+    return sentences
+
+
+def legacy_order(sentences, words):
+    """main.py's old order: best-scored sentence per word, static complexity in frequency order."""
+    best = {}
+    for sid, (tokens, score, length) in enumerate(sentences):
+        for token in tokens:
+            if token not in best or score > sentences[best[token]][1]:
+                best[token] = sid
+    known, scored = set(), []
+    for word in words:
+        tokens, score, length = sentences[best[word]]
+        scored.append((sum(1 for t in tokens if t != word and t not in known) * 100 + length, word, best[word]))
+        known.add(word)
+    return [(word, sid) for complexity, word, sid in sorted(scored, key=lambda x: x[0])]
+
+
+def unknown_per_card(sentences, order):
+    known, costs = set(), []
+    for word, sid in order:
+        costs.append(sum(1 for t in set(sentences[sid][0]) if t != word and t not in known))
+        known.add(word)
+    return sum(costs) / len(costs), sum(1 for c in costs if c == 0) / len(costs)
+
+
+if __name__ == "__main__":
+    n_episodes = int(sys.argv[1]) if len(sys.argv) > 1 else 220
+    per_episode = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    sentences = synthetic_corpus(n_episodes, per_episode)
+    counts = Counter(token for tokens, score, length in sentences for token in tokens)
+    words = [w for w, c in counts.most_common() if c >= 2]
+    print(f"Synthetic corpus: {len(sentences)} sentences, {len(words)} words to schedule")
+
+    mean, share = unknown_per_card(sentences, legacy_order(sentences, words))
+    print(f"Legacy static order:  {mean:.2f} other unknowns/card, {share:.0%} i+1")
+    for candidates in (1, 5, 10):
+        start = time.perf_counter()
+        order = sentence_scheduler.schedule(sentences, words, candidates=candidates)
+        elapsed = time.perf_counter() - start
+        assert len(order) == len(words)
+        mean, share = unknown_per_card(sentences, order)
+        print(f"Scheduler K={candidates:<2}        {mean:.2f} other unknowns/card, {share:.0%} i+1  ({elapsed:.2f}s)")
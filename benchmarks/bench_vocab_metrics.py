@@ -0,0 +1,141 @@
+import os
+import re
+import sys
+import time
+import random
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import core_tiers
+import vocab_store
+import vocab_metrics
+
+# ==========================================
+# BENCHMARK: graphs.py metrics, row-wise vs vectorized
+# ==========================================
+# Builds a synthetic 100-show catalog and times the old per-show metric code
+# (df.apply + Python loops, kept here as legacy_show_stats) against
+# vocab_metrics.compute_show_stats. Both must produce the same stats dicts.
+#
+# Usage: python benchmarks/bench_vocab_metrics.py [shows] [words per show]
+
+LEVELS = ['N5', 'N4', 'N3', 'N2', 'N1', 'Unlabeled']
+MEANINGS = ['to eat', 'particle (possessive)', 'auxiliary verb', 'Tokyo [Proper Noun]', 'dog / hound',
+            'Copula (polite)', 'to go', 'beautiful']
+
+
+def synthetic_catalog(n_shows, words_per_show, seed=0):
+    rng = random.Random(seed)
+    kanji = [chr(c) for c in range(0x4E00, 0x4E00 + 3000)]
+    kana = [chr(c) for c in range(0x3041, 0x3094)]
+    pool = [''.join(rng.choice(kanji) for _ in range(rng.randint(1, 3))) + rng.choice(kana)
+            for _ in range(words_per_show * 4)]
+    core_sets = {tier: set(rng.sample(pool, len(pool) // 8)) for tier in vocab_metrics.CORE_TIERS}
+    shows = []
+    for i in range(n_shows):
+        words = rng.sample(pool, words_per_show)
+        shows.append({
+            'Expression': words,
+            'Reading': [rng.choice(kana) * 2 for _ in words],
+            'Meaning': [rng.choice(MEANINGS) for _ in words],
+            'Level': [rng.choice(LEVELS) for _ in words],
+            'Frequency': [max(1, int(rng.paretovariate(1.2))) for _ in words],
+        })
+    return shows, core_sets
+
+
+def legacy_show_stats(show, df, core_sets):
+    """graphs.py's metric code before vocab_metrics (trimmed to the stats dict)."""
+    def refine_level(row):
+        meaning = str(row['Meaning'])
+        if any(x in meaning for x in ["Grammar", "auxiliary", "particle", "Copula"]):
+            return "Grammar"
+        if "[Proper Noun]" in meaning:
+            return "Proper Noun"
+        return row['Level']
+
+    df['Refined_Level'] = df.apply(refine_level, axis=1)
+    total_words = df['Frequency'].sum()
+    unique_words = len(df)
+    used_once = len(df[df['Frequency'] == 1])
+    used_once_pct = (used_once / unique_words) * 100 if unique_words > 0 else 0
+
+    all_text = "".join(df['Expression'].astype(str))
+    kanji_list = re.findall(r'[一-龯]', all_text)
+    kanji_freq = Counter(kanji_list)
+    kanji_once = sum(1 for k in kanji_freq if kanji_freq[k] == 1)
+    unique_readings = len(df.groupby(['Expression', 'Reading']).size())
+
+    core_stats = {"In_Core_1.5K": 0, "In_Core_2K": 0, "In_Core_10K": 0, "Real_Life_Japanese": 0}
+    for word in df['Expression'].astype(str).str.strip().tolist():
+        if word in core_sets["1.5K"]:
+            core_stats["In_Core_1.5K"] += 1
+        elif word in core_sets["2K"]:
+            core_stats["In_Core_2K"] += 1
+        elif word in core_sets["10K"]:
+            core_stats["In_Core_10K"] += 1
+        else:
+            core_stats["Real_Life_Japanese"] += 1
+
+    diff_weights = {'Grammar': 5, 'N5': 10, 'N4': 20, 'N3': 40, 'N2': 70, 'N1': 100, 'Proper Noun': 15,
+                    'Unlabeled': 45}
+    df['Score_Weight'] = df['Refined_Level'].map(diff_weights).fillna(45)
+    avg_diff_weighted = (df['Score_Weight'] * df['Frequency']).sum() / total_words if total_words > 0 else 0
+    return {
+        "Anime": show,
+        "Length_total_words": int(total_words),
+        "Unique_words_dictionary_size": int(unique_words),
+        "Unique_words_used_once": int(used_once),
+        "Unique_words_used_once_%": f"{used_once_pct:.1f}%",
+        "Unique_kanji": len(set(kanji_list)),
+        "Unique_kanji_used_once": kanji_once,
+        "Unique_kanji_readings": int(unique_readings),
+        "Words_not_found_in_core_Lists": core_stats['Real_Life_Japanese'],
+        "Average_Difficulty_Unweighted": int(round(df['Score_Weight'].mean())),
+        "Perceived_Difficulty_Weighted": int(round(avg_diff_weighted)),
+        "Peak_difficulty_90th_percentile": int(round(df['Score_Weight'].quantile(0.9))),
+        "In_Core_1.5K": core_stats["In_Core_1.5K"],
+        "In_Core_10K": core_stats["In_Core_10K"],
+        "In_Core_2K": core_stats["In_Core_2K"],
+        "Real_Life_Japanese": core_stats["Real_Life_Japanese"]
+    }
+
+
+def store_columns(show):
+    """What vocab_store.load_show would return for this synthetic show."""
+    n = len(show['Expression'])
+    return {
+        'expression': np.array(show['Expression']),
+        'reading': np.array(show['Reading']),
+        'level': np.array(show['Level']),
+        'frequency': np.array(show['Frequency'], dtype=np.int32),
+        'meaning_class': np.array([vocab_store.meaning_class(m) for m in show['Meaning']], dtype=np.uint8),
+        'episode_names': np.array(['Episode 01']),
+        'episode_ids': np.zeros(n, dtype=np.int32),
+        'episode_offsets': np.arange(n + 1, dtype=np.int32),
+    }
+
+
+if __name__ == "__main__":
+    n_shows = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    words_per_show = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+    print(f"Building synthetic catalog: {n_shows} shows x {words_per_show} words...")
+    shows, core_sets = synthetic_catalog(n_shows, words_per_show)
+    stores = [store_columns(show) for show in shows]
+
+    start = time.perf_counter()
+    legacy = [legacy_show_stats(f"Show {i}", pd.DataFrame(show), core_sets) for i, show in enumerate(shows)]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tier_lookup = core_tiers.lookup_arrays(core_tiers.compile_words(core_sets))
+    vectorized = [vocab_metrics.compute_show_stats(f"Show {i}", data, tier_lookup)
+                  for i, data in enumerate(stores)]
+    vectorized_time = time.perf_counter() - start
+
+    assert legacy == vectorized, "vectorized stats differ from the legacy implementation"
+    print(f"Legacy (row-wise):  {legacy_time:.2f}s")
+    print(f"Vectorized:         {vectorized_time:.2f}s  ({legacy_time / vectorized_time:.1f}x faster)")
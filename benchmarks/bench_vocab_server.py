@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+import threading
+from urllib.parse import quote
+from urllib.request import urlopen
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import vocab_server
+
+# ==========================================
+# BENCHMARK: vocab_server query latency
+# ==========================================
+# Times common /word and /search queries against the real CSVs, in process and
+# over HTTP (a server thread on a free port), and prints p50 / p95 / max per
+# query. The index is built first if it's missing or stale.
+#
+# Usage: python benchmarks/bench_vocab_server.py [repeats]   (run from the repo root)
+
+WORD_QUERIES = ['する', '先生', '大丈夫', '喪女', '友達']
+SEARCH_QUERIES = ['大丈夫', 'ですか', 'お前', '先生は', 'ね', '何やってんだ']
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+    return f"p50 {pick(0.5):7.2f} ms   p95 {pick(0.95):7.2f} ms   max {samples[-1] * 1000:7.2f} ms"
+
+
+def timed(call, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    start = time.perf_counter()
+    vocab_server.load_index()
+    vocab_server.catalog()
+    print(f"Index + catalog loaded in {time.perf_counter() - start:.2f}s")
+
+    print("\nIn process:")
+    for word in WORD_QUERIES:
+        print(f"  /word   {word:<8} {percentiles(timed(lambda: vocab_server.query_word(word), repeats))}")
+    for query in SEARCH_QUERIES:
+        print(f"  /search {query:<8} {percentiles(timed(lambda: vocab_server.query_search(query), repeats))}")
+
+    server = vocab_server.make_server(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"\nOver HTTP ({base}):")
+    for path, queries in (('word', WORD_QUERIES), ('search', SEARCH_QUERIES)):
+        for query in queries:
+            url = f"{base}/{path}?q={quote(query)}"
+            samples = timed(lambda: urlopen(url).read(), repeats)
+            print(f"  /{path:<6} {query:<8} {percentiles(samples)}")
+    server.shutdown()
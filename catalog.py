@@ -0,0 +1,147 @@
+import os
+import re
+import json
+import hashlib
+import unicodedata
+
+import vocab_store
+
+# ==========================================
+# FRONT-END CATALOG
+# ==========================================
+# What the React app loads, written by graphs.py from the stats/ JSON:
+#   CATALOG_DIR/manifest.json       every show's card fields (id, name, difficulty,
+#                                   vocab index URL) plus a prefix search index
+#                                   over the names
+#   CATALOG_DIR/shows/<id>.json     one show's full stats, fetched when it's opened
+# The app never bundles the stats, so its size doesn't grow with the catalog.
+#
+# Show ids are URL/file-safe slugs of the names (NFKC, lower case, runs of
+# punctuation -> '-'), so "SK8" and "Sk8" resolve to the same file; colliding
+# slugs get -2, -3, ... in name order. show_ids() assigns them once over every
+# show with stats or a CSV, and vocab_shards.py names its folders with the same
+# ids, so a show's catalog entry and vocabulary pages can't drift apart. Each
+# manifest entry also carries the URL of its vocabulary index ('vocab', None
+# for shows without a CSV), which is what the app fetches.
+#
+# Search: each name is split into terms (same normalisation) plus all terms
+# joined ("K-ON!" -> k, on, kon), and every prefix of every term maps to the ids
+# of the shows having it. The app splits the query the same way and intersects,
+# also accepting a term found anywhere in a name, so "uck" still finds
+# "Lucky Star"; a query with no terms (only punctuation) matches nothing.
+#
+# Usage: python catalog.py   (rebuilds from stats/ without re-running graphs.py)
+
+CATALOG_DIR = 'react-anime/public/catalog'
+SHOW_DIR = os.path.join(CATALOG_DIR, 'shows')
+MANIFEST_PATH = os.path.join(CATALOG_DIR, 'manifest.json')
+STATS_FOLDER = 'stats'
+CATALOG_VERSION = 2
+SUMMARY_KEYS = ['Anime', 'Perceived_Difficulty_Weighted']
+VOCAB_URL = 'vocab/{id}/index.json'  # vocab_shards.SHARD_DIR, relative to the app's public/
+
+
+def normalize(text):
+    return unicodedata.normalize('NFKC', text).lower()
+
+
+def search_terms(name):
+    terms = [term for term in re.split(r'[\W_]+', normalize(name)) if term]
+    if len(terms) > 1:
+        terms.append(''.join(terms))
+    return terms
+
+
+def sort_key(name):
+    return normalize(name), name
+
+
+def slug(name):
+    text = re.sub(r'[\W_]+', '-', normalize(name)).strip('-')
+    return text or hashlib.sha1(name.encode('utf-8')).hexdigest()[:10]
+
+
+def assign_ids(shows):
+    """{show: id} with colliding slugs numbered in sorted name order, so ids don't depend on the caller."""
+    ids, taken = {}, set()
+    for show in sorted(shows, key=sort_key):
+        base = candidate = slug(show)
+        n = 1
+        while candidate in taken:
+            n += 1
+            candidate = f"{base}-{n}"
+        taken.add(candidate)
+        ids[show] = candidate
+    return ids
+
+
+def show_ids(extra=(), stats_folder=STATS_FOLDER, csv_folder=vocab_store.CSV_FOLDER):
+    """{show: id} over every show with stats or a CSV (plus `extra`): the ids the catalog and vocab pages share."""
+    shows = set(extra) | set(vocab_store.list_shows(csv_folder))
+    if os.path.isdir(stats_folder):
+        shows |= {name[:-5] for name in os.listdir(stats_folder) if name.endswith('.json')}
+    return assign_ids(shows)
+
+
+def search_index(names):
+    """{prefix: [position in names, ...]} over every prefix of every search term."""
+    index = {}
+    for i, name in enumerate(names):
+        for term in search_terms(name):
+            for end in range(1, len(term) + 1):
+                positions = index.setdefault(term[:end], [])
+                if not positions or positions[-1] != i:
+                    positions.append(i)
+    return index
+
+
+def load_stats(shows=None, folder=STATS_FOLDER):
+    """{show: stats dict} from the stats JSON graphs.py writes (every file in folder if shows is None)."""
+    if shows is None:
+        shows = sorted(name[:-5] for name in os.listdir(folder) if name.endswith('.json'))
+    stats = {}
+    for show in shows:
+        path = os.path.join(folder, f"{show}.json")
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                stats[show] = json.load(f)
+    return stats
+
+
+def write_if_changed(path, payload):
+    blob = json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == blob:
+                return False
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(blob)
+    return True
+
+
+def write_catalog(stats):
+    """Writes the manifest and one shard per show from {show: stats}; removes shards of shows no longer listed."""
+    shows = sorted(stats, key=sort_key)
+    ids = show_ids(shows)
+    with_vocab = set(vocab_store.list_shows())
+    os.makedirs(SHOW_DIR, exist_ok=True)
+
+    written = sum(write_if_changed(os.path.join(SHOW_DIR, f"{ids[show]}.json"), stats[show]) for show in shows)
+    shards = {f"{ids[show]}.json" for show in shows}
+    for name in os.listdir(SHOW_DIR):
+        if name.endswith('.json') and name not in shards:
+            os.remove(os.path.join(SHOW_DIR, name))
+
+    entries = [dict({'id': ids[show], 'vocab': VOCAB_URL.format(id=ids[show]) if show in with_vocab else None},
+                    **{key: stats[show].get(key, show if key == 'Anime' else None) for key in SUMMARY_KEYS})
+               for show in shows]
+    manifest = {'version': CATALOG_VERSION, 'shows': entries,
+                'search': search_index([entry['Anime'] for entry in entries])}
+    write_if_changed(MANIFEST_PATH, manifest)
+    print(f"Catalog: {len(shows)} shows ({written} shards updated), "
+          f"manifest {os.path.getsize(MANIFEST_PATH) / 1024:.1f} KB")
+    return ids
+
+
+if __name__ == "__main__":
+    write_catalog(load_stats())
@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+# ==========================================
+# CHART RENDERING
+# ==========================================
+# graphs.py / megagraph.py describe each figure as a job:
+#   {'kind': <key of RENDERERS>, 'path': <output png>, 'data': <plain JSON series>}
+# render_charts() hashes every job's data, skips outputs whose hash matches the
+# last render (cache/charts.json), and draws the rest across a process pool
+# with the Agg backend.
+#
+# export_series() writes the same data (minus styling) as compact JSON to
+# SERIES_DIR, which the React app draws client-side; with --no-png the
+# matplotlib step can be skipped entirely.
+
+CACHE_PATH = 'cache/charts.json'
+SERIES_DIR = 'react-anime/public/charts'
+SERIES_KEYS = ('title', 'labels', 'values', 'index', 'columns', 'colors', 'orientation', 'xlabel')
+CHART_VERSION = 1  # bump when a renderer's look changes, to redraw everything
+FONT_FAMILY = 'MS Gothic'  # Support for Japanese characters
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    plt.rcParams['font.family'] = FONT_FAMILY
+
+
+def render_level_bar(data, path):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    plt.figure(figsize=(10, 6))
+    sns.barplot(x=data['labels'], y=data['values'], hue=data['labels'], palette="viridis", legend=False)
+    plt.title(data['title'])
+    plt.savefig(path)
+    plt.close()
+
+
+def render_stacked_bar(data, path):
+    """data: {'index', 'columns', 'values' (rows x columns), 'title', ...}"""
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    df = pd.DataFrame(data['values'], index=data['index'], columns=data['columns'])
+    fig, ax = plt.subplots(figsize=data.get('figsize', (12, 7)))
+    df.plot(kind=data.get('orientation', 'bar'), stacked=True, ax=ax, colormap=data['colormap'],
+            edgecolor=data.get('edgecolor'))
+    plt.title(data['title'], fontsize=data.get('fontsize'))
+    if data.get('xlabel'):
+        plt.xlabel(data['xlabel'])
+    if data.get('legend_title'):
+        plt.legend(title=data['legend_title'], bbox_to_anchor=(1.05, 1), loc='upper left')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close(fig)
+
+
+def render_pie(data, path):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    colors = data.get('colors') or sns.color_palette(data['palette'], len(data['labels']))
+    plt.figure(figsize=data.get('figsize', (9, 9)))
+    plt.pie(data['values'], labels=data['labels'], autopct='%1.1f%%', startangle=140, colors=colors,
+            wedgeprops={'edgecolor': 'white'}, textprops=data.get('textprops'))
+    plt.title(data['title'], fontsize=data.get('fontsize'))
+    plt.savefig(path)
+    plt.close()
+
+
+RENDERERS = {
+    'level_bar': render_level_bar,
+    'stacked_bar': render_stacked_bar,
+    'pie': render_pie,
+}
+
+
+def job_hash(job):
+    blob = json.dumps([CHART_VERSION, FONT_FAMILY, job['kind'], job['data']], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+def _render(job):
+    RENDERERS[job['kind']](job['data'], job['path'])
+    return job['path']
+
+
+def load_cache():
+    if not os.path.exists(CACHE_PATH):
+        return {}
+    with open(CACHE_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_cache(cache):
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    tmp_path = CACHE_PATH + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, CACHE_PATH)
+
+
+def render_charts(jobs, workers=None, force=False):
+    """Renders the jobs whose input changed. Returns (rendered, skipped)."""
+    started = time.time()
+    cache = load_cache()
+    todo = []
+    for job in jobs:
+        job['hash'] = job_hash(job)
+        if not force and cache.get(job['path']) == job['hash'] and os.path.exists(job['path']):
+            continue
+        todo.append(job)
+
+    if todo:
+        workers = min(workers or os.cpu_count() or 1, len(todo))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = {job['path']: pool.submit(_render, job) for job in todo}
+            for job in todo:
+                try:
+                    futures[job['path']].result()
+                    cache[job['path']] = job['hash']
+                except Exception as e:
+                    print(f"  Failed to render {job['path']}: {e}")
+                    cache.pop(job['path'], None)
+        save_cache(cache)
+
+    elapsed = time.time() - started
+    rate = len(todo) / elapsed if elapsed > 0 else 0
+    print(f"Charts: {len(todo)} rendered, {len(jobs) - len(todo)} up to date "
+          f"in {elapsed:.1f}s ({rate:.1f} charts/s)")
+    return len(todo), len(jobs) - len(todo)
+
+
+def export_series(jobs, name):
+    """Writes {job['series']: data} for the jobs to SERIES_DIR/<name>.json (only when it changed)."""
+    series = {job['series']: {key: job['data'][key] for key in SERIES_KEYS if key in job['data']} for job in jobs}
+    blob = json.dumps(series, ensure_ascii=False, separators=(',', ':'))
+    path = os.path.join(SERIES_DIR, f"{name}.json")
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == blob:
+                return path
+    os.makedirs(SERIES_DIR, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(blob)
+    return path
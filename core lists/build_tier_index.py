@@ -0,0 +1,17 @@
+import os
+import sys
+
+# Compiles 1.5K.json / 2K.json / 10K.json (written by core.py) into the shared
+# word -> tier index the other scripts load. Run after regenerating a list;
+# the scripts also rebuild it on their own when a list file has changed.
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import core_tiers
+
+index = core_tiers.build_index()
+counts = core_tiers.bucket_counts(index['words'])
+for tier_index, tier in enumerate(core_tiers.TIERS):
+    print(f"{tier}: {counts[tier_index]} words")
+print(f"Wrote {len(index['words'])} words to {core_tiers.INDEX_PATH}")
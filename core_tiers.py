@@ -0,0 +1,125 @@
+import os
+import json
+from collections import Counter
+
+# ==========================================
+# CORE-LIST TIER INDEX
+# ==========================================
+# All core lists ("core lists/<tier>.json", written by core lists/core.py) compiled
+# into one artifact: word -> index of the lowest tier it appears in. Scripts ask
+# this module instead of parsing the lists themselves, so a tier check is one
+# dict probe and startup is one JSON read. The index is rebuilt automatically
+# when a list file changes (or with `python "core lists/build_tier_index.py"`).
+
+CORE_DIR = 'core lists'
+INDEX_PATH = 'cache/core_tier_index.json'
+TIERS = ("1.5K", "2K", "10K")  # lowest first; a word belongs to the first tier that lists it
+NOT_IN_CORE = len(TIERS)
+INDEX_VERSION = 1
+
+_index = None
+
+
+def list_path(tier, core_dir=CORE_DIR):
+    return os.path.join(core_dir, f"{tier}.json")
+
+
+def source_signatures(core_dir=CORE_DIR):
+    signatures = {}
+    for tier in TIERS:
+        path = list_path(tier, core_dir)
+        if os.path.exists(path):
+            st = os.stat(path)
+            signatures[tier] = [st.st_size, st.st_mtime_ns]
+    return signatures
+
+
+def compile_words(lists):
+    """{tier: iterable of words} -> {word: lowest tier index}."""
+    words = {}
+    for tier_index, tier in reversed(list(enumerate(TIERS))):
+        words.update(dict.fromkeys(lists.get(tier, ()), tier_index))
+    return words
+
+
+def read_list(path):
+    """Words of one core-list file: a JSON list of {'word': ...} entries or plain strings."""
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    words = []
+    for entry in entries:
+        if isinstance(entry, dict) and 'word' in entry:
+            words.append(entry['word'].strip())
+        elif isinstance(entry, str):
+            words.append(entry.strip())
+    return words
+
+
+def build_index(core_dir=CORE_DIR, index_path=INDEX_PATH):
+    lists = {}
+    for tier in TIERS:
+        path = list_path(tier, core_dir)
+        if os.path.exists(path):
+            try:
+                lists[tier] = read_list(path)
+            except (OSError, ValueError) as e:
+                print(f"Error loading {path}: {e}")
+    index = {'version': INDEX_VERSION, 'tiers': list(TIERS), 'sources': source_signatures(core_dir),
+             'words': compile_words(lists)}
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, index_path)
+    return index
+
+
+def load_index(core_dir=CORE_DIR, index_path=INDEX_PATH):
+    """{word: tier index}, compiled once and cached for the rest of the process."""
+    global _index
+    if _index is not None:
+        return _index
+    index = None
+    if os.path.exists(index_path):
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if (index.get('version') != INDEX_VERSION or index.get('tiers') != list(TIERS)
+                or index.get('sources') != source_signatures(core_dir)):
+            index = None
+    if index is None:
+        index = build_index(core_dir, index_path)
+    _index = index['words']
+    return _index
+
+
+def reload(core_dir=CORE_DIR, index_path=INDEX_PATH):
+    """Drops the cached index and loads it again (recompiled if a core list changed since)."""
+    global _index
+    _index = None
+    return load_index(core_dir, index_path)
+
+
+def tier_of(word):
+    """Tier name of a word ('1.5K', ...) or None if it's in no core list."""
+    tier_index = load_index().get(word)
+    return None if tier_index is None else TIERS[tier_index]
+
+
+def words_up_to(tier):
+    """Every word whose lowest tier is `tier` or below, e.g. words_up_to('1.5K')."""
+    limit = TIERS.index(tier)
+    return {word for word, tier_index in load_index().items() if tier_index <= limit}
+
+
+def bucket_counts(words):
+    """Counter of tier index (NOT_IN_CORE for none) over `words`."""
+    index = load_index()
+    return Counter(index.get(word, NOT_IN_CORE) for word in words)
+
+
+def lookup_arrays(words=None):
+    """(sorted word array, tier index array) for vectorized lookups with np.searchsorted."""
+    import numpy as np
+    words = load_index() if words is None else words
+    ordered = np.array(sorted(words), dtype=str)
+    return ordered, np.array([words[word] for word in ordered.tolist()], dtype=np.int8)
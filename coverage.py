@@ -0,0 +1,109 @@
+import numpy as np
+
+import core_tiers
+import vocab_store
+import vocab_metrics
+
+# ==========================================
+# CUMULATIVE COVERAGE
+# ==========================================
+# "After learning the first N deck words, what share of the dialogue do I
+# understand?" Coverage after N words = occurrences of the N most frequent words
+# / all occurrences (Frequency column). Every show's curve is computed at once
+# from the concatenated catalog: one lexsort groups the words by show, most
+# frequent first, and one cumsum (minus each show's running offset) gives all
+# curves. Thresholds are a single searchsorted over the curves, shifted so they
+# sort globally (show g's curve lives in [2g, 2g + 1]).
+#
+# The *_excl_1.5K variants count the 1.5K core list as known before the first
+# card: it lifts the curve's starting point and is not counted in N.
+
+THRESHOLDS = (0.80, 0.90, 0.95)
+CURVE_POINTS = (100, 250, 500, 1000, 2000, 5000, 10000)
+EXCLUDED_TIER = "1.5K"
+
+
+def coverage_curves(group, frequency, known=None, n_groups=None):
+    """
+    group: group (show) index per word; frequency: occurrences per word;
+    known: mask of words counted as known up front.
+    Returns (starts, curves, baselines): curves[starts[g]:starts[g + 1]] is group g's
+    coverage after learning its 1, 2, ... most frequent remaining words and
+    baselines[g] its coverage before the first one (fractions of its total).
+    """
+    if n_groups is None:
+        n_groups = int(group.max()) + 1 if len(group) else 0
+    frequency = frequency.astype(np.int64)
+    known = np.zeros(len(group), dtype=bool) if known is None else known
+    totals = np.bincount(group, weights=frequency, minlength=n_groups)
+    baselines = np.bincount(group[known], weights=frequency[known], minlength=n_groups)
+    totals_safe = np.maximum(totals, 1)
+
+    group, frequency = group[~known], frequency[~known]
+    order = np.lexsort((-frequency, group))  # by group, most frequent first
+    group, frequency = group[order], frequency[order]
+    starts = np.searchsorted(group, np.arange(n_groups + 1))
+    cumulative = np.cumsum(frequency)
+    offsets = np.concatenate(([0], cumulative))[starts[:-1]]
+    cumulative = cumulative - np.repeat(offsets, np.diff(starts))
+    curves = (cumulative + baselines[group]) / totals_safe[group]
+    return starts, curves, baselines / totals_safe
+
+
+def words_needed(starts, curves, baselines, threshold):
+    """Words to learn per group to reach `threshold` (0 if known words already do, -1 if never)."""
+    n_groups = len(starts) - 1
+    shift = np.repeat(np.arange(n_groups) * 2.0, np.diff(starts))
+    first = np.searchsorted(curves + shift, np.arange(n_groups) * 2.0 + threshold)
+    needed = first - starts[:-1] + 1
+    needed[first >= starts[1:]] = -1
+    needed[baselines >= threshold] = 0
+    return needed
+
+
+def coverage_at(starts, curves, baselines, n_words):
+    """Coverage per group after learning n_words words (all of them if it has fewer)."""
+    lengths = np.diff(starts)
+    if not len(curves):
+        return baselines.copy()
+    last = np.clip(starts[:-1] + np.minimum(n_words, lengths) - 1, 0, len(curves) - 1)
+    return np.where(lengths > 0, curves[last], baselines)
+
+
+def summarize(starts, curves, baselines, suffix=""):
+    """Per-group stats dicts: words needed per THRESHOLDS and the curve sampled at CURVE_POINTS (in %)."""
+    needed = {t: words_needed(starts, curves, baselines, t) for t in THRESHOLDS}
+    points = {n: coverage_at(starts, curves, baselines, n) for n in CURVE_POINTS}
+    summaries = []
+    for g in range(len(starts) - 1):
+        summary = {f"Words_for_{int(t * 100)}%_coverage{suffix}": int(needed[t][g]) for t in THRESHOLDS}
+        summary[f"Coverage_start{suffix}"] = round(float(baselines[g]) * 100, 1)
+        summary[f"Coverage_curve{suffix}"] = {str(n): round(float(points[n][g]) * 100, 1) for n in CURVE_POINTS}
+        summaries.append(summary)
+    return summaries
+
+
+def core_mask(expressions):
+    return vocab_metrics.tier_indices(expressions, core_tiers.lookup_arrays()) \
+        == core_tiers.TIERS.index(EXCLUDED_TIER)
+
+
+def show_coverage(shows=None, csv_folder=vocab_store.CSV_FOLDER):
+    """{show: coverage stats} for every show, with and without the 1.5K core list counted as known."""
+    shows, data = vocab_store.load_catalog(['expression', 'frequency'], shows, csv_folder)
+    group = data['show'].astype(np.int64)
+    plain = summarize(*coverage_curves(group, data['frequency'], n_groups=len(shows)))
+    core = summarize(*coverage_curves(group, data['frequency'], core_mask(data['expression']), len(shows)),
+                     suffix=f"_excl_{EXCLUDED_TIER}")
+    return {show: dict(plain[i], **core[i]) for i, show in enumerate(shows)}
+
+
+def mega_coverage(shows=None, csv_folder=vocab_store.CSV_FOLDER):
+    """Coverage stats of all shows combined (the mega deck): words merged, frequencies summed."""
+    shows, data = vocab_store.load_catalog(['expression', 'frequency'], shows, csv_folder)
+    words, inverse = np.unique(np.char.strip(data['expression']), return_inverse=True)
+    frequency = np.bincount(inverse, weights=data['frequency']).astype(np.int64)
+    group = np.zeros(len(words), dtype=np.int64)
+    plain = summarize(*coverage_curves(group, frequency, n_groups=1))[0]
+    core = summarize(*coverage_curves(group, frequency, core_mask(words), 1), suffix=f"_excl_{EXCLUDED_TIER}")[0]
+    return dict(plain, **core)
@@ -0,0 +1,153 @@
+import re
+
+# ==========================================
+# KANA / ROMAJI CONVERSION
+# ==========================================
+# Hiragana <-> katakana is a str.translate over the two Unicode blocks (they are
+# 0x60 apart). Romaji splits the text into syllables with one regex and looks
+# each one up in a precomputed table, so yoon (キャ), sokuon (ッカ) and long vowels
+# (カー) are matched as units. Input is normalised to katakana first, so hiragana works too.
+# The *_column functions convert a whole vocabulary column in one pass.
+
+HIRA_TO_KATA = str.maketrans({chr(c): chr(c + 0x60) for c in range(0x3041, 0x3097)})
+KATA_TO_HIRA = str.maketrans({chr(c): chr(c - 0x60) for c in range(0x30A1, 0x30F7)})
+
+LONG_VOWEL_MODES = ('drop', 'repeat', 'macron')  # カー -> ka / kaa / kā
+DEFAULT_LONG_VOWELS = 'drop'
+MACRONS = {'a': 'ā', 'i': 'ī', 'u': 'ū', 'e': 'ē', 'o': 'ō'}
+
+SYLLABLES = {
+    'ア': 'a', 'イ': 'i', 'ウ': 'u', 'エ': 'e', 'オ': 'o',
+    'カ': 'ka', 'キ': 'ki', 'ク': 'ku', 'ケ': 'ke', 'コ': 'ko',
+    'サ': 'sa', 'シ': 'shi', 'ス': 'su', 'セ': 'se', 'ソ': 'so',
+    'タ': 'ta', 'チ': 'chi', 'ツ': 'tsu', 'テ': 'te', 'ト': 'to',
+    'ナ': 'na', 'ニ': 'ni', 'ヌ': 'nu', 'ネ': 'ne', 'ノ': 'no',
+    'ハ': 'ha', 'ヒ': 'hi', 'フ': 'fu', 'ヘ': 'he', 'ホ': 'ho',
+    'マ': 'ma', 'ミ': 'mi', 'ム': 'mu', 'メ': 'me', 'モ': 'mo',
+    'ヤ': 'ya', 'ユ': 'yu', 'ヨ': 'yo',
+    'ラ': 'ra', 'リ': 'ri', 'ル': 'ru', 'レ': 're', 'ロ': 'ro',
+    'ワ': 'wa', 'ヰ': 'i', 'ヱ': 'e', 'ヲ': 'wo', 'ン': 'n',
+    'ガ': 'ga', 'ギ': 'gi', 'グ': 'gu', 'ゲ': 'ge', 'ゴ': 'go',
+    'ザ': 'za', 'ジ': 'ji', 'ズ': 'zu', 'ゼ': 'ze', 'ゾ': 'zo',
+    'ダ': 'da', 'ヂ': 'ji', 'ヅ': 'zu', 'デ': 'de', 'ド': 'do',
+    'バ': 'ba', 'ビ': 'bi', 'ブ': 'bu', 'ベ': 'be', 'ボ': 'bo',
+    'パ': 'pa', 'ピ': 'pi', 'プ': 'pu', 'ペ': 'pe', 'ポ': 'po',
+    'ヴ': 'vu',
+    'ァ': 'a', 'ィ': 'i', 'ゥ': 'u', 'ェ': 'e', 'ォ': 'o',
+    'ャ': 'ya', 'ュ': 'yu', 'ョ': 'yo', 'ヮ': 'wa', 'ヵ': 'ka', 'ヶ': 'ke',
+    '・': ' ',
+}
+
+# Yoon and the small-vowel spellings used for loanwords
+DIGRAPHS = {
+    'シャ': 'sha', 'シュ': 'shu', 'ショ': 'sho', 'シェ': 'she',
+    'チャ': 'cha', 'チュ': 'chu', 'チョ': 'cho', 'チェ': 'che',
+    'ジャ': 'ja', 'ジュ': 'ju', 'ジョ': 'jo', 'ジェ': 'je',
+    'ヂャ': 'ja', 'ヂュ': 'ju', 'ヂョ': 'jo',
+    'ファ': 'fa', 'フィ': 'fi', 'フェ': 'fe', 'フォ': 'fo', 'フュ': 'fyu',
+    'ティ': 'ti', 'トゥ': 'tu', 'ディ': 'di', 'ドゥ': 'du', 'デュ': 'dyu', 'テュ': 'tyu',
+    'ウィ': 'wi', 'ウェ': 'we', 'ウォ': 'wo', 'ツァ': 'tsa', 'ツィ': 'tsi', 'ツェ': 'tse', 'ツォ': 'tso',
+    'ヴァ': 'va', 'ヴィ': 'vi', 'ヴェ': 've', 'ヴォ': 'vo', 'ヴュ': 'vyu',
+}
+for _kana in 'キギニヒビピミリ':
+    for _small, _vowel in (('ャ', 'a'), ('ュ', 'u'), ('ョ', 'o')):
+        DIGRAPHS[_kana + _small] = SYLLABLES[_kana][:-1] + 'y' + _vowel
+
+KATAKANA_RE = re.compile(r'[\u30a0-\u30ff]+')  # includes ・ and ー
+
+# One syllable: optional sokuon, a kana, an optional small kana, an optional long vowel mark.
+# ン before a vowel or ヤ/ユ/ヨ is matched together with it, to be written n' (ンア -> n'a).
+SYLLABLE_RE = re.compile(r'ン[アイウエオヤユヨ](?:[ァィゥェォャュョヮ])?ー?|ッ?[\u30a1-\u30fb](?:[ァィゥェォャュョヮ])?ー?|ー')
+
+_romaji_tables = {}
+
+
+def to_katakana(text):
+    return text.translate(HIRA_TO_KATA)
+
+
+def to_hiragana(text):
+    return text.translate(KATA_TO_HIRA)
+
+
+def is_katakana(text):
+    return KATAKANA_RE.fullmatch(text) is not None
+
+
+def _long_vowel(romaji, mode):
+    if mode == 'drop' or not romaji or romaji[-1] not in MACRONS:
+        return romaji
+    if mode == 'repeat':
+        return romaji + romaji[-1]
+    return romaji[:-1] + MACRONS[romaji[-1]]
+
+
+def romaji_table(long_vowels=DEFAULT_LONG_VOWELS):
+    """Every katakana sequence the converter matches as one unit, mapped to its romaji."""
+    if long_vowels not in LONG_VOWEL_MODES:
+        raise ValueError(f"long_vowels must be one of {LONG_VOWEL_MODES}, not {long_vowels!r}")
+    table = dict(SYLLABLES, **DIGRAPHS)
+    # Sokuon doubles the next consonant (Hepburn: ッチ -> tchi)
+    for kana, romaji in list(table.items()):
+        if kana != 'ン' and romaji[0] not in 'aiueo ':
+            table['ッ' + kana] = ('t' if romaji.startswith('ch') else romaji[0]) + romaji
+    # Hepburn separates ン from a following vowel or y: ンア -> n'a, ンヨ -> n'yo
+    for kana, romaji in list(table.items()):
+        if kana[0] in 'アイウエオヤユヨ':
+            table['ン' + kana] = "n'" + romaji
+    for kana, romaji in list(table.items()):
+        table[kana + 'ー'] = _long_vowel(romaji, long_vowels)
+    table['ッ'] = ''
+    table['ー'] = ''
+    return table
+
+
+def _romaji_lookup(long_vowels):
+    if long_vowels not in _romaji_tables:
+        table = romaji_table(long_vowels)
+        longest = max(map(len, table))
+
+        def convert_unit(match):
+            unit = match.group()
+            if unit in table:
+                return table[unit]
+            # Not a known combination (e.g. カャ): longest known prefix first
+            out, i = [], 0
+            while i < len(unit):
+                for size in range(min(longest, len(unit) - i), 0, -1):
+                    if unit[i:i + size] in table:
+                        out.append(table[unit[i:i + size]])
+                        i += size
+                        break
+                else:
+                    out.append(unit[i])
+                    i += 1
+            return ''.join(out)
+
+        _romaji_tables[long_vowels] = convert_unit
+    return _romaji_tables[long_vowels]
+
+
+def to_romaji(text, long_vowels=DEFAULT_LONG_VOWELS):
+    """Hepburn romaji for hiragana/katakana text; anything else passes through unchanged."""
+    return SYLLABLE_RE.sub(_romaji_lookup(long_vowels), to_katakana(text))
+
+
+def _column(texts, convert):
+    """Runs convert() once over the whole column joined by newlines, then splits it back."""
+    texts = list(texts)
+    if any('\n' in text for text in texts):
+        return [convert(text) for text in texts]
+    return convert('\n'.join(texts)).split('\n') if texts else []
+
+
+def katakana_column(texts):
+    return _column(texts, to_katakana)
+
+
+def hiragana_column(texts):
+    return _column(texts, to_hiragana)
+
+
+def romaji_column(texts, long_vowels=DEFAULT_LONG_VOWELS):
+    return _column(texts, lambda blob: to_romaji(blob, long_vowels))
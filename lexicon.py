@@ -0,0 +1,348 @@
+import os
+import csv
+import json
+
+import pipeline
+
+# ==========================================
+# LEXICON
+# ==========================================
+# Every hand-maintained word source behind the definition priority chain, merged
+# into one artifact (cache/lexicon.json) with a single lookup:
+#
+#   MISTRANSLATION_FIXES > GRAMMAR_DICT > names.json > dict.csv
+#
+# plus the JLPT level from JLPTWords.json (LEVEL_FIXES first). lookup() returns
+# [meaning, reading, source, level]; meaning/reading/source are None when only a
+# level is known, and reading is None for grammar and name entries, which take
+# the token's own reading. The artifact is rebuilt when a source file or one of
+# the tables below changes. main.py and MEGADECK.py both read it.
+#
+# fingerprint() covers the curated sources only: dict.csv is a cache of online
+# lookups that grows on every run, so appending to it must not invalidate the
+# define stage of every show. Failed lookups (source NOT_FOUND, written by older
+# runs) are skipped when dict.csv is read, so a word whose lookup timed out or
+# ran offline is looked up again instead of keeping "No definition found".
+
+LEXICON_PATH = 'cache/lexicon.json'
+NAME_FILE = 'names.json'
+JLPT_FILE = 'JLPTWords.json'
+LOCAL_DICT = 'dict.csv'
+LEXICON_VERSION = 2
+
+MANUAL_FIX = "ManualFix"
+GRAMMAR = "GrammarDict"
+NAME_MAP = "NameMap"
+CURATED_SOURCES = (MANUAL_FIX, GRAMMAR, NAME_MAP)
+NOT_FOUND = "None"  # source of a failed lookup (a string, as stored in dict.csv)
+
+# --- NEW TABLE: FREQUENT MISTRANSLATIONS ---
+MISTRANSLATION_FIXES = {
+    # --- 共通・代名詞・応答 ---
+    '私': {'reading': 'わたし', 'meaning': 'I / Me'},
+    '僕': {'reading': 'ぼく', 'meaning': 'I / Me (Male pronoun)'},
+    '俺': {'reading': 'おれ', 'meaning': 'I / Me (Masculine)'},
+    'あんた': {'reading': 'あんた', 'meaning': 'You (informal/blunt)'},
+    '奴': {'reading': 'やつ', 'meaning': 'Guy / Person / Fellow / That thing'},
+    '人': {'reading': 'ひと', 'meaning': 'Person / People'},
+    '様': {'reading': 'さま', 'meaning': 'Sama (Honorific suffix)'},
+    'この': {'reading': 'この', 'meaning': 'This (Demonstrative)'},
+    '今': {'reading': 'いま', 'meaning': 'Now'},
+    '何': {'reading': 'なに', 'meaning': 'What'},
+    'うん': {'reading': 'うん', 'meaning': 'Yeah / Yes (casual)'},
+    'ううん': {'reading': 'ううん', 'meaning': 'No (casual)'},
+    'いえ': {'reading': 'いえ', 'meaning': 'No / Not at all (Polite interjection)'},
+    'ダメ': {'reading': 'だめ', 'meaning': 'No / Bad / Forbidden / Useless'},
+
+    # --- 助詞・感嘆詞・フィラー ---
+    'ねえ': {'reading': 'ねえ', 'meaning': 'Hey! / Look! / (seeking agreement) / No / Not (Slang negative)'},
+    'なあ': {'reading': 'なあ', 'meaning': 'Hey / I wonder (sentence ending particle)'},
+    'ちょっと': {'reading': 'ちょっと', 'meaning': 'A little / A moment'},
+    'えっと': {'reading': 'えっと', 'meaning': 'Umm... / Let me see... (Filler word)'},
+    'って': {'reading': 'って', 'meaning': 'Quotation particle / "They say..." / Topic marker'},
+    'コラ': {'reading': 'こら', 'meaning': 'Hey! / Listen! / Watch out! (Interjection)'},
+    'ッ': {'reading': 'ッ', 'meaning': '(Glottal stop / Emphasis marker / Clipped sound)'},
+    'リ': {'reading': 'り', 'meaning': '(Stuttering sound / Part of a name)'},
+    'くらい': {'reading': 'くらい', 'meaning': 'Around / Approximately (Time/Amount)'},
+
+    # --- 文法・活用形 ---
+    'てる': {'reading': 'てる', 'meaning': 'is... -ing (Contraction of te-iru)'},
+    'ます': {'reading': 'ます', 'meaning': 'Polite verb ending'},
+    'たい': {'reading': 'たい', 'meaning': 'Want to... (Verb suffix)'},
+    'そう': {'reading': 'そう', 'meaning': 'So / That way / Seeming'},
+    'やがる': {'reading': 'やがる', 'meaning': 'Pejorative auxiliary verb (indicates contempt)'},
+    'がん': {'reading': 'がん', 'meaning': 'Rough version of "yagaru" (not cancer)'},
+    'やん': {'reading': 'やん', 'meaning': 'Part of contraction (yaru -> yannakya) / Emphasis'},
+    '前': {'reading': 'まえ', 'meaning': 'Before / Front / Previous'},
+
+    # --- 関西弁 (Kansai-ben) ---
+    'なあかん': {'reading': 'なあかん', 'meaning': 'Must do / Have to (Kansai-ben)'},
+    'へん': {'reading': 'へん', 'meaning': 'Negative verb ending (Kansai-ben "nai")'},
+
+    # --- 専門用語・固有名詞 (作品別) ---
+    # Lucky Star / K-ON! / School Context
+    '占う': {'reading': 'うらなう', 'meaning': 'To tell fortunes / To predict'},
+    '外れる': {'reading': 'はずれる', 'meaning': 'To miss / To lose (lottery) / To fail'},
+    'プレイ': {'reading': 'プレイ', 'meaning': 'Play (game/sport) / Video Game Play'},
+    '部長': {'reading': 'ぶちょう', 'meaning': 'Club President (School Context)'},
+    'お茶': {'reading': 'おちゃ', 'meaning': 'Tea / (ready to drink)'},
+    '入る': {'reading': 'はいる', 'meaning': 'To enter / To be poured (tea) / To be ready'},
+    '王道': {'reading': 'おうどう', 'meaning': 'The classic way / Royal road / Standard path'},
+    '唯': {'reading': 'ゆい', 'meaning': 'Yui (Character Name)'},
+    'ロンドン': {'reading': 'ろんどん', 'meaning': 'London'},
+    'ネス湖': {'reading': 'ねすこ', 'meaning': 'Loch Ness'},
+    '皆勤賞': {'reading': 'かいきんしょう', 'meaning': 'Perfect Attendance Award'},
+    '教えの庭': {'reading': 'おしえのにわ', 'meaning': 'Garden of learning / School campus'},
+
+    # Gaming / Battle (Bakugan / Yu-Gi-Oh! / SK8)
+    '決闘': {'reading': 'けっとう', 'meaning': 'Duel'},
+    '召喚': {'reading': 'しょうかん', 'meaning': 'Summon / Summoning (Monster)'},
+    '融合': {'reading': 'ゆうごう', 'meaning': 'Fusion / Polymerization'},
+    '術': {'reading': 'じゅつ', 'meaning': 'Jutsu / Technique / Art'},
+    '腕': {'reading': 'うで', 'meaning': 'Skill / Ability (in games/sports)'},
+    '読み': {'reading': 'よみ', 'meaning': 'Predicting the opponent / Reading the game'},
+    '爆': {'reading': 'ばく', 'meaning': 'Baku (Explosive/Bakugan prefix)'},
+    '向く': {'reading': 'むく', 'meaning': 'To face / To point toward'},
+    '仲間': {'reading': 'なかま', 'meaning': 'Friend / Comrade / Teammate'},
+    '愛抱夢': {'reading': 'あだむ', 'meaning': 'Adam (Antagonist Name)'},
+    'あぶねえ': {'reading': 'あぶねえ', 'meaning': 'Dangerous! / Watch out!'},
+
+    # Beastars / Shirokuma Cafe
+    '食殺': {'reading': 'しょくさつ', 'meaning': 'Predation / Meat-eating murder'},
+    '隕石祭': {'reading': 'いんせきさい', 'meaning': 'Meteor Festival'},
+    'テム': {'reading': 'てむ', 'meaning': 'Tem (Character Name)'},
+    '笹子': {'reading': 'ささこ', 'meaning': 'Sasako (Waitress)'},
+    'ゾウガメ': {'reading': 'ぞうがめ', 'meaning': 'Giant Tortoise'},
+    'パンダママ': {'reading': 'ぱんだまま', 'meaning': 'Panda-mama'},
+    '常勤パンダ': {'reading': 'じょうきんぱんだ', 'meaning': 'Full-time Panda'},
+
+    # WataMote / Saiki K / Others
+    'ヘヘ': {'reading': 'へへ', 'meaning': 'Heh-heh (Awkward laughter)'},
+    'おっふ': {'reading': 'おっふ', 'meaning': 'Offu! (Awestruck sound)'},
+    'くだらない': {'reading': 'くだらない', 'meaning': 'Stupid / Worthless / Trivial'},
+    '喪女': {'reading': 'もじょ', 'meaning': 'Mojo (Unpopular woman / Femcel slang)'},
+    'もこっち': {'reading': 'もこっち', 'meaning': 'Mokocchi (Nickname)'},
+    '独り言': {'reading': 'ひとりごと', 'meaning': 'Speaking to oneself / Monologue'},
+
+    # その他修正
+    'さいふ': {'reading': 'さいふ', 'meaning': 'Wallet / Purse'},
+    'チュー': {'reading': 'ちゅう', 'meaning': 'Kiss (onomatopoeia)'},
+    '分': {'reading': 'ぶん', 'meaning': 'Part / Portion / Amount / Share'},
+    'ド': {'reading': 'ド', 'meaning': 'D (as in Dreadnought) / Super-'},
+    '目': {'reading': 'め', 'meaning': 'Eye / (part of idiom "teach a lesson")'},
+    '気を取り直す': {'reading': 'きをとりなおす', 'meaning': 'To pull oneself together / To refresh ones mood'},
+    '預かる': {'reading': 'あずかる', 'meaning': 'To look after / To take care of (luggage, etc.)'},
+    '預かっとく': {'reading': 'あずかっとく', 'meaning': "I'll look after it (for you)"},
+    'モー': {'reading': 'モー', 'meaning': 'Mo- (part of "Moment")'},
+    'メン': {'reading': 'メン', 'meaning': '-men (part of "Moment")'},
+    'プリー': {'reading': 'プリー', 'meaning': 'Plea- (part of "Please")'},
+
+    # Pronoun & Particle Fixes
+    'が': {'reading': 'が', 'meaning': 'Subject Marker (Particle)'},
+    'は': {'reading': 'は', 'meaning': 'Topic Marker (Particle)'},
+    'を': {'reading': 'を', 'meaning': 'Object Marker (Particle)'},
+
+    # Character Name Fixes (Literal Noun Traps)
+    '紬': {'reading': 'つむぎ', 'meaning': 'Tsumugi (Character Name)'},
+    # Emphatic & Slang Fixes
+    'てめえ': {'reading': 'てめえ', 'meaning': 'You (Very rude/aggressive)'},
+
+    # --- Structural Fixes (Stutters/Parsing) ---
+    'メ': {'reading': 'め', 'meaning': 'Part of "Dame" (No) or part of a word'},
+    '・': {'reading': '・', 'meaning': '(Punctuation / Name separator)'},
+    'ヶ': {'reading': 'ヶ', 'meaning': '(Counter / Place name marker)'},
+
+    # --- Context-Specific Terminology ---
+    '玉': {'reading': 'たま', 'meaning': 'Ball / Coin / Sphere / Attack orb'},
+    '弾': {'reading': 'たま', 'meaning': 'Bullet / Blast / Projectile'},
+}
+
+GRAMMAR_DICT = {
+    'ない': 'Not (Negative / Nonexistent)',
+    'する': 'To do / To make',
+    'てる': 'is... -ing (Contraction of te-iru)',
+    'で': 'At / By / With (Particle)',
+    'に': 'To / At (Target Particle)',
+    'を': 'Object Marker',
+    'は': 'Topic Marker (As for...)',
+    'が': 'Subject Marker',
+    'の': 'Possessive / Nominalizer (of / \'s)',
+    'と': 'And / With / Quotation',
+    'も': 'Also / Too',
+    'へ': 'To (Direction Particle)',
+    'から': 'From / Because',
+    'けど': 'But / Although',
+    'し': 'And / Besides',
+    'です': 'To be (Polite Copula)',
+    'ます': 'Polite Sentence Ending (Verb Suffix)',
+    'だ': 'To be (Plain Copula)',
+    'って': 'Topic Marker / Quotation ("You said..")',
+    'て': 'Conjunctive Particle (And then...)',
+    'た': 'Past Tense Marker',
+    'ね': 'Right? (Sentence Ending)',
+    'よ': 'Emphasis (Sentence Ending)',
+    'な': 'Don\'t / Right? (Sentence Ending)',
+    'ん': 'Explanation / Emphasis',
+    'う': 'Volitional (Let\'s...)',
+    'よう': 'Seem / Like / Way',
+    'こと': 'Thing (Intangible) / Nominalizer',
+    'もの': 'Thing (Tangible)',
+    'この': 'This (Near Speaker)',
+    'その': 'That (Near Listener)',
+    'あの': 'That (Distant)',
+    'どの': 'Which?',
+    'これ': 'This one',
+    'それ': 'That one',
+    'あれ': 'That one over there',
+    'どれ': 'Which one?',
+    'ここ': 'Here',
+    'そこ': 'There',
+    'あそこ': 'Over there',
+    'どこ': 'Where?',
+    'ちゃん': 'Suffix for familiar names (Cute/Female)',
+    'くん': 'Suffix for familiar names (Male)',
+    'さん': 'Suffix for names (Mr./Ms.)',
+    'ちゃう': 'To do completely / Regret (te-shimau)',
+    'なきゃ': 'Must do (nakereba)',
+    'じゃ': 'Well then / To be (de-wa)',
+    'たい': 'Want to...',
+    'れる': 'Passive / Potential Form',
+    'られる': 'Passive / Potential Form',
+    'させる': 'Causative Form',
+    'っ': 'Small Tsu (Glottal Stop)',
+    'ー': 'Long Vowel Mark'
+}
+
+# Levels the JLPT list gets wrong or lacks
+LEVEL_FIXES = {'さん': 'N5'}
+
+# Seed for names.json, written on first run
+DEFAULT_NAMES = {
+    "遊戯": "Yugi", "城之内": "Jonouchi", "海馬": "Kaiba", "本田": "Honda", "杏子": "Anzu",
+    "モクバ": "Mokuba", "ペガサス": "Pegasus", "獏良": "Bakura", "マリク": "Marik",
+    "サトシ": "Satoshi (Ash)", "カスミ": "Kasumi (Misty)", "タケシ": "Takeshi (Brock)",
+    "ピカチュウ": "Pikachu", "ムサシ": "Musashi (Jessie)", "コジロウ": "Kojiro (James)", "ニャース": "Nyarth (Meowth)",
+    "ナルト": "Naruto", "サスケ": "Sasuke", "サクラ": "Sakura", "カカシ": "Kakashi",
+    "ヒナタ": "Hinata", "シカマル": "Shikamaru", "イノ": "Ino", "チョウジ": "Choji",
+    "ゆっこ": "Yukko", "みお": "Mio", "麻衣": "Mai", "はかせ": "Hakase", "なの": "Nano", "阪本": "Sakamoto",
+    "唯": "Yui", "澪": "Mio", "律": "Ritsu", "紬": "Tsumugi", "梓": "Azusa", "憂": "Ui", "和": "Nodoka",
+    "こなた": "Konata", "かがみ": "Kagami", "つかさ": "Tsukasa", "みゆき": "Miyuki",
+    "レゴシ": "Legoshi", "ハル": "Haru", "ルイ": "Louis", "ジュノ": "Juno", "ジャック": "Jack",
+    "千代": "Chiyo", "大阪": "Osaka", "智": "Tomo", "暦": "Yomi", "榊": "Sakaki", "神楽": "Kagura",
+    "ランガ": "Langa", "レキ": "Reki", "ジョー": "Joe", "チェリー": "Cherry", "愛抱夢": "Adam",
+    "あず": "Azu (Azusa)"
+}
+
+_lexicon = None
+
+
+def load_names():
+    if not os.path.exists(NAME_FILE):
+        with open(NAME_FILE, 'w', encoding='utf8') as f:
+            json.dump(DEFAULT_NAMES, f, ensure_ascii=False, indent=4)
+    with open(NAME_FILE, 'r', encoding='utf8') as f:
+        return json.load(f)
+
+
+def load_jlpt():
+    try:
+        with open(JLPT_FILE, 'r', encoding='utf8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def read_local_dict(path=LOCAL_DICT):
+    """{word: [meaning, reading, source]} from dict.csv; the first successful row for a word wins."""
+    entries = {}
+    if not os.path.exists(path):
+        return entries
+    with open(path, 'r', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            if len(row) < 4 or row[3].strip() in ('', NOT_FOUND) or row[0].strip() in entries:
+                continue
+            entries[row[0].strip()] = [row[1].strip(), row[2].strip(), row[3].strip()]
+    return entries
+
+
+def source_signatures():
+    return {path: pipeline.file_signature(path) if os.path.exists(path) else None
+            for path in (NAME_FILE, JLPT_FILE, LOCAL_DICT)}
+
+
+def tables_fingerprint():
+    return pipeline.fingerprint(LEXICON_VERSION, MISTRANSLATION_FIXES, GRAMMAR_DICT, LEVEL_FIXES)
+
+
+def build_lexicon():
+    names = load_names()
+    jlpt = load_jlpt()
+    levels = dict(jlpt, **LEVEL_FIXES)
+
+    # Lowest precedence first, so later sources overwrite
+    words = {word: [None, None, None, level] for word, level in levels.items()}
+    for word, (meaning, reading, source) in read_local_dict().items():
+        words[word] = [meaning, reading, source, None]
+    for word, meaning in names.items():
+        words[word] = [meaning, None, NAME_MAP, None]
+    for word, meaning in GRAMMAR_DICT.items():
+        words[word] = [meaning, None, GRAMMAR, None]
+    for word, fix in MISTRANSLATION_FIXES.items():
+        words[word] = [fix['meaning'], fix['reading'], MANUAL_FIX, None]
+    for word, entry in words.items():
+        entry[3] = levels.get(word, "Unlabeled")
+
+    lexicon = {'tables': tables_fingerprint(), 'sources': source_signatures(),
+               'fingerprint': pipeline.fingerprint(tables_fingerprint(), names, jlpt), 'words': words}
+    os.makedirs(os.path.dirname(LEXICON_PATH), exist_ok=True)
+    tmp_path = LEXICON_PATH + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(lexicon, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, LEXICON_PATH)
+    return lexicon
+
+
+def load_lexicon():
+    """The compiled lexicon, rebuilt first if a source changed. Cached for the process."""
+    global _lexicon
+    if _lexicon is not None:
+        return _lexicon
+    lexicon = None
+    if os.path.exists(LEXICON_PATH):
+        with open(LEXICON_PATH, 'r', encoding='utf-8') as f:
+            lexicon = json.load(f)
+        if lexicon.get('tables') != tables_fingerprint() or lexicon.get('sources') != source_signatures():
+            lexicon = None
+    _lexicon = lexicon or build_lexicon()
+    return _lexicon
+
+
+def reload():
+    """Drops the cached lexicon and loads it again (rebuilt if a source file changed since)."""
+    global _lexicon
+    _lexicon = None
+    return load_lexicon()
+
+
+def fingerprint():
+    """Changes whenever a curated source (tables, names.json, JLPTWords.json) does."""
+    return load_lexicon()['fingerprint']
+
+
+def lookup(word):
+    """[meaning, reading, source, level] for a word; unknown words get [None, None, None, 'Unlabeled']."""
+    entry = load_lexicon()['words'].get(word)
+    return list(entry) if entry else [None, None, None, "Unlabeled"]
+
+
+def remember(word, meaning, reading, source):
+    """Appends a dictionary lookup to dict.csv and makes it visible to lookup() right away.
+    Failed lookups are not recorded, so the next run tries again."""
+    if source in (None, NOT_FOUND):
+        return
+    with open(LOCAL_DICT, 'a', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerow([word, meaning, reading, source])
+    words = load_lexicon()['words']
+    level = words[word][3] if word in words else "Unlabeled"
+    if word not in words or words[word][2] in (None, NOT_FOUND):
+        words[word] = [meaning, reading, source, level]
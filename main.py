@@ -8,6 +8,7 @@ import cv2
 import hashlib
 import time
 import asyncio  # <--- REQUIRED for Edge TTS
+import argparse
 from collections import Counter
 
 # --- IMPORTS ---
@@ -17,6 +18,17 @@ from jamdict import Jamdict
 import genanki
 from deep_translator import GoogleTranslator
 import edge_tts  # <--- NEW LIBRARY
+import numpy as np
+
+import pipeline
+import media_manifest
+import apkg_writer
+import vocab_store
+import core_tiers
+import lexicon
+import kana
+import sentence_scheduler
+import vocab_shards
 
 try:
     import cgi
@@ -37,60 +49,45 @@ os.makedirs('react-anime/public/anki', exist_ok=True)
 os.makedirs('react-anime/public/csv', exist_ok=True)
 os.makedirs(MEDIA_DIR, exist_ok=True)
 
-# 1. Load Exclusions
-excluded_words = set()
-if os.path.exists('core lists/1.5K.json'):
-    with open('core lists/1.5K.json', 'r', encoding='utf8') as f:
-        file_data = json.load(f)
-        for entry in file_data:
-            if isinstance(entry, dict) and 'word' in entry:
-                excluded_words.add(entry['word'])
-            elif isinstance(entry, str):
-                excluded_words.add(entry)
+# 1. Load Exclusions (the 1.5K core tier, from the shared core_tiers index)
+excluded_words = core_tiers.words_up_to('1.5K')
+if excluded_words:
     print(f"Loaded exclusion list. Total excluded words: {len(excluded_words)}")
 else:
     print("No exclusion list found. Proceeding without exclusions.")
 
-# 2. Load Names
-NAME_FILE = 'names.json'
-DEFAULT_NAMES = {
-    "遊戯": "Yugi", "城之内": "Jonouchi", "海馬": "Kaiba", "本田": "Honda", "杏子": "Anzu",
-    "モクバ": "Mokuba", "ペガサス": "Pegasus", "獏良": "Bakura", "マリク": "Marik",
-    "サトシ": "Satoshi (Ash)", "カスミ": "Kasumi (Misty)", "タケシ": "Takeshi (Brock)",
-    "ピカチュウ": "Pikachu", "ムサシ": "Musashi (Jessie)", "コジロウ": "Kojiro (James)", "ニャース": "Nyarth (Meowth)",
-    "ナルト": "Naruto", "サスケ": "Sasuke", "サクラ": "Sakura", "カカシ": "Kakashi",
-    "ヒナタ": "Hinata", "シカマル": "Shikamaru", "イノ": "Ino", "チョウジ": "Choji",
-    "ゆっこ": "Yukko", "みお": "Mio", "麻衣": "Mai", "はかせ": "Hakase", "なの": "Nano", "阪本": "Sakamoto",
-    "唯": "Yui", "澪": "Mio", "律": "Ritsu", "紬": "Tsumugi", "梓": "Azusa", "憂": "Ui", "和": "Nodoka",
-    "こなた": "Konata", "かがみ": "Kagami", "つかさ": "Tsukasa", "みゆき": "Miyuki",
-    "レゴシ": "Legoshi", "ハル": "Haru", "ルイ": "Louis", "ジュノ": "Juno", "ジャック": "Jack",
-    "千代": "Chiyo", "大阪": "Osaka", "智": "Tomo", "暦": "Yomi", "榊": "Sakaki", "神楽": "Kagura",
-    "ランガ": "Langa", "レキ": "Reki", "ジョー": "Joe", "チェリー": "Cherry", "愛抱夢": "Adam",
-    "あず": "Azu (Azusa)"
-}
-
-if not os.path.exists(NAME_FILE):
-    with open(NAME_FILE, 'w', encoding='utf8') as f:
-        json.dump(DEFAULT_NAMES, f, ensure_ascii=False, indent=4)
-
-
-def load_names():
-    if os.path.exists(NAME_FILE):
-        with open(NAME_FILE, 'r', encoding='utf8') as f:
-            return json.load(f)
-    return DEFAULT_NAMES
 
+def load_known_words(path):
+    """
+    Reads a learner's known-word list. Accepts a JSON list (core list format),
+    a plain one-word-per-line file, or an Anki "Notes in Plain Text" export
+    where the first field of each note is the word.
+    """
+    words = set()
+    with open(path, 'r', encoding='utf8') as f:
+        if path.lower().endswith('.json'):
+            data = json.load(f)
+            for entry in (data.keys() if isinstance(data, dict) else data):
+                if isinstance(entry, dict) and 'word' in entry:
+                    entry = entry['word']
+                if isinstance(entry, str):
+                    words.add(entry.strip())
+        else:
+            delimiter = ',' if path.lower().endswith('.csv') else '\t'
+            for row in csv.reader(f, delimiter=delimiter):
+                # Anki exports start with '#separator:tab' style headers
+                if not row or row[0].startswith('#'): continue
+                field = re.sub(r'<[^>]+>', '', row[0])  # HTML formatting
+                field = re.sub(r'\[[^\]]*\]', '', field)  # Anki furigana: 漢字[かんじ]
+                words.add(field.replace(' ', '').strip())
+    words.discard('')
+    return words
 
-name_map = load_names()
 
-# 3. Load JLPT Data
-try:
-    with open('JLPTWords.json', 'r', encoding='utf8') as file:
-        jlpt_data = json.load(file)
-except:
-    jlpt_data = {}
+# 2. Load Lexicon (fixes, grammar, names, JLPT levels and dict.csv, see lexicon.py)
+print(f"Loaded lexicon: {len(lexicon.load_lexicon()['words'])} words.")
 
-# 4. Initialize Tools
+# 3. Initialize Tools
 print("Initializing dictionary...")
 try:
     jam = Jamdict()
@@ -136,14 +133,20 @@ def find_video_fuzzy(show_folder, episode_name):
     return None
 
 
-def extract_screenshot(video_path, timestamp_str, output_filename, show):
-    # Sanitize the show name for the directory path to avoid encoding issues
-    safe_show = re.sub(r'[^\x00-\x7f]', '', show).strip() or "Show"
-    show_media_dir = os.path.join(MEDIA_DIR, safe_show)
-    output_path = os.path.join(show_media_dir, output_filename)
+def screenshot_path(show, output_filename):
+    # Sanitized (ASCII-only) show folder, to avoid encoding issues in the path
+    return os.path.join(MEDIA_DIR, media_manifest.media_folders(show)[-1], output_filename)
+
+
+def extract_screenshot(video_path, timestamp_str, output_filename, show, create=True):
+    """With create=False only reports whether the screenshot already exists."""
+    output_path = screenshot_path(show, output_filename)
+    show_media_dir = os.path.dirname(output_path)
 
     if os.path.exists(output_path):
         return True
+    if not create:
+        return False
 
     if not os.path.exists(show_media_dir):
         os.makedirs(show_media_dir, exist_ok=True)
@@ -172,46 +175,6 @@ def generate_id(name, salt=0):
     return int(hash_obj.hexdigest(), 16) % 10 ** 10
 
 
-def kana_to_romaji(text):
-    consonants = {
-        'カ': 'ka', 'キ': 'ki', 'ク': 'ku', 'ケ': 'ke', 'コ': 'ko',
-        'サ': 'sa', 'シ': 'shi', 'ス': 'su', 'セ': 'se', 'ソ': 'so',
-        'タ': 'ta', 'チ': 'chi', 'ツ': 'tsu', 'テ': 'te', 'ト': 'to',
-        'ナ': 'na', 'ニ': 'ni', 'ヌ': 'nu', 'ネ': 'ne', 'ノ': 'no',
-        'ハ': 'ha', 'ヒ': 'hi', 'フ': 'fu', 'ヘ': 'he', 'ホ': 'ho',
-        'マ': 'ma', 'ミ': 'mi', 'ム': 'mu', 'メ': 'me', 'モ': 'mo',
-        'ヤ': 'ya', 'ユ': 'yu', 'ヨ': 'yo',
-        'ラ': 'ra', 'リ': 'ri', 'ル': 'ru', 'レ': 're', 'ロ': 'ro',
-        'ワ': 'wa', 'ヲ': 'wo', 'ン': 'n',
-        'ガ': 'ga', 'ギ': 'gi', 'グ': 'gu', 'ゲ': 'ge', 'ゴ': 'go',
-        'ザ': 'za', 'ジ': 'ji', 'ズ': 'zu', 'ゼ': 'ze', 'ゾ': 'zo',
-        'ダ': 'da', 'ヂ': 'ji', 'ヅ': 'zu', 'デ': 'de', 'ド': 'do',
-        'バ': 'ba', 'ビ': 'bi', 'ブ': 'bu', 'ベ': 'be', 'ボ': 'bo',
-        'パ': 'pa', 'ピ': 'pi', 'プ': 'pu', 'ペ': 'pe', 'ポ': 'po',
-        'ア': 'a', 'イ': 'i', 'ウ': 'u', 'エ': 'e', 'オ': 'o',
-        'ー': '', '・': ' '
-    }
-    res = ""
-    i = 0
-    while i < len(text):
-        char = text[i]
-        if char == 'ッ' and i + 1 < len(text):
-            next_romaji = consonants.get(text[i + 1], '')
-            if next_romaji:
-                res += next_romaji[0]
-                i += 1
-                continue
-        if i + 1 < len(text) and text[i + 1] in ['ャ', 'ュ', 'ョ']:
-            base = consonants.get(char, '')[:-1]
-            small = {'ャ': 'ya', 'ュ': 'yu', 'ョ': 'yo'}
-            res += base + small.get(text[i + 1], '')
-            i += 2
-            continue
-        res += consonants.get(char, char)
-        i += 1
-    return res.capitalize()
-
-
 def is_garbage_token(base_word):
     if not re.match(r'^[\u3040-\u309f\u30a0-\u30ff\u4e00-\u9faf\u3005\u30fc]+$', base_word):
         return True
@@ -255,17 +218,6 @@ def bulk_translate(sentences, batch_size=50):
     return translated_dict
 
 
-def check_local_dict(word, filename='dict.csv'):
-    if not os.path.exists(filename):
-        return None
-    with open(filename, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        for row in reader:
-            if row and row[0].strip() == word:
-                return row[1].strip(), row[2].strip(), row[3].strip()
-    return None
-
-
 def get_online_definition(word):
     try:
         url = f"https://jisho.org/api/v1/search/words?keyword={word}"
@@ -282,14 +234,10 @@ def get_online_definition(word):
             return formatted_def, reading, "Jisho"
     except:
         pass
-    return "No definition found", word, "None"
+    return "No definition found", word, lexicon.NOT_FOUND
 
 
 def get_definition(word, normalized_word):
-    local_result = check_local_dict(word)
-    if local_result:
-        return local_result
-
     search_term = normalized_word if normalized_word else word
     result = jam.lookup(search_term)
 
@@ -328,26 +276,34 @@ async def _generate_audio_edge(text, output_file, voice="ja-JP-NanamiNeural"):
         return False
 
 
-def generate_audio_file(text, filename_prefix, show_name):
-    """
-    Wrapper that runs the async Edge TTS in a sync way.
-    """
-    if not text:
-        return None, ""
+def has_content(path):
+    return os.path.exists(path) and os.path.getsize(path) > 0
+
 
+def audio_file_path(filename_prefix, show_name):
+    """Returns (filename, full path) of the mp3 for `filename_prefix`."""
     # Clean filename
     safe_filename = re.sub(r'[\\/*?:"<>|]', "", filename_prefix)
     safe_filename = safe_filename[:100]  # Limit length
     filename = f"{safe_filename}.mp3"
+    return filename, os.path.join(MEDIA_DIR, show_name, filename)
+
+
+def generate_audio_file(text, filename_prefix, show_name, create=True):
+    """
+    Wrapper that runs the async Edge TTS in a sync way.
+    With create=False only an already generated file is returned.
+    """
+    if not text:
+        return None, ""
 
-    show_media_dir = os.path.join(MEDIA_DIR, show_name)
+    filename, full_path = audio_file_path(filename_prefix, show_name)
+    show_media_dir = os.path.dirname(full_path)
     if not os.path.exists(show_media_dir):
         os.makedirs(show_media_dir, exist_ok=True)
 
-    full_path = os.path.join(show_media_dir, filename)
-
-    # Check cache/existence
-    if not os.path.exists(full_path):
+    # Check cache/existence (a failed TTS call can leave an empty file behind)
+    if not has_content(full_path) and create:
         # Run async function in sync context
         try:
             asyncio.run(_generate_audio_edge(text, full_path))
@@ -362,186 +318,21 @@ def generate_audio_file(text, filename_prefix, show_name):
     return None, ""
 
 
-# ==========================================
-# DICTIONARY CONSTANTS
-# ==========================================
-
-# --- NEW TABLE: FREQUENT MISTRANSLATIONS ---
-MISTRANSLATION_FIXES = {
-    # --- 共通・代名詞・応答 ---
-    '私': {'reading': 'わたし', 'meaning': 'I / Me'},
-    '僕': {'reading': 'ぼく', 'meaning': 'I / Me (Male pronoun)'},
-    '俺': {'reading': 'おれ', 'meaning': 'I / Me (Masculine)'},
-    'あんた': {'reading': 'あんた', 'meaning': 'You (informal/blunt)'},
-    '奴': {'reading': 'やつ', 'meaning': 'Guy / Person / Fellow / That thing'},
-    '人': {'reading': 'ひと', 'meaning': 'Person / People'},
-    '様': {'reading': 'さま', 'meaning': 'Sama (Honorific suffix)'},
-    'この': {'reading': 'この', 'meaning': 'This (Demonstrative)'},
-    '今': {'reading': 'いま', 'meaning': 'Now'},
-    '何': {'reading': 'なに', 'meaning': 'What'},
-    'うん': {'reading': 'うん', 'meaning': 'Yeah / Yes (casual)'},
-    'ううん': {'reading': 'ううん', 'meaning': 'No (casual)'},
-    'いえ': {'reading': 'いえ', 'meaning': 'No / Not at all (Polite interjection)'},
-    'ダメ': {'reading': 'だめ', 'meaning': 'No / Bad / Forbidden / Useless'},
-
-    # --- 助詞・感嘆詞・フィラー ---
-    'ねえ': {'reading': 'ねえ', 'meaning': 'Hey! / Look! / (seeking agreement) / No / Not (Slang negative)'},
-    'なあ': {'reading': 'なあ', 'meaning': 'Hey / I wonder (sentence ending particle)'},
-    'ちょっと': {'reading': 'ちょっと', 'meaning': 'A little / A moment'},
-    'えっと': {'reading': 'えっと', 'meaning': 'Umm... / Let me see... (Filler word)'},
-    'って': {'reading': 'って', 'meaning': 'Quotation particle / "They say..." / Topic marker'},
-    'コラ': {'reading': 'こら', 'meaning': 'Hey! / Listen! / Watch out! (Interjection)'},
-    'ッ': {'reading': 'ッ', 'meaning': '(Glottal stop / Emphasis marker / Clipped sound)'},
-    'リ': {'reading': 'り', 'meaning': '(Stuttering sound / Part of a name)'},
-    'くらい': {'reading': 'くらい', 'meaning': 'Around / Approximately (Time/Amount)'},
-
-    # --- 文法・活用形 ---
-    'てる': {'reading': 'てる', 'meaning': 'is... -ing (Contraction of te-iru)'},
-    'ます': {'reading': 'ます', 'meaning': 'Polite verb ending'},
-    'たい': {'reading': 'たい', 'meaning': 'Want to... (Verb suffix)'},
-    'そう': {'reading': 'そう', 'meaning': 'So / That way / Seeming'},
-    'やがる': {'reading': 'やがる', 'meaning': 'Pejorative auxiliary verb (indicates contempt)'},
-    'がん': {'reading': 'がん', 'meaning': 'Rough version of "yagaru" (not cancer)'},
-    'やん': {'reading': 'やん', 'meaning': 'Part of contraction (yaru -> yannakya) / Emphasis'},
-    '前': {'reading': 'まえ', 'meaning': 'Before / Front / Previous'},
-
-    # --- 関西弁 (Kansai-ben) ---
-    'なあかん': {'reading': 'なあかん', 'meaning': 'Must do / Have to (Kansai-ben)'},
-    'へん': {'reading': 'へん', 'meaning': 'Negative verb ending (Kansai-ben "nai")'},
-
-    # --- 専門用語・固有名詞 (作品別) ---
-    # Lucky Star / K-ON! / School Context
-    '占う': {'reading': 'うらなう', 'meaning': 'To tell fortunes / To predict'},
-    '外れる': {'reading': 'はずれる', 'meaning': 'To miss / To lose (lottery) / To fail'},
-    'プレイ': {'reading': 'プレイ', 'meaning': 'Play (game/sport) / Video Game Play'},
-    '部長': {'reading': 'ぶちょう', 'meaning': 'Club President (School Context)'},
-    'お茶': {'reading': 'おちゃ', 'meaning': 'Tea / (ready to drink)'},
-    '入る': {'reading': 'はいる', 'meaning': 'To enter / To be poured (tea) / To be ready'},
-    '王道': {'reading': 'おうどう', 'meaning': 'The classic way / Royal road / Standard path'},
-    '唯': {'reading': 'ゆい', 'meaning': 'Yui (Character Name)'},
-    'ロンドン': {'reading': 'ろんどん', 'meaning': 'London'},
-    'ネス湖': {'reading': 'ねすこ', 'meaning': 'Loch Ness'},
-    '皆勤賞': {'reading': 'かいきんしょう', 'meaning': 'Perfect Attendance Award'},
-    '教えの庭': {'reading': 'おしえのにわ', 'meaning': 'Garden of learning / School campus'},
-
-    # Gaming / Battle (Bakugan / Yu-Gi-Oh! / SK8)
-    '決闘': {'reading': 'けっとう', 'meaning': 'Duel'},
-    '召喚': {'reading': 'しょうかん', 'meaning': 'Summon / Summoning (Monster)'},
-    '融合': {'reading': 'ゆうごう', 'meaning': 'Fusion / Polymerization'},
-    '術': {'reading': 'じゅつ', 'meaning': 'Jutsu / Technique / Art'},
-    '腕': {'reading': 'うで', 'meaning': 'Skill / Ability (in games/sports)'},
-    '読み': {'reading': 'よみ', 'meaning': 'Predicting the opponent / Reading the game'},
-    '爆': {'reading': 'ばく', 'meaning': 'Baku (Explosive/Bakugan prefix)'},
-    '向く': {'reading': 'むく', 'meaning': 'To face / To point toward'},
-    '仲間': {'reading': 'なかま', 'meaning': 'Friend / Comrade / Teammate'},
-    '愛抱夢': {'reading': 'あだむ', 'meaning': 'Adam (Antagonist Name)'},
-    'あぶねえ': {'reading': 'あぶねえ', 'meaning': 'Dangerous! / Watch out!'},
-
-    # Beastars / Shirokuma Cafe
-    '食殺': {'reading': 'しょくさつ', 'meaning': 'Predation / Meat-eating murder'},
-    '隕石祭': {'reading': 'いんせきさい', 'meaning': 'Meteor Festival'},
-    'テム': {'reading': 'てむ', 'meaning': 'Tem (Character Name)'},
-    '笹子': {'reading': 'ささこ', 'meaning': 'Sasako (Waitress)'},
-    'ゾウガメ': {'reading': 'ぞうがめ', 'meaning': 'Giant Tortoise'},
-    'パンダママ': {'reading': 'ぱんだまま', 'meaning': 'Panda-mama'},
-    '常勤パンダ': {'reading': 'じょうきんぱんだ', 'meaning': 'Full-time Panda'},
-
-    # WataMote / Saiki K / Others
-    'ヘヘ': {'reading': 'へへ', 'meaning': 'Heh-heh (Awkward laughter)'},
-    'おっふ': {'reading': 'おっふ', 'meaning': 'Offu! (Awestruck sound)'},
-    'くだらない': {'reading': 'くだらない', 'meaning': 'Stupid / Worthless / Trivial'},
-    '喪女': {'reading': 'もじょ', 'meaning': 'Mojo (Unpopular woman / Femcel slang)'},
-    'もこっち': {'reading': 'もこっち', 'meaning': 'Mokocchi (Nickname)'},
-    '独り言': {'reading': 'ひとりごと', 'meaning': 'Speaking to oneself / Monologue'},
-
-    # その他修正
-    'さいふ': {'reading': 'さいふ', 'meaning': 'Wallet / Purse'},
-    'チュー': {'reading': 'ちゅう', 'meaning': 'Kiss (onomatopoeia)'},
-    '分': {'reading': 'ぶん', 'meaning': 'Part / Portion / Amount / Share'},
-    'ド': {'reading': 'ド', 'meaning': 'D (as in Dreadnought) / Super-'},
-    '目': {'reading': 'め', 'meaning': 'Eye / (part of idiom "teach a lesson")'},
-    '気を取り直す': {'reading': 'きをとりなおす', 'meaning': 'To pull oneself together / To refresh ones mood'},
-    '預かる': {'reading': 'あずかる', 'meaning': 'To look after / To take care of (luggage, etc.)'},
-    '預かっとく': {'reading': 'あずかっとく', 'meaning': "I'll look after it (for you)"},
-    'モー': {'reading': 'モー', 'meaning': 'Mo- (part of "Moment")'},
-    'メン': {'reading': 'メン', 'meaning': '-men (part of "Moment")'},
-    'プリー': {'reading': 'プリー', 'meaning': 'Plea- (part of "Please")'},
-
-    # Pronoun & Particle Fixes
-    'が': {'reading': 'が', 'meaning': 'Subject Marker (Particle)'},
-    'は': {'reading': 'は', 'meaning': 'Topic Marker (Particle)'},
-    'を': {'reading': 'を', 'meaning': 'Object Marker (Particle)'},
-
-    # Character Name Fixes (Literal Noun Traps)
-    '紬': {'reading': 'つむぎ', 'meaning': 'Tsumugi (Character Name)'},
-    # Emphatic & Slang Fixes
-    'てめえ': {'reading': 'てめえ', 'meaning': 'You (Very rude/aggressive)'},
-
-    # --- Structural Fixes (Stutters/Parsing) ---
-    'メ': {'reading': 'め', 'meaning': 'Part of "Dame" (No) or part of a word'},
-    '・': {'reading': '・', 'meaning': '(Punctuation / Name separator)'},
-    'ヶ': {'reading': 'ヶ', 'meaning': '(Counter / Place name marker)'},
-
-    # --- Context-Specific Terminology ---
-    '玉': {'reading': 'たま', 'meaning': 'Ball / Coin / Sphere / Attack orb'},
-    '弾': {'reading': 'たま', 'meaning': 'Bullet / Blast / Projectile'},
-}
+def media_tier(rank, full_media=None, audio_media=None):
+    """
+    Budget tier for the word at frequency rank `rank` (0-based, deck words only).
+    'full' = screenshot + word/sentence audio, 'audio' = audio only, 'text' = no new media.
+    A budget of None is unlimited, except that an audio budget without a full one
+    means no screenshots at all (full_media counts as 0).
+    """
+    if full_media is None:
+        full_media = None if audio_media is None else 0
+    if full_media is None or rank < full_media:
+        return 'full'
+    if audio_media is None or rank < full_media + audio_media:
+        return 'audio'
+    return 'text'
 
-GRAMMAR_DICT = {
-    'ない': 'Not (Negative / Nonexistent)',
-    'する': 'To do / To make',
-    'てる': 'is... -ing (Contraction of te-iru)',
-    'で': 'At / By / With (Particle)',
-    'に': 'To / At (Target Particle)',
-    'を': 'Object Marker',
-    'は': 'Topic Marker (As for...)',
-    'が': 'Subject Marker',
-    'の': 'Possessive / Nominalizer (of / \'s)',
-    'と': 'And / With / Quotation',
-    'も': 'Also / Too',
-    'へ': 'To (Direction Particle)',
-    'から': 'From / Because',
-    'けど': 'But / Although',
-    'し': 'And / Besides',
-    'です': 'To be (Polite Copula)',
-    'ます': 'Polite Sentence Ending (Verb Suffix)',
-    'だ': 'To be (Plain Copula)',
-    'って': 'Topic Marker / Quotation ("You said..")',
-    'て': 'Conjunctive Particle (And then...)',
-    'た': 'Past Tense Marker',
-    'ね': 'Right? (Sentence Ending)',
-    'よ': 'Emphasis (Sentence Ending)',
-    'な': 'Don\'t / Right? (Sentence Ending)',
-    'ん': 'Explanation / Emphasis',
-    'う': 'Volitional (Let\'s...)',
-    'よう': 'Seem / Like / Way',
-    'こと': 'Thing (Intangible) / Nominalizer',
-    'もの': 'Thing (Tangible)',
-    'この': 'This (Near Speaker)',
-    'その': 'That (Near Listener)',
-    'あの': 'That (Distant)',
-    'どの': 'Which?',
-    'これ': 'This one',
-    'それ': 'That one',
-    'あれ': 'That one over there',
-    'どれ': 'Which one?',
-    'ここ': 'Here',
-    'そこ': 'There',
-    'あそこ': 'Over there',
-    'どこ': 'Where?',
-    'ちゃん': 'Suffix for familiar names (Cute/Female)',
-    'くん': 'Suffix for familiar names (Male)',
-    'さん': 'Suffix for names (Mr./Ms.)',
-    'ちゃう': 'To do completely / Regret (te-shimau)',
-    'なきゃ': 'Must do (nakereba)',
-    'じゃ': 'Well then / To be (de-wa)',
-    'たい': 'Want to...',
-    'れる': 'Passive / Potential Form',
-    'られる': 'Passive / Potential Form',
-    'させる': 'Causative Form',
-    'っ': 'Small Tsu (Glottal Stop)',
-    'ー': 'Long Vowel Mark'
-}
 
 HOVER_CSS = """
 .expression { font-size: 50px; cursor: pointer; position: relative; display: inline-block; font-weight: bold; }
@@ -562,291 +353,820 @@ STYLE_VOCAB = """
 
 
 # ==========================================
-# CORE FUNCTION: PROCESS SINGLE SHOW
+# ANKI MODELS
 # ==========================================
 
-def process_single_show(show):
-    show_path = os.path.join(TRANSCRIPT_DIR, show)
-    if not os.path.isdir(show_path):
-        return
+# --- UPDATED FIELDS: Added WordAudio, SentenceAudio and MediaTier ---
+NOTE_FIELDS = ['Expression', 'Reading', 'Meaning', 'Level', 'Frequency', 'Sentence', 'Translation', 'Episodes',
+               'Image', 'WordAudio', 'SentenceAudio', 'MediaTier']
 
-    print(f"\n===============================")
-    print(f"PROCESSING SHOW: {show}")
-    print(f"===============================")
+VOCAB_TEMPLATE = {
+    'name': 'Vocab Card',
+    # Added {{WordAudio}} to Front
+    'qfmt': '<div class="expression"><span class="reading-hover">{{Reading}}</span>{{Expression}}</div><br>{{WordAudio}}<br><div class="level">{{Level}}</div>',
+    # Added {{SentenceAudio}} to Back
+    'afmt': '{{FrontSide}}<hr id="answer"><div class="meaning">{{Meaning}}</div><div class="sentence">{{Sentence}}<br>{{SentenceAudio}}</div><div class="translation">{{Translation}}</div><div class="screenshot">{{Image}}</div><div class="footer">Found in: {{Episodes}} | Count: {{Frequency}}x</div>'
+}
 
-    MODEL_ID_VOCAB = generate_id(show, salt=1)
-    DECK_ID_VOCAB = generate_id(show, salt=2)
-    MODEL_ID_SENTENCE = generate_id(show, salt=3)
-    DECK_ID_SENTENCE = generate_id(show, salt=4)
-    CACHE_FILE = f"cache/{show}_cache.json"
+SENTENCE_TEMPLATE = {
+    'name': 'Sentence Card',
+    # Added {{SentenceAudio}} to Front
+    'qfmt': '<div class="sentence-front">{{Sentence}}<br>{{SentenceAudio}}</div>',
+    'afmt': '{{FrontSide}}<hr id="answer"><div class="expression"><span class="reading-hover">{{Reading}}</span>{{Expression}}</div><br>{{WordAudio}}<div class="level">{{Level}}</div><div class="meaning">{{Meaning}}</div><div class="translation">{{Translation}}</div><div class="screenshot">{{Image}}</div>'
+}
 
-    def load_cache_local():
-        if os.path.exists(CACHE_FILE):
-            with open(CACHE_FILE, 'r', encoding='utf8') as f:
-                return json.load(f)
-        return {}
+VOCAB_MODEL_NAME = 'Japanese Anime Vocab v11 (Screenshots + Audio)'
+SENTENCE_MODEL_NAME = 'Japanese Anime Sentence v9 (Screenshots + Audio)'
 
-    def save_cache_local(cache_data):
-        with open(CACHE_FILE, 'w', encoding='utf8') as f:
-            json.dump(cache_data, f, ensure_ascii=False, indent=4)
-
-    # --- UPDATED FIELDS: Added WordAudio and SentenceAudio ---
-    fields = [{'name': 'Expression'}, {'name': 'Reading'}, {'name': 'Meaning'}, {'name': 'Level'},
-              {'name': 'Frequency'}, {'name': 'Sentence'}, {'name': 'Translation'},
-              {'name': 'Episodes'}, {'name': 'Image'}, {'name': 'WordAudio'}, {'name': 'SentenceAudio'}]
-
-    vocab_model = genanki.Model(
-        MODEL_ID_VOCAB, 'Japanese Anime Vocab v10 (Screenshots + Audio)', fields=fields,
-        templates=[{
-            'name': 'Vocab Card',
-            # Added {{WordAudio}} to Front
-            'qfmt': '<div class="expression"><span class="reading-hover">{{Reading}}</span>{{Expression}}</div><br>{{WordAudio}}<br><div class="level">{{Level}}</div>',
-            # Added {{SentenceAudio}} to Back
-            'afmt': '{{FrontSide}}<hr id="answer"><div class="meaning">{{Meaning}}</div><div class="sentence">{{Sentence}}<br>{{SentenceAudio}}</div><div class="translation">{{Translation}}</div><div class="screenshot">{{Image}}</div><div class="footer">Found in: {{Episodes}} | Count: {{Frequency}}x</div>'
-        }], css=STYLE_VOCAB
-    )
-
-    sentence_model = genanki.Model(
-        MODEL_ID_SENTENCE, 'Japanese Anime Sentence v8 (Screenshots + Audio)', fields=fields,
-        templates=[{
-            'name': 'Sentence Card',
-            # Added {{SentenceAudio}} to Front
-            'qfmt': '<div class="sentence-front">{{Sentence}}<br>{{SentenceAudio}}</div>',
-            'afmt': '{{FrontSide}}<hr id="answer"><div class="expression"><span class="reading-hover">{{Reading}}</span>{{Expression}}</div><br>{{WordAudio}}<div class="level">{{Level}}</div><div class="meaning">{{Meaning}}</div><div class="translation">{{Translation}}</div><div class="screenshot">{{Image}}</div>'
-        }], css=STYLE_VOCAB
-    )
-
-    vocab_deck = genanki.Deck(DECK_ID_VOCAB, f'Anime Vocabulary:: {show}')
-    sentence_deck = genanki.Deck(DECK_ID_SENTENCE, f'Anime Sentences:: {show}')
-
-    translation_cache = load_cache_local()
-    all_words = []
-    word_stats = {}
-    word_pos = {}
-    word_reading_katakana = {}
-    word_normalized = {}
-    media_files_to_package = []
-    video_search_path = os.path.join(f'shows/{show}/')
 
-    print(f"Scanning transcripts in: {show_path}")
+def build_models(show):
+    fields = [{'name': name} for name in NOTE_FIELDS]
+    vocab_model = genanki.Model(generate_id(show, salt=1), VOCAB_MODEL_NAME, fields=fields,
+                                templates=[VOCAB_TEMPLATE], css=STYLE_VOCAB)
+    sentence_model = genanki.Model(generate_id(show, salt=3), SENTENCE_MODEL_NAME, fields=fields,
+                                   templates=[SENTENCE_TEMPLATE], css=STYLE_VOCAB)
+    return vocab_model, sentence_model
+
+
+# Everything the define stage reads besides the words themselves
+LEXICON_FP = lexicon.fingerprint()
+
+
+def refresh_sources():
+    """Watch mode: picks up edits to names.json, JLPTWords.json, dict.csv and the core lists."""
+    global LEXICON_FP, excluded_words
+    lexicon.reload()
+    core_tiers.reload()
+    LEXICON_FP = lexicon.fingerprint()
+    excluded_words = core_tiers.words_up_to('1.5K')
+
+
+# ==========================================
+# BUILD STAGES
+# ==========================================
+# process_single_show runs these in order. Each stage stores its output with a
+# fingerprint of its inputs (see pipeline.py), so e.g. editing lexicon.MISTRANSLATION_FIXES
+# re-runs define/package/csv but leaves the parsed transcripts and media alone.
+
+STAGES = ['parse', 'tokenize', 'define', 'translate', 'media', 'package', 'csv']
+VIDEO_DIR = 'shows'
+SUBTITLE_EXTS = ('.srt', '.ass')
+
 
+def list_episodes(show):
+    """Maps episode name -> transcript path, transcript signature and matching video."""
+    show_path = os.path.join(TRANSCRIPT_DIR, show)
+    video_search_path = os.path.join(VIDEO_DIR, show)
+    episodes = {}
     for path in os.scandir(show_path):
-        is_srt = path.name.endswith('.srt')
-        is_ass = path.name.endswith('.ass')
-        if is_srt or is_ass:
+        if path.name.endswith(SUBTITLE_EXTS):
             ep_name = path.name.replace('.srt', '').replace('.ass', '')
-            video_file = find_video_fuzzy(video_search_path, ep_name)
-            if video_file:
-                print(f"  [Info] Video Found: {os.path.basename(video_file)}")
-            else:
-                pass
-
-            try:
-                with open(path, 'r', encoding='utf8') as file:
-                    lines = file.read().split('\n')
-            except:
-                continue
-
-            parsed_lines = []
-            if is_srt:
-                for i, line in enumerate(lines):
-                    if "-->" in line:
-                        start_time = line.split("-->")[0].strip()
-                        text_lines = []
-                        j = i + 1
-                        while j < len(lines) and lines[j].strip() != "" and not lines[j].strip().isdigit():
-                            t = lines[j].strip()
-                            clean_t = re.sub(r'\{.*?\}', '', t)
-                            clean_t = re.sub(r'[（\(].*?[）\)]', '', clean_t).strip()
-                            if clean_t and "-->" not in clean_t:
-                                text_lines.append(clean_t)
-                            j += 1
-                        full_text = " ".join(text_lines)
-                        if full_text and "♪" not in full_text:
-                            parsed_lines.append((full_text, start_time))
-            elif is_ass:
-                for text in lines:
-                    if text.startswith('Dialogue:'):
-                        parts = text.split(',', 9)
-                        if len(parts) > 9:
-                            start_time = parts[1].strip()
-                            content = parts[9].strip()
-                            if '♪' in content: continue
-                            clean_text = re.sub(r'\{.*?\}', '', content)
-                            clean_text = clean_text.replace(r'\N', ' ').replace(r'\n', ' ').replace(r'\h', ' ')
-                            clean_text = re.sub(r'[（\(].*?[）\)]', '', clean_text).strip()
-                            if clean_text:
-                                parsed_lines.append((clean_text, start_time))
-
-            for clean_text, timestamp in parsed_lines:
-                current_score = score_sentence(clean_text)
-                if current_score <= 0: continue
-                sentence_tokens = []
-                for token in sudachi_obj.tokenize(clean_text, sudachi_mode):
-                    base = token.dictionary_form()
-                    norm = token.normalized_form()
-                    if is_garbage_token(base): continue
-                    sentence_tokens.append(base)
-                    all_words.append(base)
-                    pos_str = ",".join(token.part_of_speech())
-                    reading_str = token.reading_form()
-                    if base not in word_pos:
-                        word_pos[base] = pos_str
-                        word_reading_katakana[base] = reading_str
-                        word_normalized[base] = norm
-                    if base not in word_stats:
-                        word_stats[base] = {'raw': clean_text, 'bolded': '', 'score': -999, 'episodes': set(),
-                                            'tokens': [], 'video': None, 'timestamp': None}
-                    word_stats[base]['episodes'].add(ep_name)
-                    if current_score > word_stats[base]['score']:
-                        bolded = re.sub(f"({re.escape(token.surface())})", r"<b>\1</b>", clean_text, count=1)
-                        word_stats[base].update(
-                            {'raw': clean_text, 'bolded': bolded, 'score': current_score, 'tokens': [],
-                             'video': video_file, 'timestamp': timestamp})
-                for token_base in sentence_tokens:
-                    if token_base in word_stats and word_stats[token_base]['raw'] == clean_text:
-                        word_stats[token_base]['tokens'] = sentence_tokens
-
-    counts = Counter(all_words)
-    csv_data = []
-    print("Identifying sentences for bulk translation...")
-    sentences_to_translate = []
-    for word, info in word_stats.items():
-        clean_sentence = info['raw'].strip() if info['raw'] else None
-        if clean_sentence and clean_sentence not in translation_cache:
-            sentences_to_translate.append(clean_sentence)
-    sentences_to_translate = list(set(sentences_to_translate))
+            episodes[ep_name] = {'file': path.path, 'sig': pipeline.file_signature(path.path),
+                                 'video': find_video_fuzzy(video_search_path, ep_name)}
+    return episodes
+
+
+def parse_subtitle_file(file_path):
+    """Returns [[clean_text, start_time], ...] for an .srt or .ass file."""
+    try:
+        with open(file_path, 'r', encoding='utf8') as file:
+            lines = file.read().split('\n')
+    except:
+        return []
+
+    parsed_lines = []
+    if file_path.endswith('.srt'):
+        for i, line in enumerate(lines):
+            if "-->" in line:
+                start_time = line.split("-->")[0].strip()
+                text_lines = []
+                j = i + 1
+                while j < len(lines) and lines[j].strip() != "" and not lines[j].strip().isdigit():
+                    t = lines[j].strip()
+                    clean_t = re.sub(r'\{.*?\}', '', t)
+                    clean_t = re.sub(r'[（\(].*?[）\)]', '', clean_t).strip()
+                    if clean_t and "-->" not in clean_t:
+                        text_lines.append(clean_t)
+                    j += 1
+                full_text = " ".join(text_lines)
+                if full_text and "♪" not in full_text:
+                    parsed_lines.append([full_text, start_time])
+    else:
+        for text in lines:
+            if text.startswith('Dialogue:'):
+                parts = text.split(',', 9)
+                if len(parts) > 9:
+                    start_time = parts[1].strip()
+                    content = parts[9].strip()
+                    if '♪' in content: continue
+                    clean_text = re.sub(r'\{.*?\}', '', content)
+                    clean_text = clean_text.replace(r'\N', ' ').replace(r'\n', ' ').replace(r'\h', ' ')
+                    clean_text = re.sub(r'[（\(].*?[）\)]', '', clean_text).strip()
+                    if clean_text:
+                        parsed_lines.append([clean_text, start_time])
+    return parsed_lines
+
+
+def stage_parse(episodes, previous):
+    """Only episodes whose transcript changed are parsed again."""
+    previous = (previous or {}).get('episodes', {})
+    parsed = {}
+    for ep_name, ep in episodes.items():
+        old = previous.get(ep_name)
+        lines = old['lines'] if old and old['sig'] == ep['sig'] else parse_subtitle_file(ep['file'])
+        parsed[ep_name] = {'sig': ep['sig'], 'video': ep['video'], 'lines': lines}
+    return {'episodes': parsed}
+
+
+def tokenize_lines(lines):
+    sentences = []  # [text, timestamp, score, [[base, surface], ...]]
+    words = {}  # base -> [part of speech, katakana reading, normalized form] (first occurrence)
+    for clean_text, timestamp in lines:
+        current_score = score_sentence(clean_text)
+        if current_score <= 0: continue
+        tokens = []
+        for token in sudachi_obj.tokenize(clean_text, sudachi_mode):
+            base = token.dictionary_form()
+            if is_garbage_token(base): continue
+            tokens.append([base, token.surface()])
+            if base not in words:
+                words[base] = [",".join(token.part_of_speech()), token.reading_form(), token.normalized_form()]
+        if tokens:
+            sentences.append([clean_text, timestamp, current_score, tokens])
+    return {'sentences': sentences, 'words': words}
+
+
+def stage_tokenize(parsed, previous):
+    """Only episodes whose parsed lines changed are tokenized again."""
+    previous = (previous or {}).get('episodes', {})
+    tokenized = {}
+    for ep_name, ep in parsed['episodes'].items():
+        lines_fp = pipeline.fingerprint(ep['lines'])
+        old = previous.get(ep_name)
+        if old and old['lines_fp'] == lines_fp:
+            tokenized[ep_name] = old
+        else:
+            tokenized[ep_name] = dict(lines_fp=lines_fp, **tokenize_lines(ep['lines']))
+    return {'episodes': tokenized}
+
+
+def aggregate_tokens(parsed, tokenized):
+    """
+    Rebuilds word counts and the best example sentence per word from the
+    per-episode token lists. Episodes are walked in natural order and ties in
+    sentence score keep the earliest sentence, so the pick doesn't depend on
+    directory listing order and adding a later episode doesn't reshuffle it.
+    """
+    counts = Counter()
+    word_stats = {}
+    word_info = {}
+    for ep_name in sorted(tokenized['episodes'], key=vocab_store.episode_sort_key):
+        ep = tokenized['episodes'][ep_name]
+        video_file = parsed['episodes'][ep_name]['video']
+        for base, info in ep['words'].items():
+            word_info.setdefault(base, info)
+        for clean_text, timestamp, current_score, tokens in ep['sentences']:
+            sentence_tokens = [base for base, surface in tokens]
+            counts.update(sentence_tokens)
+            for base, surface in tokens:
+                if base not in word_stats:
+                    word_stats[base] = {'raw': clean_text, 'bolded': '', 'score': -999, 'episodes': set(),
+                                        'tokens': [], 'video': None, 'timestamp': None}
+                word_stats[base]['episodes'].add(ep_name)
+                if current_score > word_stats[base]['score']:
+                    bolded = re.sub(f"({re.escape(surface)})", r"<b>\1</b>", clean_text, count=1)
+                    word_stats[base].update(
+                        {'raw': clean_text, 'bolded': bolded, 'score': current_score, 'tokens': [],
+                         'video': video_file, 'timestamp': timestamp})
+            for token_base in sentence_tokens:
+                if word_stats[token_base]['raw'] == clean_text:
+                    word_stats[token_base]['tokens'] = sentence_tokens
+    return counts, word_stats, word_info
+
+
+def schedule_sentences(parsed, tokenized, word_stats, sorted_vocab, skip_words,
+                       candidates=sentence_scheduler.DEFAULT_CANDIDATES):
+    """
+    Orders the sentence deck i+1 style (see sentence_scheduler.py) and points each
+    deck word's example at the sentence it was scheduled with. With candidates=1
+    that is the same sentence aggregate_tokens picked. Returns {word: position}.
+    """
+    sentences, refs = [], []
+    for ep_name in sorted(tokenized['episodes'], key=vocab_store.episode_sort_key):
+        video_file = parsed['episodes'][ep_name]['video']
+        for clean_text, timestamp, current_score, tokens in tokenized['episodes'][ep_name]['sentences']:
+            sentences.append(([base for base, surface in tokens], current_score, len(clean_text)))
+            refs.append([clean_text, timestamp, video_file, tokens])
+
+    deck_words = [w for w in sorted_vocab if w not in excluded_words]
+    # Core-list words left in the vocab (full builds) count as known, like the learner's own list
+    known = set(skip_words) | (set(sorted_vocab) - set(deck_words))
+    order = sentence_scheduler.schedule(sentences, deck_words, known, candidates)
+
+    positions = {}
+    for position, (word, sid) in enumerate(order):
+        positions[word] = position
+        if sid is None:
+            continue
+        clean_text, timestamp, video_file, tokens = refs[sid]
+        surface = next(surface for base, surface in tokens if base == word)
+        word_stats[word].update(
+            {'raw': clean_text, 'bolded': re.sub(f"({re.escape(surface)})", r"<b>\1</b>", clean_text, count=1),
+             'score': sentences[sid][1], 'tokens': sentences[sid][0], 'video': video_file, 'timestamp': timestamp})
+    return positions
+
+
+def define_word(word, info):
+    """Returns [meaning, reading, source, level] following the definition priority chain."""
+    pos, katakana, norm = info if info else ("", word, word)
+    is_proper_noun = '固有名詞' in pos
+
+    # --- PRIORITY CHECK: Mistranslations, Grammar & Names (one lexicon lookup) ---
+    meaning, reading, source, level = lexicon.lookup(word)
+    if source in lexicon.CURATED_SOURCES:
+        reading = reading or (katakana if info else word)
+    elif is_proper_noun:
+        romaji = kana.to_romaji(katakana).capitalize()
+        meaning = romaji if romaji else "[Proper Noun]"
+        reading = word
+        source = "ProperNoun"
+    elif source is None:
+        meaning, reading, source = get_definition(word, norm)
+        if source != lexicon.NOT_FOUND:
+            lexicon.remember(word, meaning, reading, source)
+    return [meaning, reading, source, level]
+
+
+def stage_define(vocab, word_info, previous):
+    """Words defined by an earlier run are reused as long as the lexicon sources are unchanged;
+    words whose lookup failed (offline, timeout) are looked up again."""
+    previous = previous if previous and previous.get('lexicon') == LEXICON_FP else {}
+    old_words = previous.get('words', {})
+    definitions = {}
+    for i, word in enumerate(vocab):
+        info = word_info.get(word)
+        old = old_words.get(word)
+        if old and old['info'] == info and old['definition'][2] != lexicon.NOT_FOUND:
+            definition = old['definition']
+        else:
+            definition = define_word(word, info)
+        definitions[word] = {'info': info, 'definition': definition}
+        if i % 200 == 0:
+            print(f"    Defined {i}/{len(vocab)} words...")
+    return {'lexicon': LEXICON_FP, 'words': definitions}
+
+
+def stage_translate(show, sentences):
+    cache_file = f"cache/{show}_cache.json"
+    translation_cache = {}
+    if os.path.exists(cache_file):
+        with open(cache_file, 'r', encoding='utf8') as f:
+            translation_cache = json.load(f)
 
+    sentences_to_translate = [s for s in sentences if s not in translation_cache]
     if sentences_to_translate:
         print(f"Found {len(sentences_to_translate)} new sentences. Translating...")
         batch_size = 20
         for i in range(0, len(sentences_to_translate), batch_size):
             batch = sentences_to_translate[i:i + batch_size]
-            new_results = bulk_translate(batch)
-            translation_cache.update(new_results)
-            save_cache_local(translation_cache)
+            translation_cache.update(bulk_translate(batch))
+            with open(cache_file, 'w', encoding='utf8') as f:
+                json.dump(translation_cache, f, ensure_ascii=False, indent=4)
             print(
                 f"    Progress: {min(i + batch_size, len(sentences_to_translate))}/{len(sentences_to_translate)} sentences cached.")
+    return {s: translation_cache.get(s, "[Unavailable]") for s in sentences}
+
+
+def screenshot_filename(video, timestamp):
+    clean_ts = timestamp.replace(':', '_').replace(',', '_').replace('.', '_')
+    clean_ep = os.path.basename(video).split('.')[0]
+    return f"{clean_ep}_{clean_ts}.jpg"
+
+
+def word_audio_prefix(show, word):
+    return f"{show}_word_{hashlib.sha256(word.encode()).hexdigest()[:8]}"
 
-    print("Generating Notes, Screenshots, and Audio...")
-    sorted_vocab = [w for w, c in counts.most_common() if c >= 2]
-    known_words = set()
-    vocab_notes_list = []
-    sentence_notes_list = []
-
-    for i, word in enumerate(sorted_vocab):
-        pos = word_pos.get(word, "")
-        norm = word_normalized.get(word, word)
-        is_proper_noun = '固有名詞' in pos
-
-        # --- PRIORITY CHECK: Mistranslations & Grammar ---
-        if word in MISTRANSLATION_FIXES:
-            meaning = MISTRANSLATION_FIXES[word]['meaning']
-            reading = MISTRANSLATION_FIXES[word]['reading']
-            source = "ManualFix"
-        elif word in GRAMMAR_DICT:
-            meaning = GRAMMAR_DICT[word]
-            reading = word
-            source = "GrammarDict"
-            if word in word_reading_katakana: reading = word_reading_katakana[word]
-        elif word in name_map:
-            meaning = name_map[word]
-            reading = word
-            source = "NameMap"
-            if word in word_reading_katakana: reading = word_reading_katakana[word]
-        else:
-            if is_proper_noun:
-                kana = word_reading_katakana.get(word, word)
-                romaji = kana_to_romaji(kana)
-                meaning = romaji if romaji else "[Proper Noun]"
-                reading = word
-                source = "ProperNoun"
-            else:
-                meaning, reading, source = get_definition(word, norm)
-                with open('dict.csv', 'a', encoding='utf-8', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerow([word, meaning, reading, source])
 
-        level = jlpt_data.get(word, "Unlabeled")
-        if word == "さん": level = "N5"
-        info = word_stats.get(word)
-        ep_list = ", ".join(sorted(list(info['episodes'])))
-        trans = translation_cache.get(info['raw'], "[Unavailable]")
+def sentence_audio_prefix(show, sentence):
+    return f"{show}_sent_{hashlib.sha256(sentence.encode()).hexdigest()[:8]}"
+
+
+def select_vocab(counts, skip_words):
+    """Deck/CSV words in frequency order, with skipped words dropped before any expensive work."""
+    return [w for w, c in counts.most_common() if c >= 2 and w not in skip_words]
+
+
+def build_media_jobs(sorted_vocab, word_stats, full_media, audio_media):
+    media_jobs = []
+    deck_rank = 0
+    for word in sorted_vocab:
+        # Core-list words (full builds only) don't use up the deck's budget
+        tier = media_tier(deck_rank, full_media, audio_media)
+        if word not in excluded_words:
+            deck_rank += 1
+        info = word_stats[word]
+        media_jobs.append([word, info['raw'], info['video'], info['timestamp'], tier])
+    return media_jobs
 
+
+def stage_media(show, media_jobs, previous):
+    """
+    media_jobs: [word, sentence, video, timestamp, budget tier] per word.
+    Returns the media fields per word plus every file that goes into the package.
+    Words whose job is unchanged since the previous run are reused as long as
+    their files are still on disk (media_gc.py --delete or a manual cleanup
+    may have removed them); the others are regenerated.
+    """
+    previous = previous or {}
+    old_jobs = previous.get('jobs', {})
+    old_media = previous.get('media', {})
+    old_files = previous.get('word_files', {})
+    manifest = media_manifest.load_manifest()
+    media = {}
+    word_files = {}
+    tier_counts = Counter()
+    for i, job in enumerate(media_jobs):
+        word, sentence, video, timestamp, tier = job
+        if old_jobs.get(word) == job and word in old_media and \
+                all(os.path.exists(path) for path in old_files.get(word, [])):
+            media[word] = old_media[word]
+            word_files[word] = old_files.get(word, [])
+            tier_counts[media[word][3]] += 1
+            for path in word_files[word]:
+                if media_manifest.media_key(path) not in manifest:
+                    media_manifest.record(manifest, path, show)
+            continue
+
+        files = []
         # --- FIXED SCREENSHOT LOGIC ---
         image_field = ""
-        if info.get('video') and info.get('timestamp'):
-            clean_ts = info['timestamp'].replace(':', '_').replace(',', '_').replace('.', '_')
-            clean_ep = os.path.basename(info['video']).split('.')[0]
-            img_filename = f"{clean_ep}_{clean_ts}.jpg"
-            full_local_path = os.path.join(MEDIA_DIR, show, img_filename)
-
-            if extract_screenshot(info['video'], info['timestamp'], img_filename, show):
+        if video and timestamp:
+            img_filename = screenshot_filename(video, timestamp)
+            if extract_screenshot(video, timestamp, img_filename, show, create=tier == 'full'):
                 image_field = f'<img src="{img_filename}">'
-                media_files_to_package.append(full_local_path)
+                files.append(screenshot_path(show, img_filename))
+                media_manifest.record(manifest, files[-1], show, 'image')
 
         # --- AUDIO GENERATION LOGIC ---
         # 1. Generate Word Audio
-        word_hash = hashlib.sha256(word.encode()).hexdigest()[:8]
-        word_audio_path, word_audio_field = generate_audio_file(word, f"{show}_word_{word_hash}", show)
-        if word_audio_path: media_files_to_package.append(word_audio_path)
+        word_audio_path, word_audio_field = generate_audio_file(word, word_audio_prefix(show, word), show,
+                                                                create=tier != 'text')
+        if word_audio_path:
+            files.append(word_audio_path)
+            media_manifest.record(manifest, word_audio_path, show, 'word_audio')
 
         # 2. Generate Sentence Audio
         sent_audio_field = ""
-        clean_sentence_text = info['raw']
-        if clean_sentence_text:
-            sent_hash = hashlib.sha256(clean_sentence_text.encode()).hexdigest()[:8]
-            sent_audio_path, sent_audio_field = generate_audio_file(clean_sentence_text, f"{show}_sent_{sent_hash}",
-                                                                    show)
-            if sent_audio_path: media_files_to_package.append(sent_audio_path)
-
-        sentence_tokens_list = info.get('tokens', [])
-        unknown_count = 0
-        for t in sentence_tokens_list:
-            if t != word and t not in known_words:
-                unknown_count += 1
-        sentence_len = len(info['raw'])
-        complexity_score = (unknown_count * 100) + sentence_len
-
-        # Updated Fields List
-        fields_data = [word, reading, meaning, str(level), str(counts[word]), info['bolded'], trans, ep_list,
-                       image_field, word_audio_field, sent_audio_field]
-        csv_data.append(fields_data)
-
-        if word not in excluded_words:
-            vocab_notes_list.append(genanki.Note(model=vocab_model, fields=fields_data))
-            sentence_notes_list.append((complexity_score, genanki.Note(model=sentence_model, fields=fields_data)))
-        known_words.add(word)
+        if sentence:
+            sent_audio_path, sent_audio_field = generate_audio_file(sentence, sentence_audio_prefix(show, sentence),
+                                                                    show, create=tier != 'text')
+            if sent_audio_path:
+                files.append(sent_audio_path)
+                media_manifest.record(manifest, sent_audio_path, show, 'sentence_audio')
+
+        # Record what the note actually got (existing media may exceed the budget tier)
+        if image_field:
+            tier = 'full'
+        elif word_audio_field or sent_audio_field:
+            tier = 'audio'
+        else:
+            tier = 'text'
+        tier_counts[tier] += 1
+        media[word] = [image_field, word_audio_field, sent_audio_field, tier]
+        word_files[word] = files
         if i % 20 == 0:  # Reduced print freq slightly
-            print(f"  > Processed {i}/{len(sorted_vocab)} words...")
-
-    print(f"Adding {len(vocab_notes_list)} notes to Vocab Deck...")
-    for note in vocab_notes_list:
-        vocab_deck.add_note(note)
-    print(f"Adding {len(sentence_notes_list)} notes to Sentence Deck...")
-    sentence_notes_list.sort(key=lambda x: x[0])
-    for score, note in sentence_notes_list:
-        sentence_deck.add_note(note)
+            print(f"  > Media for {i}/{len(media_jobs)} words...")
+
+    print(f"Media tiers: {dict(tier_counts)}")
+    media_manifest.save_manifest(manifest)
+    media_files = sorted({path for files in word_files.values() for path in files})
+    return {'jobs': {job[0]: job for job in media_jobs}, 'media': media, 'word_files': word_files,
+            'files': media_files}
+
+
+def stage_package(show, rows, media_files, apkg_path):
+    """rows: [in_deck, sentence deck position, fields] in vocab order."""
+    vocab_model, sentence_model = build_models(show)
+    vocab_deck = genanki.Deck(generate_id(show, salt=2), f'Anime Vocabulary:: {show}')
+    sentence_deck = genanki.Deck(generate_id(show, salt=4), f'Anime Sentences:: {show}')
+
+    deck_rows = [row for row in rows if row[0]]
+    print(f"Adding {len(deck_rows)} notes to Vocab Deck...")
+    # GUIDs depend only on show + word (not on field contents), so a rebuild that
+    # changes a sentence or meaning updates the existing note on re-import
+    for in_deck, position, fields_data in deck_rows:
+        vocab_deck.add_note(genanki.Note(model=vocab_model, fields=fields_data,
+                                         guid=genanki.guid_for(show, fields_data[0])))
+    print(f"Adding {len(deck_rows)} notes to Sentence Deck...")
+    for in_deck, position, fields_data in sorted(deck_rows, key=lambda x: x[1]):
+        sentence_deck.add_note(genanki.Note(model=sentence_model, fields=fields_data,
+                                            guid=genanki.guid_for(show, 'sentence', fields_data[0])))
     print("Creating APKG package...")
-    media_files_to_package = list(set(media_files_to_package))
-    genanki.Package([vocab_deck, sentence_deck], media_files=media_files_to_package).write_to_file(
-        f'react-anime/public/anki/{show}_Master.apkg')
+    package = genanki.Package([vocab_deck, sentence_deck], media_files=media_files)
+    stats = apkg_writer.write_apkg(package, apkg_path)
+    print(f"  {apkg_writer.format_report(stats)}")
+    return {'apkg': apkg_path, 'notes': len(deck_rows), 'media_files': len(media_files)}
+
 
+def episode_table(tokenized, rows):
+    """
+    vocab_store.EPISODE_FIELDS rows, one per episode in natural order: token count,
+    distinct words (all tokens), the CSV words seen for the first time, and their
+    level mix (refined as graphs.py charts it), so New_Words is the sum of the
+    level columns. Filtered words never count as new.
+    """
+    fields = [fields_data for in_deck, position, fields_data in rows]
+    levels = vocab_store.refined_levels({
+        'level': np.array([f[3] for f in fields], dtype=str),
+        'meaning_class': np.array([vocab_store.meaning_class(f[2]) for f in fields], dtype=np.uint8)})
+    word_levels = dict(zip((f[0] for f in fields), levels.tolist()))
+
+    table = []
+    seen = set()
+    for ep_name in sorted(tokenized['episodes'], key=vocab_store.episode_sort_key):
+        tokens = [base for sentence in tokenized['episodes'][ep_name]['sentences'] for base, surface in sentence[3]]
+        unique = set(tokens)
+        new = [w for w in unique - seen if w in word_levels]
+        seen |= unique
+        level_mix = Counter(word_levels[w] for w in new)
+        table.append([ep_name, len(tokens), len(unique), len(new)]
+                     + [level_mix[level] for level in vocab_store.EPISODE_LEVELS])
+    return table
+
+
+def stage_csv(show, rows, tokenized, csv_path):
     # Update CSV Header for new fields
-    with open(f'react-anime/public/csv/{show}_Vocabulary_Full.csv', 'w', encoding='utf-8', newline='') as f:
+    with open(csv_path, 'w', encoding='utf-8', newline='') as f:
         writer = csv.writer(f)
-        writer.writerow(
-            ['Expression', 'Reading', 'Meaning', 'Level', 'Frequency', 'Sentence', 'Translation', 'Episodes', 'Image',
-             'WordAudio', 'SentenceAudio'])
-        writer.writerows(csv_data)
-    print(f"Done! Created '{show}_Master.apkg' with screenshots and audio.")
+        writer.writerow(NOTE_FIELDS)
+        writer.writerows(fields_data for in_deck, score, fields_data in rows)
+    # Per-episode stats for graphs.py
+    episodes_path = vocab_store.episodes_path_for(show, os.path.dirname(csv_path))
+    with open(episodes_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(vocab_store.EPISODE_FIELDS)
+        writer.writerows(episode_table(tokenized, rows))
+    # Typed columnar copy for graphs.py / megagraph.py / MEGADECK.py
+    store_path = vocab_store.build_from_csv(show, os.path.dirname(csv_path))
+    # Paginated, pre-compressed JSON pages for the web app
+    records = [dict(zip(NOTE_FIELDS, fields_data)) for in_deck, score, fields_data in rows]
+    shards_path = vocab_shards.write_shards(show, records, vocab_store.list_shows(os.path.dirname(csv_path)))
+    return {'csv': csv_path, 'episodes': episodes_path, 'rows': len(rows), 'store': store_path,
+            'shards': shards_path}
+
+
+# ==========================================
+# DRY-RUN PLANNER
+# ==========================================
+
+# Rough wall-clock cost per operation (seconds), used for --plan estimates
+PLAN_COSTS = {
+    'translation_batch': 2.5,  # 20 sentences per request + the 0.6s courtesy sleep
+    'tts_clip': 1.5,
+    'screenshot': 0.4,
+    'jamdict_lookup': 0.01,
+    'jisho_lookup': 1.0,
+}
+
+
+def plan_show(show, deck_only=False, learner_known=frozenset(), full_media=None, audio_media=None,
+              sentence_candidates=sentence_scheduler.DEFAULT_CANDIDATES):
+    """
+    Counts the work a build of `show` would trigger without doing it: no network
+    calls and no media written. Parse/tokenize run (or reuse their artifacts)
+    because everything else depends on the token counts.
+    """
+    started = time.time()
+    episodes = list_episodes(show)
+    parse_fp = pipeline.fingerprint(sorted([name, ep['sig'], ep['video']] for name, ep in episodes.items()))
+    parsed = pipeline.run_stage(show, 'parse', parse_fp, lambda prev: stage_parse(episodes, prev))
+    tokenized = pipeline.run_stage(show, 'tokenize', parsed['output'],
+                                   lambda prev: stage_tokenize(parsed['data'], prev))
+    counts, word_stats, word_info = aggregate_tokens(parsed['data'], tokenized['data'])
+    tokenize_seconds = time.time() - started
+
+    skip_words = set(learner_known) | (excluded_words if deck_only else set())
+    sorted_vocab = select_vocab(counts, skip_words)
+    schedule_sentences(parsed['data'], tokenized['data'], word_stats, sorted_vocab, skip_words, sentence_candidates)
+
+    # --- Definitions: same priority chain as define_word, minus the network ---
+    previous = pipeline.load_artifact(show, 'define')
+    defined = {}
+    if previous and previous['data'].get('lexicon') == LEXICON_FP:
+        defined = previous['data']['words']
+    lookups = Counter()
+    for word in sorted_vocab:
+        info = word_info.get(word)
+        source = lexicon.lookup(word)[2]
+        if word in defined and defined[word]['info'] == info:
+            lookups['cached'] += 1
+        elif source in lexicon.CURATED_SOURCES:
+            lookups['lexicon'] += 1
+        elif info and '固有名詞' in info[0]:
+            lookups['proper_noun'] += 1
+        elif source is not None:
+            lookups['local_dict'] += 1
+        elif jam.lookup(info[2] if info and info[2] else word).entries:
+            lookups['jamdict'] += 1
+        else:
+            lookups['jisho'] += 1
+
+    # --- Translations ---
+    translation_cache = {}
+    cache_file = f"cache/{show}_cache.json"
+    if os.path.exists(cache_file):
+        with open(cache_file, 'r', encoding='utf8') as f:
+            translation_cache = json.load(f)
+    sentences = {word_stats[w]['raw'] for w in sorted_vocab if word_stats[w]['raw']}
+    new_sentences = len([s for s in sentences if s not in translation_cache])
+
+    # --- Media ---
+    screenshots = tts_clips = 0
+    for word, sentence, video, timestamp, tier in build_media_jobs(sorted_vocab, word_stats, full_media, audio_media):
+        if tier == 'full' and video and timestamp:
+            if not os.path.exists(screenshot_path(show, screenshot_filename(video, timestamp))):
+                screenshots += 1
+        if tier != 'text':
+            if not has_content(audio_file_path(word_audio_prefix(show, word), show)[1]):
+                tts_clips += 1
+            if sentence and not has_content(audio_file_path(sentence_audio_prefix(show, sentence), show)[1]):
+                tts_clips += 1
+
+    return {
+        'show': show,
+        'words': len(sorted_vocab),
+        'lookups': lookups,
+        'new_sentences': new_sentences,
+        'screenshots': screenshots,
+        'tts_clips': tts_clips,
+        'seconds': {
+            'tokenize': tokenize_seconds,
+            'define': lookups['jamdict'] * PLAN_COSTS['jamdict_lookup'] + lookups['jisho'] * PLAN_COSTS['jisho_lookup'],
+            'translate': -(-new_sentences // 20) * PLAN_COSTS['translation_batch'],
+            'media': screenshots * PLAN_COSTS['screenshot'] + tts_clips * PLAN_COSTS['tts_clip'],
+        }
+    }
+
+
+def print_plan(plans):
+    print(f"\n{'Show':<30}{'Words':>7}{'Jisho':>7}{'Transl.':>9}{'TTS':>7}{'Shots':>7}{'Est. time':>11}")
+    total = Counter()
+    for plan in plans:
+        seconds = sum(plan['seconds'].values())
+        print(f"{plan['show'][:29]:<30}{plan['words']:>7}{plan['lookups']['jisho']:>7}{plan['new_sentences']:>9}"
+              f"{plan['tts_clips']:>7}{plan['screenshots']:>7}{seconds / 60:>10.1f}m")
+        total.update({'words': plan['words'], 'jisho': plan['lookups']['jisho'], 'sentences': plan['new_sentences'],
+                      'tts': plan['tts_clips'], 'shots': plan['screenshots']})
+        total.update({f"time_{stage}": secs for stage, secs in plan['seconds'].items()})
+    print(f"{'TOTAL':<30}{total['words']:>7}{total['jisho']:>7}{total['sentences']:>9}{total['tts']:>7}"
+          f"{total['shots']:>7}{sum(v for k, v in total.items() if k.startswith('time_')) / 60:>10.1f}m")
+    print("Estimated time per stage: " + ", ".join(
+        f"{stage} {total[f'time_{stage}'] / 60:.1f}m" for stage in ['tokenize', 'define', 'translate', 'media']))
+
+
+# ==========================================
+# WATCH MODE
+# ==========================================
+
+def snapshot_show(show):
+    """Size/mtime of every transcript and video a rebuild of `show` would read."""
+    snapshot = []
+    for folder in (os.path.join(TRANSCRIPT_DIR, show), os.path.join(VIDEO_DIR, show)):
+        if not os.path.isdir(folder):
+            continue
+        for entry in os.scandir(folder):
+            if entry.is_file():
+                st = entry.stat()
+                snapshot.append((entry.path, st.st_size, st.st_mtime_ns))
+    return sorted(snapshot)
+
+
+def watch_shows(build_options, shows=None, interval=2.0, debounce=5.0, retry=60.0):
+    """
+    Long-running mode: Jamdict and Sudachi stay loaded, the transcript and video
+    folders of `shows` (default: all) are polled every `interval` seconds, and a show
+    is rebuilt once its files have been quiet for `debounce` seconds (so a video
+    that is still being copied doesn't trigger a half-finished build). Only the
+    stages affected by the change actually run. The lexicon and core lists are
+    re-checked before every rebuild; a failed rebuild is logged and retried
+    `retry` seconds later.
+    """
+    watched = lambda: shows or os.listdir(TRANSCRIPT_DIR)
+    print(f"\n[watch] Watching '{TRANSCRIPT_DIR}' and '{VIDEO_DIR}' (Ctrl+C to stop)...")
+    snapshots = {}
+    pending = {}  # show -> monotonic time of its last observed change
+    for show in watched():
+        snapshots[show] = snapshot_show(show)
+        pending[show] = 0.0  # catch up on anything that changed while we weren't running
+    try:
+        while True:
+            for show in watched():
+                snapshot = snapshot_show(show)
+                if snapshot != snapshots.get(show):
+                    snapshots[show] = snapshot
+                    pending[show] = time.monotonic()
+                    print(f"[watch] Change detected in {show}")
+
+            now = time.monotonic()
+            for show, changed_at in list(pending.items()):
+                if now - changed_at < debounce:
+                    continue
+                del pending[show]
+                started = time.time()
+                try:
+                    refresh_sources()
+                    process_single_show(show, **build_options)
+                    print(f"[watch] {show} rebuilt in {time.time() - started:.1f}s")
+                except Exception as e:
+                    print(f"[watch] {show} failed: {e!r}. Retrying in {retry:.0f}s.")
+                    pending[show] = time.monotonic() + retry
+                finally:
+                    pipeline.clear_loaded()
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\n[watch] Stopped.")
+
+
+# ==========================================
+# CORE FUNCTION: PROCESS SINGLE SHOW
+# ==========================================
+
+def process_single_show(show, deck_only=False, learner_known=frozenset(), full_media=None, audio_media=None,
+                        stages=None, force=False, sentence_candidates=sentence_scheduler.DEFAULT_CANDIDATES):
+    """
+    deck_only: skip the CSV export, so core-list words can be dropped before any
+               definition lookups or media generation.
+    learner_known: words the learner already knows; skipped entirely. Only meant
+               for deck_only builds (main refuses --known without --deck-only),
+               since a full build's CSV is shared.
+    full_media / audio_media: media budget (see media_tier). Media that already
+               exists on disk is always attached, so re-running with a bigger
+               budget only generates the missing tail.
+    stages:    stages to run (default: all). The others reuse their last artifact.
+    force:     re-run the selected stages even if their inputs are unchanged.
+    sentence_candidates: sentences per word the i+1 scheduler may choose from.
+               Above 1 a word's example can change to suit the study order.
+    """
+    show_path = os.path.join(TRANSCRIPT_DIR, show)
+    if not os.path.isdir(show_path):
+        return
+
+    print(f"\n===============================")
+    print(f"PROCESSING SHOW: {show}")
+    print(f"===============================")
+
+    selected = set(STAGES if stages is None else stages)
+    if deck_only:
+        selected.discard('csv')
+
+    def run(stage, input_fp, build, outputs=()):
+        return pipeline.run_stage(show, stage, input_fp, build, selected=stage in selected, force=force,
+                                  outputs=outputs)
+
+    apkg_path = f'react-anime/public/anki/{show}_Master.apkg'
+    csv_path = f'react-anime/public/csv/{show}_Vocabulary_Full.csv'
+
+    try:
+        print(f"Scanning transcripts in: {show_path}")
+        episodes = list_episodes(show)
+        print(f"  [Info] {len(episodes)} transcripts, {sum(1 for e in episodes.values() if e['video'])} videos found.")
+        parse_fp = pipeline.fingerprint(sorted([name, ep['sig'], ep['video']] for name, ep in episodes.items()))
+        parsed = run('parse', parse_fp, lambda prev: stage_parse(episodes, prev))
+
+        tokenized = run('tokenize', parsed['output'], lambda prev: stage_tokenize(parsed['data'], prev))
+        counts, word_stats, word_info = aggregate_tokens(parsed['data'], tokenized['data'])
+
+        # Drop skipped words before any translation, definition or media work.
+        # Core-list words stay in full builds because the CSV (and MEGADECK) use them.
+        skip_words = set(learner_known)
+        if deck_only:
+            skip_words |= excluded_words
+        sorted_vocab = select_vocab(counts, skip_words)
+        if skip_words:
+            print(f"Skipping {len(skip_words & set(counts))} known/excluded words before media generation.")
+        sentence_order = schedule_sentences(parsed['data'], tokenized['data'], word_stats, sorted_vocab,
+                                            skip_words, sentence_candidates)
+
+        define_fp = pipeline.fingerprint(LEXICON_FP, [[w, word_info.get(w)] for w in sorted_vocab])
+        defined = run('define', define_fp, lambda prev: stage_define(sorted_vocab, word_info, prev))
+
+        print("Identifying sentences for bulk translation...")
+        sentences = sorted({word_stats[w]['raw'] for w in sorted_vocab if word_stats[w]['raw']})
+        translated = run('translate', pipeline.fingerprint(sentences), lambda prev: stage_translate(show, sentences))
+
+        print("Generating Screenshots and Audio...")
+        media_jobs = build_media_jobs(sorted_vocab, word_stats, full_media, audio_media)
+        # The previous run's files are declared outputs, so deleted media re-runs the stage
+        previous_media = pipeline.load_artifact(show, 'media')
+        media = run('media', pipeline.fingerprint(MEDIA_DIR, media_jobs), lambda prev: stage_media(show, media_jobs, prev),
+                    outputs=previous_media['data'].get('files', []) if previous_media else [])
+    except pipeline.StageError as e:
+        print(f"[ERROR] {e}")
+        return
+
+    print("Assembling notes...")
+    definitions = defined['data']['words']
+    translations = translated['data']
+    media_fields = media['data']['media']
+    rows = []
+    # Skipped stages may hold artifacts from an older vocab list
+    stale = [w for w in sorted_vocab if w not in definitions or w not in media_fields]
+    if stale:
+        print(f"  [Warning] {len(stale)} words missing from skipped stage artifacts; leaving them out.")
+    for word in sorted_vocab:
+        if word not in definitions or word not in media_fields:
+            continue
+        meaning, reading, source, level = definitions[word]['definition']
+        info = word_stats[word]
+        ep_list = ", ".join(sorted(info['episodes'], key=vocab_store.episode_sort_key))
+        trans = translations.get(info['raw'], "[Unavailable]")
+        image_field, word_audio_field, sent_audio_field, tier = media_fields[word]
+
+        # Updated Fields List
+        fields_data = [word, reading, meaning, str(level), str(counts[word]), info['bolded'], trans, ep_list,
+                       image_field, word_audio_field, sent_audio_field, tier]
+        rows.append([word not in excluded_words, sentence_order.get(word, len(sentence_order)), fields_data])
+
+    try:
+        package_fp = pipeline.fingerprint(rows, media['data']['files'], NOTE_FIELDS, VOCAB_TEMPLATE,
+                                          SENTENCE_TEMPLATE, VOCAB_MODEL_NAME, SENTENCE_MODEL_NAME, STYLE_VOCAB)
+        run('package', package_fp, lambda prev: stage_package(show, rows, media['data']['files'], apkg_path),
+            outputs=[apkg_path])
+        if not deck_only:
+            run('csv', pipeline.fingerprint(rows, tokenized['output']),
+                lambda prev: stage_csv(show, rows, tokenized['data'], csv_path),
+                outputs=[csv_path, vocab_store.episodes_path_for(show), vocab_store.store_path_for(show),
+                         vocab_shards.index_path_for(show)])
+    except pipeline.StageError as e:
+        print(f"[ERROR] {e}")
+        return
+
+    if deck_only:
+        print(f"Done! Created '{show}_Master.apkg' (deck-only build, CSV not updated).")
+    else:
+        print(f"Done! Created '{show}_Master.apkg' with screenshots and audio.")
 
 
 if __name__ == "__main__":
     if not os.path.exists(TRANSCRIPT_DIR):
         print(f"Error: '{TRANSCRIPT_DIR}' directory not found.")
         sys.exit(1)
-    shows = os.listdir(TRANSCRIPT_DIR)
+    parser = argparse.ArgumentParser(description="Build Anki decks from anime transcripts.")
+    parser.add_argument('shows', nargs='*', help="Show folders to process (default: all).")
+    parser.add_argument('--deck-only', action='store_true',
+                        help="Only build the .apkg; core-list words are dropped before definitions and media.")
+    parser.add_argument('--known', action='append', default=[], metavar='FILE',
+                        help="Known-word list (plain list, JSON or Anki export) to skip entirely. Repeatable; "
+                             "requires --deck-only so the published CSV doesn't depend on one learner's list.")
+    parser.add_argument('--full-media', type=int, default=None, metavar='N',
+                        help="Screenshot + audio only for the top N words per show (default: all, or none "
+                             "if --audio-media is given).")
+    parser.add_argument('--audio-media', type=int, default=None, metavar='N',
+                        help="Audio only for the next N words; the rest get no new media (default: all).")
+    parser.add_argument('--sentence-candidates', type=int, default=sentence_scheduler.DEFAULT_CANDIDATES,
+                        metavar='K',
+                        help=f"Sentences per word the i+1 sentence-deck scheduler may pick from (default: "
+                             f"{sentence_scheduler.DEFAULT_CANDIDATES}). 1 keeps each word's best-scored sentence, "
+                             f"which leaves the scheduler nothing to choose and only reorders the deck.")
+    parser.add_argument('--only', nargs='+', choices=STAGES, metavar='STAGE',
+                        help=f"Only run these stages ({', '.join(STAGES)}); the rest reuse their last artifacts.")
+    parser.add_argument('--skip', nargs='+', choices=STAGES, default=[], metavar='STAGE',
+                        help="Don't run these stages; reuse their last artifacts instead.")
+    parser.add_argument('--force', action='store_true',
+                        help="Re-run the selected stages even if their inputs are unchanged.")
+    parser.add_argument('--watch', action='store_true',
+                        help="Keep running and rebuild a show whenever its transcripts or videos change.")
+    parser.add_argument('--debounce', type=float, default=5.0, metavar='SECONDS',
+                        help="Watch mode: wait until a show's files have been quiet this long (default: 5).")
+    parser.add_argument('--plan', action='store_true',
+                        help="Dry run: report expected lookups, translations, TTS clips and screenshots per show.")
+    args = parser.parse_args()
+    if args.known and not args.deck_only:
+        parser.error("--known only applies to personal decks: add --deck-only (the CSV, stats and MEGADECK "
+                     "inputs are shared and must keep every word)")
+    stages = [stage for stage in (args.only or STAGES) if stage not in args.skip]
+
+    learner_known = set()
+    for known_file in args.known:
+        learner_known |= load_known_words(known_file)
+        print(f"Loaded known-word list '{known_file}'. Total known words: {len(learner_known)}")
+
+    build_options = dict(deck_only=args.deck_only, learner_known=learner_known, full_media=args.full_media,
+                         audio_media=args.audio_media, stages=stages, force=args.force,
+                         sentence_candidates=args.sentence_candidates)
+    if args.plan:
+        plans = [plan_show(show, deck_only=args.deck_only, learner_known=learner_known, full_media=args.full_media,
+                           audio_media=args.audio_media, sentence_candidates=args.sentence_candidates)
+                 for show in (args.shows or os.listdir(TRANSCRIPT_DIR))
+                 if os.path.isdir(os.path.join(TRANSCRIPT_DIR, show))]
+        print_plan(plans)
+        sys.exit(0)
+
+    if args.watch:
+        watch_shows(build_options, shows=args.shows, debounce=args.debounce)
+        sys.exit(0)
+
+    shows = args.shows or os.listdir(TRANSCRIPT_DIR)
     print(f"Found {len(shows)} folders in {TRANSCRIPT_DIR}.")
     for show in shows:
-        process_single_show(show)
\ No newline at end of file
+        process_single_show(show, **build_options)
\ No newline at end of file
@@ -0,0 +1,172 @@
+import os
+import re
+import csv
+import sys
+import json
+import hashlib
+import argparse
+from collections import defaultdict
+
+import media_manifest
+
+# ==========================================
+# MEDIA GARBAGE COLLECTION
+# ==========================================
+# MEDIA_DIR only ever grows: screenshots are named by timestamp and audio by
+# sha256(text)[:8], so every change to sentence selection, cleanup regexes or
+# MISTRANSLATION_FIXES leaves the old files behind. This tool works out which
+# files the current CSVs / stage artifacts still reference and reports (or,
+# with --delete, removes) everything else.
+#
+# Usage: python media_gc.py [--delete]
+
+CSV_FOLDER = 'react-anime/public/csv'
+MEDIA_DIR = media_manifest.MEDIA_DIR
+STAGE_DIR = 'cache/stages'
+MEDIA_FIELDS = ('Image', 'WordAudio', 'SentenceAudio')
+
+
+def audio_hash(text):
+    return hashlib.sha256(text.encode()).hexdigest()[:8]
+
+
+def collect_live_media():
+    """
+    Returns (live filenames, {audio filename: set of source texts}).
+    Sources: every *_Vocabulary_Full.csv plus the media stage artifacts, which
+    also cover deck-only builds that never wrote a CSV.
+    """
+    live = set()
+    audio_sources = defaultdict(set)
+
+    def add_audio(filename, text):
+        # Two different texts that hash to the same name share one clip in Anki
+        match = re.search(r'_(word|sent)_([0-9a-f]{8})\.mp3$', filename or '')
+        if match and text and audio_hash(text) == match.group(2):
+            audio_sources[filename].add(text)
+
+    if os.path.isdir(CSV_FOLDER):
+        for filename in os.listdir(CSV_FOLDER):
+            if not filename.endswith("_Vocabulary_Full.csv"):
+                continue
+            with open(os.path.join(CSV_FOLDER, filename), 'r', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    for field in MEDIA_FIELDS:
+                        name = media_manifest.media_filename(row.get(field))
+                        if name:
+                            live.add(name)
+                    add_audio(media_manifest.media_filename(row.get('WordAudio')), row.get('Expression'))
+                    add_audio(media_manifest.media_filename(row.get('SentenceAudio')),
+                              re.sub(r'</?b>', '', row.get('Sentence') or ''))
+
+    if os.path.isdir(STAGE_DIR):
+        for show in os.listdir(STAGE_DIR):
+            path = os.path.join(STAGE_DIR, show, 'media.json')
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)['data']
+            for word, job in data.get('jobs', {}).items():
+                image, word_audio, sent_audio, tier = data['media'].get(word, ['', '', '', ''])
+                for tag in (image, word_audio, sent_audio):
+                    name = media_manifest.media_filename(tag)
+                    if name:
+                        live.add(name)
+                add_audio(media_manifest.media_filename(word_audio), job[0])
+                add_audio(media_manifest.media_filename(sent_audio), job[1])
+    return live, audio_sources
+
+
+def scan_media_dir():
+    """{filename: [(path, size), ...]} for everything currently in MEDIA_DIR."""
+    files = defaultdict(list)
+    if not os.path.isdir(MEDIA_DIR):
+        return files
+    for show_entry in os.scandir(MEDIA_DIR):
+        if not show_entry.is_dir():
+            continue
+        for entry in os.scandir(show_entry.path):
+            if entry.is_file() and entry.name.lower().endswith(media_manifest.MEDIA_EXTS):
+                files[entry.name].append((entry.path, entry.stat().st_size))
+    return files
+
+
+def format_bytes(n):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if n < 1024 or unit == 'GB':
+            return f"{n:.1f} {unit}" if unit != 'B' else f"{n} B"
+        n /= 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report or remove media files no deck references anymore.")
+    parser.add_argument('--delete', action='store_true', help="Actually delete the unreferenced files.")
+    parser.add_argument('--verbose', action='store_true', help="List every unreferenced file.")
+    args = parser.parse_args()
+
+    print("Collecting live media from CSVs and stage artifacts...")
+    live, audio_sources = collect_live_media()
+    if not live:
+        print("No referenced media found at all; refusing to treat everything as garbage.")
+        sys.exit(1)
+
+    print(f"Scanning {MEDIA_DIR}...")
+    on_disk = scan_media_dir()
+
+    orphans = []  # (path, size, reason)
+    per_show = defaultdict(lambda: [0, 0])
+    for filename, copies in on_disk.items():
+        for path, size in copies:
+            if filename not in live:
+                reason = 'unreferenced'
+            elif size == 0:
+                reason = 'empty'  # failed TTS call; main.py regenerates these
+            else:
+                continue
+            orphans.append((path, size, reason))
+            show_dir = os.path.basename(os.path.dirname(path))
+            per_show[show_dir][0] += 1
+            per_show[show_dir][1] += size
+
+    total_files = sum(len(copies) for copies in on_disk.values())
+    reclaimable = sum(size for path, size, reason in orphans)
+    print(f"\n{total_files} media files on disk, {len(live)} referenced, {len(orphans)} garbage "
+          f"({format_bytes(reclaimable)}).")
+    for show_dir, (count, size) in sorted(per_show.items(), key=lambda item: -item[1][1]):
+        print(f"  {show_dir:<30} {count:>7} files  {format_bytes(size):>10}")
+    if args.verbose:
+        for path, size, reason in sorted(orphans):
+            print(f"    [{reason}] {path}")
+
+    # --- Collisions ---
+    hash_collisions = {name: texts for name, texts in audio_sources.items() if len(texts) > 1}
+    if hash_collisions:
+        print(f"\n[Warning] {len(hash_collisions)} audio files are shared by different texts (sha256[:8] collision):")
+        for name, texts in sorted(hash_collisions.items()):
+            print(f"  {name}: " + " | ".join(sorted(texts)))
+    name_clashes = {name: copies for name, copies in on_disk.items() if len(copies) > 1}
+    if name_clashes:
+        print(f"\n[Warning] {len(name_clashes)} filenames exist in more than one show folder "
+              f"(Anki media names are global, so decks combining them will show the wrong file; the "
+              f"manifest keeps them apart):")
+        for name, copies in sorted(name_clashes.items())[:20]:
+            print(f"  {name}: " + ", ".join(path for path, size in copies))
+
+    if not args.delete:
+        print("\nDry run. Re-run with --delete to remove the garbage files.")
+        sys.exit(0)
+
+    manifest = media_manifest.load_manifest()
+    removed_bytes = 0
+    for path, size, reason in orphans:
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"  Could not remove {path}: {e}")
+            continue
+        removed_bytes += size
+        entry = manifest.get(media_manifest.media_key(path))
+        if entry and entry['path'] == path:
+            del manifest[media_manifest.media_key(path)]
+    media_manifest.save_manifest(manifest)
+    print(f"\nRemoved {len(orphans)} files, reclaimed {format_bytes(removed_bytes)}.")
@@ -0,0 +1,140 @@
+import os
+import sys
+import json
+import re
+import hashlib
+
+import vocab_store
+
+# ==========================================
+# MEDIA MANIFEST
+# ==========================================
+# One JSON index of every screenshot and audio clip main.py has written:
+#   '<show folder>/<filename>' -> {'path', 'size', 'mtime', 'sha256', 'show', 'kind'}
+# main.py records files as it creates (or re-uses) them, so MEGADECK and the
+# packaging / GC tools can resolve media with a dict lookup instead of walking
+# MEDIA_DIR. Anki fields only reference the filename, and two shows can write
+# the same one, so entries are keyed by the show folder too: lookup() resolves
+# a (show, filename) pair through the show's folders (media_folders).
+#
+# 'show' is the show name. rebuild_manifest() only sees folder names, so it maps
+# them back through the shows it's given, keeping the folder name for unknown ones.
+
+MEDIA_DIR = 'react-anime/public/anki/media'
+MANIFEST_PATH = 'cache/media_manifest.json'
+MEDIA_EXTS = ('.jpg', '.jpeg', '.png', '.webp', '.mp3')
+
+
+def media_folders(show):
+    """Folders a show's media lives in under MEDIA_DIR: audio uses the name as is, screenshots an ASCII-only copy."""
+    screenshots = re.sub(r'[^\x00-\x7f]', '', show).strip() or "Show"
+    return [show] if screenshots == show else [show, screenshots]
+
+
+def media_key(path):
+    """Manifest key of a media file: '<show folder>/<filename>'."""
+    return f"{os.path.basename(os.path.dirname(path))}/{os.path.basename(path)}"
+
+
+def load_manifest(path=MANIFEST_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    # Manifests written before entries were keyed by folder used the bare filename
+    return {key if '/' in key else media_key(entry['path']): entry for key, entry in manifest.items()}
+
+
+def lookup(manifest, show, filename):
+    """Entry for `filename` as referenced by `show`'s notes, or None."""
+    for folder in media_folders(show):
+        entry = manifest.get(f"{folder}/{filename}")
+        if entry:
+            return entry
+    return None
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def media_kind(filename):
+    if '_word_' in filename and filename.endswith('.mp3'):
+        return 'word_audio'
+    if '_sent_' in filename and filename.endswith('.mp3'):
+        return 'sentence_audio'
+    return 'image' if not filename.endswith('.mp3') else 'audio'
+
+
+def media_filename(tag):
+    """Filename referenced by an Anki field: <img src="x.jpg"> or [sound:x.mp3]. None if there is none."""
+    if not tag:
+        return None
+    start = tag.find('src="')
+    if start != -1:
+        start += 5
+        end = tag.find('"', start)
+    else:
+        start = tag.find('[sound:')
+        if start == -1:
+            return None
+        start += 7
+        end = tag.find(']', start)
+    return tag[start:end] if end > start else None
+
+
+def record(manifest, path, show, kind=None):
+    """
+    Adds/refreshes the entry for `path`. The file is only re-hashed when its
+    size or mtime changed since it was last recorded.
+    """
+    st = os.stat(path)
+    key = media_key(path)
+    entry = manifest.get(key)
+    if entry and entry['path'] == path and entry['size'] == st.st_size and entry['mtime'] == st.st_mtime_ns \
+            and entry['show'] == show:
+        return entry
+    entry = {'path': path, 'size': st.st_size, 'mtime': st.st_mtime_ns, 'sha256': file_sha256(path),
+             'show': show, 'kind': kind or media_kind(os.path.basename(path))}
+    manifest[key] = entry
+    return entry
+
+
+def rebuild_manifest(media_dir=MEDIA_DIR, manifest=None, shows=()):
+    """
+    One-off scan to index media written before the manifest existed (or to repair it).
+    shows: show names, to record the files of their folders under the name main.py uses.
+    """
+    manifest = {} if manifest is None else manifest
+    for key in [key for key, entry in manifest.items() if not os.path.exists(entry['path'])]:
+        del manifest[key]
+    folder_shows = {folder: show for show in shows for folder in media_folders(show)}
+    for folder in sorted(os.listdir(media_dir)) if os.path.isdir(media_dir) else []:
+        show_dir = os.path.join(media_dir, folder)
+        if not os.path.isdir(show_dir):
+            continue
+        for entry in os.scandir(show_dir):
+            if entry.is_file() and entry.name.lower().endswith(MEDIA_EXTS) and entry.stat().st_size > 0:
+                record(manifest, entry.path, folder_shows.get(folder, folder))
+    return manifest
+
+
+if __name__ == "__main__":
+    # Usage: python media_manifest.py   (re-index MEDIA_DIR from scratch)
+    media_dir = sys.argv[1] if len(sys.argv) > 1 else MEDIA_DIR
+    print(f"Indexing media in {media_dir}...")
+    manifest = rebuild_manifest(media_dir, load_manifest(), vocab_store.list_shows())
+    save_manifest(manifest)
+    print(f"Manifest saved to {MANIFEST_PATH} ({len(manifest)} files).")
@@ -0,0 +1,97 @@
+import os
+import json
+import hashlib
+
+# ==========================================
+# STAGE ARTIFACTS
+# ==========================================
+# Every build stage in main.py stores its output in cache/stages/<show>/<stage>.json
+# together with two fingerprints:
+#   'input'  - hash of everything the stage read (upstream outputs + config)
+#   'output' - hash of what it produced, used as input by downstream stages
+# A stage only re-runs when its input fingerprint changes, so a stage that re-ran
+# but produced the same output doesn't invalidate anything after it.
+
+STAGE_DIR = 'cache/stages'
+
+# Artifacts already read or written by this process (path -> (mtime, artifact)),
+# so a build doesn't re-parse the JSON it just saved. Watch mode calls
+# clear_loaded() after each rebuild to keep memory bounded.
+_loaded_artifacts = {}
+
+
+class StageError(Exception):
+    pass
+
+
+def fingerprint(*parts):
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=sorted)
+    return hashlib.sha256(blob.encode('utf8')).hexdigest()
+
+
+def file_signature(path):
+    """Cheap change detection for source files: size + modification time."""
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def artifact_path(show, stage):
+    return os.path.join(STAGE_DIR, show, f"{stage}.json")
+
+
+def load_artifact(show, stage):
+    path = artifact_path(show, stage)
+    if not os.path.exists(path):
+        return None
+    mtime = os.stat(path).st_mtime_ns
+    if path in _loaded_artifacts and _loaded_artifacts[path][0] == mtime:
+        return _loaded_artifacts[path][1]
+    try:
+        with open(path, 'r', encoding='utf8') as f:
+            artifact = json.load(f)
+    except (OSError, ValueError):
+        return None
+    _loaded_artifacts[path] = (mtime, artifact)
+    return artifact
+
+
+def clear_loaded():
+    _loaded_artifacts.clear()
+
+
+def save_artifact(show, stage, input_fp, data):
+    path = artifact_path(show, stage)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    artifact = {'stage': stage, 'input': input_fp, 'output': fingerprint(data), 'data': data}
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf8') as f:
+        json.dump(artifact, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    _loaded_artifacts[path] = (os.stat(path).st_mtime_ns, artifact)
+    return artifact
+
+
+def run_stage(show, stage, input_fp, build, selected=True, force=False, outputs=()):
+    """
+    Returns the stage artifact, calling build(previous_data) only when needed.
+
+    selected: unselected stages (--only/--skip) reuse the artifact on disk as-is.
+    force:    re-run from scratch even if the input fingerprint is unchanged.
+    outputs:  files the stage writes; the stage re-runs if any of them is missing.
+    """
+    previous = load_artifact(show, stage)
+    if not selected:
+        if previous is None:
+            raise StageError(f"No '{stage}' artifact for {show} yet. Run that stage first.")
+        print(f"  [{stage}] skipped (using previous artifact)")
+        return previous
+
+    outputs_present = all(os.path.exists(p) for p in outputs)
+    if previous and previous['input'] == input_fp and outputs_present and not force:
+        print(f"  [{stage}] up to date")
+        return previous
+
+    print(f"  [{stage}] running...")
+    # A forced run starts from scratch instead of reusing parts of the previous output
+    data = build(previous['data'] if previous and not force else None)
+    return save_artifact(show, stage, input_fp, data)
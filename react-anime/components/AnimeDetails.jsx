@@ -1,30 +1,102 @@
-import React from 'react'
+import React, { useState, useEffect } from 'react'
+import { BarChart, StackedBarChart, PieChart } from './Charts'
+import VocabularyTable from './VocabularyTable'
 
 function AnimeDetails({ anime, onBack }) {
+  // Full stats from the catalog shard (the manifest entry only has the card fields)
+  const [stats, setStats] = useState(null)
+  // Chart series written by graphs.py; null while loading, false if there are none (fall back to the PNGs)
+  const [charts, setCharts] = useState(null)
+
+  useEffect(() => {
+    let cancelled = false
+    setStats(null)
+    fetch(`catalog/shows/${anime.id}.json`)
+      .then(res => (res.ok ? res.json() : null))
+      .catch(() => null)
+      .then(data => { if (!cancelled) setStats(data) })
+    return () => { cancelled = true }
+  }, [anime.id])
+
+  useEffect(() => {
+    let cancelled = false
+    setCharts(null)
+    fetch(`charts/${encodeURIComponent(anime.Anime)}.json`)
+      .then(res => (res.ok ? res.json() : false))
+      .catch(() => false)
+      .then(data => { if (!cancelled) setCharts(data) })
+    return () => { cancelled = true }
+  }, [anime.Anime])
+
   return (
-    <div className="anime-details">
-      <button onClick={onBack} className="back-btn">← Back to List</button>
-      
-      <div className="details-content">
-        <img src={`/assets/covers/${anime.Anime}.png`} alt={anime.Anime} />
-        
-        <div className="info">
+    <div className="anime-details-view">
+      <button className="back-btn" onClick={onBack}>
+        ← Back to Results
+      </button>
+
+      <div className="details-card">
+        <img
+          src={`assets/covers/${anime.Anime}.png`}
+          alt={anime.Anime}
+          onError={(e) => { e.target.src = 'assets/covers/default.png'; }}
+        />
+        <div className="details-info">
           <h1>{anime.Anime}</h1>
-          <p><strong>Length:</strong> {anime.Length_total_words}</p>
-          <p><strong>Description:</strong> {anime.synopsis || "No description available."}</p>
-          
-          {/* Download Button */}
-          <a 
-            href={`/downloads/${anime.Anime}.zip`} 
-            download 
-            className="download-btn"
+          {stats && (
+            <>
+              <p><strong>Length:</strong> {stats.Length_total_words.toLocaleString()}</p>
+              <p><strong>Unique Words:</strong> {stats.Unique_words_dictionary_size.toLocaleString()}</p>
+              <p><strong>No-List Words:</strong> {stats.Real_Life_Japanese.toLocaleString()}</p>
+              <p><strong>Unique Kanji:</strong> {stats.Unique_kanji}</p>
+              {stats['Words_for_90%_coverage'] !== undefined && (
+                <p>
+                  <strong>Words for 80/90/95% Coverage:</strong>{' '}
+                  {['80', '90', '95'].map(p => stats[`Words_for_${p}%_coverage`].toLocaleString()).join(' / ')}
+                  {stats['Words_for_90%_coverage_excl_1.5K'] !== undefined &&
+                    ` (${['80', '90', '95'].map(p => stats[`Words_for_${p}%_coverage_excl_1.5K`].toLocaleString())
+                      .join(' / ')} after the 1.5K core deck)`}
+                </p>
+              )}
+            </>
+          )}
+          <p><strong>Average Difficulty:</strong> {anime.Perceived_Difficulty_Weighted}</p>
+
+          <a
+            href={`anki/${anime.Anime}_Master.apkg`}
+            download
+            className="download-button"
           >
-            Download Assets
+            Download Anki Deck
           </a>
         </div>
       </div>
+
+      <div className="visuals-section">
+        <h3>Vocabulary Analysis</h3>
+        <div className="graph-container">
+          {charts ? (
+            <>
+              {charts.level_distribution && <BarChart series={charts.level_distribution} />}
+              {charts.core_coverage && <PieChart series={charts.core_coverage} />}
+              {charts.episode_new_vocab && <StackedBarChart series={charts.episode_new_vocab} />}
+            </>
+          ) : charts === false && (
+            <>
+              <img src={`graphs/${anime.Anime}_level_dist_bar.png`} alt="JLPT Levels" />
+              <img src={`graphs/${anime.Anime}_core_coverage_pie.png`} alt="Core Coverage" />
+            </>
+          )}
+        </div>
+
+        {anime.vocab && (
+          <>
+            <h3>Vocabulary</h3>
+            <VocabularyTable indexUrl={anime.vocab} />
+          </>
+        )}
+      </div>
     </div>
   )
 }
 
-export default AnimeDetails
\ No newline at end of file
+export default AnimeDetails
@@ -0,0 +1,131 @@
+import React from 'react'
+
+// Small SVG charts for the series graphs.py / megagraph.py export to public/charts/.
+const PALETTE = ['#ff4d6d', '#ff8fa3', '#c9184a', '#ffb3c1', '#590d22', '#a4133c', '#ffccd5', '#800f2f']
+
+function colorAt(colors, i) {
+  return (colors && colors[i]) || PALETTE[i % PALETTE.length]
+}
+
+export function BarChart({ series, width = 480, height = 260 }) {
+  const max = Math.max(1, ...series.values)
+  const slot = width / series.values.length
+  return (
+    <figure className="chart">
+      <figcaption>{series.title}</figcaption>
+      <svg viewBox={`0 0 ${width} ${height + 40}`} role="img" aria-label={series.title}>
+        {series.values.map((value, i) => {
+          const barHeight = (value / max) * height
+          return (
+            <g key={series.labels[i]}>
+              <rect x={i * slot + slot * 0.15} y={height - barHeight} width={slot * 0.7} height={barHeight}
+                    fill={colorAt(series.colors, i)}>
+                <title>{`${series.labels[i]}: ${value.toLocaleString()}`}</title>
+              </rect>
+              <text x={i * slot + slot / 2} y={height + 18} textAnchor="middle" fontSize="12">
+                {series.labels[i]}
+              </text>
+            </g>
+          )
+        })}
+      </svg>
+    </figure>
+  )
+}
+
+// Keeps at most `room` evenly spaced axis labels, so long episode lists stay readable
+function labelStep(count, room) {
+  return Math.max(1, Math.ceil(count / Math.max(1, room)))
+}
+
+// series.orientation 'barh' (matplotlib's name) draws one horizontal bar per index
+// entry, labelled on the left; otherwise bars are vertical with the index below.
+export function StackedBarChart({ series, width = 640, height = 280 }) {
+  const totals = series.values.map(row => row.reduce((sum, v) => sum + v, 0))
+  const max = Math.max(1, ...totals)
+  const horizontal = series.orientation === 'barh'
+  const gutter = horizontal ? 150 : 60  // room for the index labels
+  const plot = horizontal ? width - gutter : height
+  const slot = (horizontal ? height : width) / series.index.length
+  const step = labelStep(series.index.length, horizontal ? height / 14 : width / 16)
+  const bar = (i, offset, length) => horizontal
+    ? { x: gutter + offset, y: i * slot + slot * 0.1, width: length, height: slot * 0.8 }
+    : { x: i * slot + slot * 0.1, y: height - offset - length, width: slot * 0.8, height: length }
+  return (
+    <figure className="chart">
+      <figcaption>{series.title}</figcaption>
+      {/* Vertical: the rotated labels hang down-left of their bar, hence the extra room on the left */}
+      <svg viewBox={horizontal ? `0 0 ${width} ${height + 10}` : `${-gutter} 0 ${width + gutter} ${height + gutter}`}
+           role="img" aria-label={series.title}>
+        {series.values.map((row, i) => (
+          <g key={series.index[i]}>
+            {row.map((value, j) => {
+              const below = row.slice(0, j).reduce((sum, v) => sum + v, 0)
+              return (
+                <rect key={series.columns[j]} {...bar(i, (below / max) * plot, (value / max) * plot)}
+                      fill={colorAt(series.colors, j)}>
+                  <title>{`${series.index[i]} - ${series.columns[j]}: ${value.toLocaleString()}`}</title>
+                </rect>
+              )
+            })}
+            {i % step === 0 && (horizontal ? (
+              <text x={gutter - 6} y={i * slot + slot / 2} textAnchor="end" dominantBaseline="middle" fontSize="11">
+                {series.index[i]}
+              </text>
+            ) : (
+              <text x={i * slot + slot / 2} y={height + 8} textAnchor="end" fontSize="10"
+                    transform={`rotate(-45 ${i * slot + slot / 2} ${height + 8})`}>
+                {series.index[i]}
+              </text>
+            ))}
+          </g>
+        ))}
+        {horizontal
+          ? <line x1={gutter} y1={0} x2={gutter} y2={height} stroke="#999" />
+          : <line x1={0} y1={height} x2={width} y2={height} stroke="#999" />}
+      </svg>
+      {series.xlabel && <div className="chart-axis-label">{series.xlabel}</div>}
+      <Legend labels={series.columns} colors={series.colors} />
+    </figure>
+  )
+}
+
+export function PieChart({ series, size = 240 }) {
+  const total = series.values.reduce((sum, v) => sum + v, 0) || 1
+  const r = size / 2
+  // Slice i runs from angles[i] to angles[i + 1], starting at 12 o'clock
+  const angles = series.values.reduce(
+    (acc, value) => [...acc, acc[acc.length - 1] + (value / total) * 2 * Math.PI], [-Math.PI / 2])
+  return (
+    <figure className="chart">
+      <figcaption>{series.title}</figcaption>
+      <svg viewBox={`0 0 ${size} ${size}`} role="img" aria-label={series.title}>
+        {series.values.map((value, i) => {
+          const start = angles[i]
+          const angle = angles[i + 1]
+          const large = angle - start > Math.PI ? 1 : 0
+          const label = <title>{`${series.labels[i]}: ${((value / total) * 100).toFixed(1)}%`}</title>
+          if (value >= total) {
+            return <circle key={series.labels[i]} cx={r} cy={r} r={r} fill={colorAt(series.colors, i)}>{label}</circle>
+          }
+          const path = `M ${r} ${r} L ${r + r * Math.cos(start)} ${r + r * Math.sin(start)} ` +
+            `A ${r} ${r} 0 ${large} 1 ${r + r * Math.cos(angle)} ${r + r * Math.sin(angle)} Z`
+          return (
+            <path key={series.labels[i]} d={path} fill={colorAt(series.colors, i)} stroke="#FFF">{label}</path>
+          )
+        })}
+      </svg>
+      <Legend labels={series.labels} colors={series.colors} />
+    </figure>
+  )
+}
+
+function Legend({ labels, colors }) {
+  return (
+    <ul className="chart-legend">
+      {labels.map((label, i) => (
+        <li key={label}><span style={{ background: colorAt(colors, i) }} />{label}</li>
+      ))}
+    </ul>
+  )
+}
@@ -1,5 +1,6 @@
 import React from 'react'
 import AnimeCard from './AnimeCard'
+import MegaOverview from './MegaOverview'
 
 function MainContent(props) {
   return (
@@ -24,6 +25,7 @@ function MainContent(props) {
           />
         ))}
       </div>
+      <MegaOverview />
     </main>
   )
 }
@@ -0,0 +1,31 @@
+import React, { useState, useEffect } from 'react'
+import { BarChart, StackedBarChart, PieChart } from './Charts'
+
+// All-shows charts exported by megagraph.py to public/charts/mega.json
+function MegaOverview() {
+  const [charts, setCharts] = useState(null)
+
+  useEffect(() => {
+    let cancelled = false
+    fetch('charts/mega.json')
+      .then(res => (res.ok ? res.json() : null))
+      .catch(() => null)
+      .then(data => { if (!cancelled) setCharts(data) })
+    return () => { cancelled = true }
+  }, [])
+
+  if (!charts) return null
+  return (
+    <section className="visuals-section">
+      <h3>All Shows</h3>
+      <div className="graph-container">
+        {charts.mega_comparison && <StackedBarChart series={charts.mega_comparison} />}
+        {charts.mega_aggregate && <PieChart series={charts.mega_aggregate} />}
+        {charts.core_decks && <PieChart series={charts.core_decks} />}
+        {charts.mega_coverage && <BarChart series={charts.mega_coverage} />}
+      </div>
+    </section>
+  )
+}
+
+export default MegaOverview
@@ -0,0 +1,66 @@
+import React, { useState, useEffect } from 'react'
+
+// Pages written by vocab_shards.py; indexUrl is the show's 'vocab' entry in the
+// catalog manifest and page files sit next to it. Only index.json and the page on
+// screen are held in memory, whatever the size of the show.
+function VocabularyTable({ indexUrl }) {
+  const [index, setIndex] = useState(null)
+  const [pageNumber, setPageNumber] = useState(0)
+  const [rows, setRows] = useState(null)
+
+  useEffect(() => {
+    let cancelled = false
+    setIndex(null)
+    setPageNumber(0)
+    fetch(indexUrl)
+      .then(res => (res.ok ? res.json() : null))
+      .catch(() => null)
+      .then(data => { if (!cancelled) setIndex(data) })
+    return () => { cancelled = true }
+  }, [indexUrl])
+
+  useEffect(() => {
+    if (!index || index.pages.length === 0) return
+    let cancelled = false
+    setRows(null)
+    fetch(indexUrl.replace(/[^/]*$/, index.pages[pageNumber].file))
+      .then(res => res.json())
+      .catch(() => [])
+      .then(data => { if (!cancelled) setRows(data) })
+    return () => { cancelled = true }
+  }, [indexUrl, index, pageNumber])
+
+  if (!index) return null
+  const column = Object.fromEntries(index.fields.map((field, i) => [field, i]))
+  const first = pageNumber * index.page_size
+
+  return (
+    <div className="vocab-table">
+      <div className="vocab-pager">
+        <button disabled={pageNumber === 0} onClick={() => setPageNumber(pageNumber - 1)}>←</button>
+        <span>
+          {index.total === 0 ? 0 : first + 1}–{Math.min(first + index.page_size, index.total)} of {index.total.toLocaleString()}
+        </span>
+        <button disabled={pageNumber >= index.pages.length - 1} onClick={() => setPageNumber(pageNumber + 1)}>→</button>
+      </div>
+      <table>
+        <thead>
+          <tr><th>Word</th><th>Reading</th><th>Meaning</th><th>Level</th><th>Frequency</th></tr>
+        </thead>
+        <tbody>
+          {(rows || []).map(row => (
+            <tr key={row[column.Expression]}>
+              <td>{row[column.Expression]}</td>
+              <td>{row[column.Reading]}</td>
+              <td>{row[column.Meaning].map((sense, i) => <div key={i}>{sense}</div>)}</td>
+              <td>{row[column.Level]}</td>
+              <td>{row[column.Frequency].toLocaleString()}</td>
+            </tr>
+          ))}
+        </tbody>
+      </table>
+    </div>
+  )
+}
+
+export default VocabularyTable
@@ -3,35 +3,60 @@ import '../assets/scss/main.css'
 import Header from '../components/Header'
 import Sidebar from '../components/Sidebar'
 import MainContent from '../components/MainContent'
+import AnimeDetails from '../components/AnimeDetails'
 
 
-const modules = import.meta.glob('./stats/*.json', { eager: true });
-const allDataArray = Object.values(modules).map(m => m.default || m);
+// Written by catalog.py: card fields for every show plus a prefix search index over
+// the names; the full stats of a show are fetched by AnimeDetails when it's opened.
+const MANIFEST_URL = 'catalog/manifest.json'
+
+// Same normalisation and term split as catalog.search_terms()
+const normalize = (text) => text.normalize('NFKC').toLowerCase()
+const searchTerms = (text) => normalize(text).split(/[^\p{L}\p{N}]+/u).filter(Boolean)
+
+// A show matches when every query term starts one of its name terms (the prefix
+// index) or appears anywhere in its name ("uck" still finds "Lucky Star").
+function searchCatalog(manifest, query) {
+  if (!query.trim()) return manifest.shows
+  const terms = searchTerms(query)
+  if (terms.length === 0) return []
+  const names = manifest.shows.map(show => normalize(show.Anime))
+  let matches = null
+  for (const term of terms) {
+    const positions = new Set(manifest.search[term] || [])
+    names.forEach((name, i) => { if (name.includes(term)) positions.add(i) })
+    matches = matches === null ? positions : new Set([...matches].filter(i => positions.has(i)))
+  }
+  return [...matches].sort((a, b) => a - b).map(i => manifest.shows[i])
+}
 
 function App() {
-  const [animeList, setAnimeList] = useState(allDataArray); 
+  const [manifest, setManifest] = useState({ shows: [], search: {} })
+  const [animeList, setAnimeList] = useState([]);
   const [topAnime, setTopAnime] = useState([]);
-  const [search, setSearch] = useState(""); 
+  const [search, setSearch] = useState("");
   const [selectedAnime, setSelectedAnime] = useState(null);
 
   useEffect(() => {
-    const sortedTop = [...allDataArray]
-      .sort((a, b) => (b.Perceived_Difficulty_Weighted || 0) - (a.Perceived_Difficulty_Weighted || 0))
-      .slice(0, 5);
-    setTopAnime(sortedTop);
+    let cancelled = false
+    fetch(MANIFEST_URL)
+      .then(res => res.json())
+      .then(data => {
+        if (cancelled) return
+        setManifest(data)
+        setAnimeList(data.shows)
+        setTopAnime([...data.shows]
+          .sort((a, b) => (b.Perceived_Difficulty_Weighted || 0) - (a.Perceived_Difficulty_Weighted || 0))
+          .slice(0, 5))
+      })
+      .catch(err => console.error(`Failed to load ${MANIFEST_URL}`, err))
+    return () => { cancelled = true }
   }, []);
 
   const HandleSearch = (e) => {
     if (e) e.preventDefault();
-    setSelectedAnime(null); 
-    if (search.trim() === "") {
-      setAnimeList(allDataArray);
-    } else {
-      const filtered = allDataArray.filter((anime) =>
-        (anime.Anime || "").toLowerCase().includes(search.toLowerCase())
-      );
-      setAnimeList(filtered);
-    }
+    setSelectedAnime(null);
+    setAnimeList(searchCatalog(manifest, search));
   };
 
   return (
@@ -41,50 +66,14 @@ function App() {
         <Sidebar topAnime={topAnime} onAnimeClick={(anime) => setSelectedAnime(anime)} />
         <main>
           {selectedAnime ? (
-            <div className="anime-details-view">
-              <button className="back-btn" onClick={() => setSelectedAnime(null)}>
-                ← Back to Results
-              </button>
-              
-              <div className="details-card">
-                <img 
-                  src={`assets/covers/${selectedAnime.Anime}.png`} 
-                  alt={selectedAnime.Anime} 
-                  onError={(e) => { e.target.src = 'assets/covers/default.png'; }}
-                />
-                <div className="details-info">
-                  <h1>{selectedAnime.Anime}</h1>
-                  <p><strong>Length:</strong> {selectedAnime.Length_total_words.toLocaleString()}</p>
-                  <p><strong>Unique Words:</strong> {selectedAnime.Unique_words_dictionary_size.toLocaleString()}</p>
-                  <p><strong>No-List Words:</strong> {selectedAnime.Real_Life_Japanese.toLocaleString()}</p>
-                  <p><strong>Unique Kanji:</strong> {selectedAnime.Unique_kanji}</p>
-                  <p><strong>Average Difficulty:</strong> {selectedAnime.Perceived_Difficulty_Weighted}</p>
-                  
-                  <a 
-                    href={`anki/${selectedAnime.Anime}_Master.apkg`} 
-                    download 
-                    className="download-button"
-                  >
-                    Download Anki Deck
-                  </a>
-                </div>
-              </div>
-
-              <div className="visuals-section">
-                <h3>Vocabulary Analysis</h3>
-                <div className="graph-container">
-                    <img src={`graphs/${selectedAnime.Anime}_level_dist_bar.png`} alt="JLPT Levels" />
-                    <img src={`graphs/${selectedAnime.Anime}_core_coverage_pie.png`} alt="Core Coverage" />
-                </div>
-              </div>
-            </div>
+            <AnimeDetails anime={selectedAnime} onBack={() => setSelectedAnime(null)} />
           ) : (
-            <MainContent 
-              HandleSearch={HandleSearch} 
-              search={search} 
-              SetSearch={setSearch} 
+            <MainContent
+              HandleSearch={HandleSearch}
+              search={search}
+              SetSearch={setSearch}
               animeList={animeList}
-              onAnimeClick={(anime) => setSelectedAnime(anime)} 
+              onAnimeClick={(anime) => setSelectedAnime(anime)}
             />
           )}
         </main>
@@ -93,4 +82,4 @@ function App() {
   );
 }
 
-export default App;
\ No newline at end of file
+export default App;
@@ -0,0 +1,84 @@
+import heapq
+from array import array
+
+# ==========================================
+# i+1 SENTENCE SCHEDULER
+# ==========================================
+# Orders the sentence deck so each card introduces as few unknown words as
+# possible. Every target word keeps its top-K sentences (by sentence score,
+# earliest first on ties); an inverted index maps each target word to the
+# candidate sentences containing it. The scheduler then greedily emits the
+# (word, sentence) pair with the fewest other unknown words, marks the word
+# known, and pushes the now-cheaper pairs of every sentence containing it back
+# onto a priority queue. Stale queue entries are skipped when popped.
+#
+# Cost of a pair = unknown words in the sentence besides the target (0 = i+1).
+# Ties go to the shorter sentence, then to the more frequent word.
+#
+# With K=1 every word has a single candidate, so the scheduler can only reorder
+# the deck; DEFAULT_CANDIDATES leaves it room to pick i+1 sentences
+# (benchmarks/bench_sentence_scheduler.py: ~1% i+1 cards at K=1, ~53% at K=5).
+
+DEFAULT_CANDIDATES = 5
+
+
+def top_candidates(sentences, targets, candidates):
+    """{word index: [sentence id, ...]} best first; sentences are (tokens, score, length) tuples."""
+    heaps = {}
+    for sid, (tokens, score, length) in enumerate(sentences):
+        for token in set(tokens):
+            word = targets.get(token)
+            if word is None:
+                continue
+            heap = heaps.setdefault(word, [])
+            entry = (score, -sid)
+            if len(heap) < candidates:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+    return {word: [-neg_sid for score, neg_sid in sorted(heap, reverse=True)] for word, heap in heaps.items()}
+
+
+def schedule(sentences, words, known=(), candidates=DEFAULT_CANDIDATES):
+    """
+    sentences: [(tokens, score, length), ...] in corpus order, tokens being dictionary forms.
+    words:     the words to schedule, most frequent first. Words in `known` count as known from the start.
+    Returns [(word, sentence id), ...] in study order; a word with no sentence gets None, at the end.
+    """
+    targets = {word: i for i, word in enumerate(words) if word not in known}
+    known = set(known)
+    best = top_candidates(sentences, targets, max(1, candidates))
+
+    # Compact inverted index over the candidate sentences only
+    pairs = {}  # sentence id -> word indices it is a candidate for
+    for word, sids in best.items():
+        for sid in sids:
+            pairs.setdefault(sid, array('i')).append(word)
+    unknown = {}  # sentence id -> distinct unknown tokens
+    index = {}  # word index -> candidate sentence ids containing it
+    for sid in pairs:
+        tokens = set(sentences[sid][0])
+        unknown[sid] = sum(1 for token in tokens if token not in known)
+        for token in tokens:
+            word = targets.get(token)
+            if word is not None:
+                index.setdefault(word, array('i')).append(sid)
+
+    queue = [(unknown[sid] - 1, sentences[sid][2], word, sid) for word, sids in best.items() for sid in sids]
+    heapq.heapify(queue)
+    emitted = [False] * len(words)
+    order = []
+    while queue:
+        cost, length, word, sid = heapq.heappop(queue)
+        if emitted[word] or cost != unknown[sid] - 1:
+            continue
+        emitted[word] = True
+        order.append((words[word], sid))
+        for other_sid in index.get(word, ()):
+            unknown[other_sid] -= 1
+            for other in pairs[other_sid]:
+                if not emitted[other]:
+                    heapq.heappush(queue, (unknown[other_sid] - 1, sentences[other_sid][2], other, other_sid))
+
+    order.extend((words[word], None) for word in targets.values() if not emitted[word])
+    return order
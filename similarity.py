@@ -0,0 +1,142 @@
+import argparse
+import numpy as np
+
+import vocab_store
+import coverage
+
+# ==========================================
+# CROSS-SHOW SIMILARITY & WHAT TO WATCH NEXT
+# ==========================================
+# One sparse word x show matrix of Frequency, built from the vocab store catalog
+# and kept in coordinate form ({'word', 'show', 'frequency'} arrays, one entry
+# per non-zero cell, sorted by word), so no dense words x shows array is ever
+# allocated and only NumPy is needed. From it:
+#   - overlap: shared unique words between every pair of shows (B.T @ B on the
+#     0/1 pattern, summed over the show pairs within each word) and the Jaccard
+#     index derived from it
+#   - cosine similarity of the frequency columns
+#   - "next show" ranking: the best i+1 fit among the unwatched shows (see rank_next)
+#
+# Usage: python similarity.py --studied Naruto "K-ON!" [--core] [--top 5] [--new-words 200 1500]
+#        python similarity.py --similar Naruto
+
+# A good next show adds this many new unique words: fewer and there's little
+# to learn, more and too much of it is new at once
+NEW_WORDS_WINDOW = (200, 1500)
+
+
+def build_matrix(shows=None, csv_folder=vocab_store.CSV_FOLDER):
+    """(shows, words, matrix): matrix is {'word', 'show', 'frequency', 'shape'} with duplicates summed."""
+    shows, data = vocab_store.load_catalog(['expression', 'frequency'], shows, csv_folder)
+    words, word_ids = np.unique(np.char.strip(data['expression']), return_inverse=True)
+    cells, inverse = np.unique(word_ids.astype(np.int64) * len(shows) + data['show'], return_inverse=True)
+    frequency = np.bincount(inverse, weights=data['frequency'].astype(np.float64), minlength=len(cells))
+    keep = frequency > 0
+    matrix = {'word': (cells // max(len(shows), 1))[keep], 'show': (cells % max(len(shows), 1))[keep],
+              'frequency': frequency[keep], 'shape': (len(words), len(shows))}
+    return shows, words, matrix
+
+
+def nnz(matrix):
+    return len(matrix['frequency'])
+
+
+def entry_pairs(matrix):
+    """(a, b) entry indices of every ordered pair of entries sharing a word (a == b included)."""
+    starts = np.flatnonzero(np.r_[True, np.diff(matrix['word']) != 0])
+    counts = np.diff(np.r_[starts, nnz(matrix)])
+    per_entry = np.repeat(counts, counts)  # entries in each entry's word
+    a = np.repeat(np.arange(nnz(matrix)), per_entry)
+    # b runs over the word's entries: the word's start plus 0..count-1, for each a
+    offsets = np.arange(len(a)) - np.repeat(np.cumsum(per_entry) - per_entry, per_entry)
+    b = np.repeat(np.repeat(starts, counts), per_entry) + offsets
+    return a, b
+
+
+def show_pair_sums(matrix, weights=None):
+    """Show x show sums over the entry pairs of each word, i.e. B.T @ B for B with `weights` per pair."""
+    n_shows = matrix['shape'][1]
+    a, b = entry_pairs(matrix)
+    pair = matrix['show'][a].astype(np.int64) * n_shows + matrix['show'][b]
+    sums = np.bincount(pair, weights=None if weights is None else weights(a, b), minlength=n_shows * n_shows)
+    return sums.reshape(n_shows, n_shows)
+
+
+def overlap(matrix):
+    """(shared, jaccard) show x show arrays: shared unique words and |A & B| / |A | B|."""
+    shared = show_pair_sums(matrix).astype(np.int64)
+    sizes = np.diag(shared)
+    union = sizes[:, None] + sizes[None, :] - shared
+    return shared, shared / np.maximum(union, 1)
+
+
+def cosine(matrix):
+    """Show x show cosine similarity of the frequency columns."""
+    frequency = matrix['frequency']
+    norms = np.sqrt(np.bincount(matrix['show'], weights=frequency ** 2, minlength=matrix['shape'][1]))
+    scaled = frequency / np.maximum(norms, 1e-12)[matrix['show']]
+    return show_pair_sums(matrix, lambda a, b: scaled[a] * scaled[b])
+
+
+def known_words(shows, words, matrix, studied=(), core=False):
+    """Boolean mask over `words`: in any studied show, or (core=True) in the 1.5K core list."""
+    known = np.zeros(len(words), dtype=bool)
+    studied_ids = [shows.index(show) for show in studied]
+    if studied_ids:
+        known[matrix['word'][np.isin(matrix['show'], studied_ids)]] = True
+    if core:
+        known |= coverage.core_mask(words)
+    return known
+
+
+def rank_next(shows, matrix, known, exclude=(), window=NEW_WORDS_WINDOW):
+    """
+    [(show, known coverage, new words), ...] best i+1 fit first. Shows adding a
+    number of new unique words within `window` come first, by the share of their
+    dialogue already known (frequency-weighted); shows outside it (too little
+    new, or too much) follow, also by known share, ties to fewer new words.
+    """
+    n_shows = matrix['shape'][1]
+    in_known = known[matrix['word']]
+    totals = np.bincount(matrix['show'], weights=matrix['frequency'], minlength=n_shows)
+    known_freq = np.bincount(matrix['show'], weights=matrix['frequency'] * in_known, minlength=n_shows)
+    new_words = np.bincount(matrix['show'], weights=~in_known, minlength=n_shows).astype(np.int64)
+    share = known_freq / np.maximum(totals, 1)
+    fits = (new_words >= window[0]) & (new_words <= window[1])
+    candidates = [i for i, show in enumerate(shows) if show not in exclude]
+    candidates.sort(key=lambda i: (not fits[i], -share[i], new_words[i]))
+    return [(shows[i], float(share[i]), int(new_words[i])) for i in candidates]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show similarity and what to watch next.")
+    parser.add_argument('--studied', nargs='*', default=[], metavar='SHOW', help="Shows already studied.")
+    parser.add_argument('--core', action='store_true', help=f"Count the {coverage.EXCLUDED_TIER} core list as known.")
+    parser.add_argument('--similar', metavar='SHOW', help="List the shows most similar to SHOW instead.")
+    parser.add_argument('--top', type=int, default=5, help="Rows to print (default: 5).")
+    parser.add_argument('--new-words', type=int, nargs=2, default=list(NEW_WORDS_WINDOW), metavar=('MIN', 'MAX'),
+                        help="New unique words a good next show adds (default: %(default)s).")
+    args = parser.parse_args()
+
+    shows, words, matrix = build_matrix()
+    print(f"{len(shows)} shows, {len(words)} unique words, {nnz(matrix)} non-zero entries.")
+    for show in args.studied + ([args.similar] if args.similar else []):
+        if show not in shows:
+            parser.error(f"unknown show '{show}'")
+
+    if args.similar:
+        i = shows.index(args.similar)
+        shared, jaccard = overlap(matrix)
+        similarity = cosine(matrix)
+        order = [j for j in np.argsort(-similarity[i]) if j != i][:args.top]
+        print(f"\nMost similar to {args.similar}:")
+        for j in order:
+            print(f"  {shows[j]:<30} cosine {similarity[i, j]:.3f}  shared {shared[i, j]:>6}  jaccard {jaccard[i, j]:.3f}")
+    else:
+        known = known_words(shows, words, matrix, args.studied, args.core)
+        print(f"Known words: {int(known.sum())}")
+        print("\nWatch next:")
+        low, high = args.new_words
+        for show, share, new in rank_next(shows, matrix, known, args.studied, (low, high))[:args.top]:
+            fit = "" if low <= new <= high else "  (outside the new-word window)"
+            print(f"  {show:<30} {share * 100:5.1f}% of dialogue known, {new:>6} new words{fit}")
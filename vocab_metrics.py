@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+import core_tiers
+import vocab_store
+
+# ==========================================
+# PER-SHOW VOCABULARY METRICS
+# ==========================================
+# The numbers graphs.py writes to stats/<show>.json, computed straight from the
+# vocab store's NumPy columns: core-tier bucketing is a searchsorted against a
+# sorted word array, kanji stats read the UTF-32 code points of the fixed-width
+# expression array in place, and difficulty weights are boolean-mask assignments
+# from one table shared by every show. Tiers come from the shared core_tiers index.
+
+CORE_TIERS = core_tiers.TIERS  # lowest first, a word counts towards the first tier listing it
+NOT_IN_CORE = core_tiers.NOT_IN_CORE
+CORE_STAT_KEYS = ["In_Core_1.5K", "In_Core_2K", "In_Core_10K", "Real_Life_Japanese"]
+
+DIFFICULTY_WEIGHTS = {'Grammar': 5, 'N5': 10, 'N4': 20, 'N3': 40, 'N2': 70, 'N1': 100, 'Proper Noun': 15,
+                      'Unlabeled': 45}
+DEFAULT_WEIGHT = 45
+
+KANJI_FIRST, KANJI_LAST = 0x4E00, 0x9FAF
+
+# Store columns compute_show_stats / show_frame need
+STORE_COLUMNS = ['expression', 'reading', 'level', 'frequency', 'meaning_class',
+                 'episode_names', 'episode_ids', 'episode_offsets']
+
+
+def show_frame(data):
+    """DataFrame of one show's vocab store columns (see STORE_COLUMNS), for charting."""
+    return pd.DataFrame({
+        'Expression': data['expression'],
+        'Reading': data['reading'],
+        'Frequency': data['frequency'],
+        'Refined_Level': vocab_store.refined_levels(data),
+        'First_Ep': vocab_store.first_episodes(data),
+    }).replace('', np.nan)  # empty cells behave like pd.read_csv's NaNs
+
+
+def tier_indices(expressions, tier_lookup):
+    """Tier index per expression (NOT_IN_CORE if in none of the core lists).
+
+    tier_lookup is core_tiers.lookup_arrays(), loaded once per run.
+    """
+    words, tiers = tier_lookup
+    expressions = np.char.strip(expressions)
+    if not len(words):
+        return np.full(len(expressions), NOT_IN_CORE, dtype=np.int8)
+    idx = np.minimum(np.searchsorted(words, expressions), len(words) - 1)
+    return np.where(words[idx] == expressions, tiers[idx], NOT_IN_CORE)
+
+
+def kanji_counts(expressions):
+    """Occurrence count per distinct kanji over all expressions (a fixed-width unicode array)."""
+    codepoints = np.ascontiguousarray(expressions, dtype=str).view(np.uint32)
+    codepoints = codepoints[(codepoints >= KANJI_FIRST) & (codepoints <= KANJI_LAST)]
+    return np.unique(codepoints, return_counts=True)[1]
+
+
+def unique_pairs(first, second):
+    """Number of distinct (first, second) pairs where neither is empty."""
+    mask = (first != '') & (second != '')
+    if not mask.any():
+        return 0
+    width = max(first.dtype.itemsize, second.dtype.itemsize) // 4
+    pairs = np.hstack([first[mask].astype(f'U{width}').view(np.uint32).reshape(-1, width),
+                       second[mask].astype(f'U{width}').view(np.uint32).reshape(-1, width)])
+    return len(np.unique(pairs, axis=0))
+
+
+def difficulty_weights(data):
+    """DIFFICULTY_WEIGHTS per word, using the refined level (grammar / proper noun from Meaning)."""
+    weights = np.full(len(data['level']), DEFAULT_WEIGHT, dtype=np.float64)
+    for level, weight in DIFFICULTY_WEIGHTS.items():
+        weights[data['level'] == level] = weight
+    weights[(data['meaning_class'] & vocab_store.CLASS_PROPER_NOUN) != 0] = DIFFICULTY_WEIGHTS['Proper Noun']
+    weights[(data['meaning_class'] & vocab_store.CLASS_GRAMMAR) != 0] = DIFFICULTY_WEIGHTS['Grammar']
+    return weights
+
+
+def compute_show_stats(show, data, tier_lookup):
+    """The stats dict written to stats/<show>.json, from one show's store columns (see STORE_COLUMNS)."""
+    frequency = data['frequency']
+    total_words = int(frequency.sum())
+    unique_words = len(frequency)
+    used_once = int(np.count_nonzero(frequency == 1))
+    used_once_pct = (used_once / unique_words) * 100 if unique_words > 0 else 0
+
+    kanji = kanji_counts(data['expression'])
+    tier_counts = np.bincount(tier_indices(data['expression'], tier_lookup), minlength=NOT_IN_CORE + 1)
+    core_stats = dict(zip(CORE_STAT_KEYS, tier_counts.tolist()))
+
+    weights = difficulty_weights(data)
+    avg_diff_weighted = (weights * frequency).sum() / total_words if total_words > 0 else 0
+
+    return {
+        "Anime": show,
+        "Length_total_words": total_words,
+        "Unique_words_dictionary_size": unique_words,
+        "Unique_words_used_once": used_once,
+        "Unique_words_used_once_%": f"{used_once_pct:.1f}%",
+        "Unique_kanji": len(kanji),
+        "Unique_kanji_used_once": int(np.count_nonzero(kanji == 1)),
+        "Unique_kanji_readings": unique_pairs(data['expression'], data['reading']),
+        "Words_not_found_in_core_Lists": core_stats['Real_Life_Japanese'],
+        "Average_Difficulty_Unweighted": int(round(weights.mean())),
+        "Perceived_Difficulty_Weighted": int(round(avg_diff_weighted)),
+        "Peak_difficulty_90th_percentile": int(round(np.quantile(weights, 0.9))),
+        "In_Core_1.5K": core_stats["In_Core_1.5K"],
+        "In_Core_10K": core_stats["In_Core_10K"],
+        "In_Core_2K": core_stats["In_Core_2K"],
+        "Real_Life_Japanese": core_stats["Real_Life_Japanese"]
+    }
+
+
+def episode_stats(episodes):
+    """Per-episode summary for stats/<show>.json, from the <show>_Episodes.csv table indexed by Episode."""
+    if not len(episodes):
+        return {}
+    return {
+        "Episodes": len(episodes),
+        "Average_words_per_episode": int(round(episodes['Tokens'].mean())),
+        "Average_new_words_per_episode": int(round(episodes['New_Words'].mean())),
+        "Peak_new_words_episode": str(episodes['New_Words'].idxmax()),
+    }
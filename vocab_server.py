@@ -0,0 +1,306 @@
+import os
+import re
+import json
+import mmap
+import time
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import numpy as np
+
+import pipeline
+import vocab_store
+
+# ==========================================
+# LOCAL VOCABULARY QUERY SERVER
+# ==========================================
+# A small JSON API over every show's vocabulary CSV and translation cache,
+# standard library only (plus the NumPy the vocab store already uses):
+#
+#   GET /shows                      show list
+#   GET /word?q=喪女                 shows using the word, with frequency, reading,
+#                                   meaning, level and the deck's example sentence,
+#                                   plus other sentences containing it
+#   GET /search?q=大丈夫&limit=20     sentences containing a substring
+#
+# Two indexes are built once into INDEX_DIR as plain .npy files and opened
+# memory-mapped, so startup only reads the small arrays it needs:
+#   - word index: sorted unique expressions -> catalog rows (most frequent first)
+#   - sentence index: character bigram -> sentence ids; a substring query
+#     intersects the posting lists of its bigrams (rarest first) and verifies the
+#     survivors with `in`; single characters fall back to a scan of the text blob
+# The per-row details come from the vocab store catalog, loaded on the first
+# /word query. While serving, the sources are re-checked at most every
+# CHECK_INTERVAL seconds and the index is rebuilt (files replaced atomically, so
+# requests still reading the old mmaps are unaffected) when a CSV or
+# translation cache changed.
+#
+# Usage: python vocab_server.py [--port 8765]
+
+INDEX_DIR = 'cache/query_index'
+INDEX_VERSION = 1
+TRANSLATION_CACHE = 'cache/{show}_cache.json'
+WORD_COLUMNS = ['expression', 'reading', 'meaning', 'level', 'frequency', 'sentence', 'translation']
+CHECK_INTERVAL = 5.0  # seconds between source checks
+DEFAULT_PORT = 8765
+DEFAULT_LIMIT = 20
+EXAMPLE_LIMIT = 5
+
+_index = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def source_signatures(shows):
+    paths = [vocab_store.csv_path_for(show) for show in shows]
+    paths += [TRANSLATION_CACHE.format(show=show) for show in shows]
+    return {path: pipeline.file_signature(path) for path in paths if os.path.exists(path)}
+
+
+def collect_sentences(shows, data):
+    """(texts, translations, show ids): every CSV example sentence and translation-cache entry, once per show."""
+    sentences = {}  # (show id, text) -> translation
+    for show_id, sentence, translation in zip(data['show'].tolist(), data['sentence'], data['translation']):
+        text = re.sub(r'<[^>]+>', '', sentence).strip()
+        if text:
+            sentences.setdefault((show_id, text), translation)
+    for show_id, show in enumerate(shows):
+        path = TRANSLATION_CACHE.format(show=show)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf8') as f:
+                for text, translation in json.load(f).items():
+                    if text.strip():
+                        sentences.setdefault((show_id, text.strip()), translation)
+    keys = list(sentences)
+    return [text for show_id, text in keys], list(sentences.values()), \
+        np.array([show_id for show_id, text in keys], dtype=np.int32)
+
+
+def pack_utf8(values):
+    """One UTF-8 blob + byte offsets, so a memory-mapped row can be sliced without decoding the rest."""
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def bigram_postings(texts):
+    """(sorted unique bigram codes, sentence ids grouped by code, offsets), built with array ops."""
+    joined = '\n'.join(texts)
+    codepoints = np.frombuffer(joined.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+    sentence_ids = np.repeat(np.arange(len(texts), dtype=np.int64),
+                             [len(text) + 1 for text in texts])[:len(codepoints)]
+    codes = (codepoints[:-1] << 21) | codepoints[1:]
+    valid = (codepoints[:-1] != 10) & (codepoints[1:] != 10)  # bigrams crossing the '\n' separators
+    codes, sentence_ids = codes[valid], sentence_ids[:-1][valid]
+    order = np.lexsort((sentence_ids, codes))
+    codes, sentence_ids = codes[order], sentence_ids[order]
+    keep = np.ones(len(codes), dtype=bool)
+    keep[1:] = (codes[1:] != codes[:-1]) | (sentence_ids[1:] != sentence_ids[:-1])
+    codes, sentence_ids = codes[keep], sentence_ids[keep].astype(np.int32)
+    keys, starts = np.unique(codes, return_index=True)
+    return keys, sentence_ids, np.append(starts, len(codes)).astype(np.int64)
+
+
+def build_index(shows=None):
+    started = time.time()
+    shows, data = vocab_store.load_catalog(WORD_COLUMNS, shows)
+    expressions = np.char.strip(data['expression'])
+    order = np.lexsort((-data['frequency'], expressions))
+    words, starts = np.unique(expressions[order], return_index=True)
+    texts, translations, sentence_shows = collect_sentences(shows, data)
+    bigrams, postings, posting_offsets = bigram_postings(texts)
+    text_utf8, text_offsets = pack_utf8(texts)
+    translation_utf8, translation_offsets = pack_utf8(translations)
+
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    arrays = {
+        'words': words, 'word_rows': order.astype(np.int32), 'word_offsets': np.append(starts, len(order)),
+        'sentence_utf8': text_utf8, 'sentence_offsets': text_offsets,
+        'translation_utf8': translation_utf8, 'translation_offsets': translation_offsets,
+        'sentence_shows': sentence_shows,
+        'bigrams': bigrams, 'postings': postings, 'posting_offsets': posting_offsets,
+    }
+    # New files replace the old ones (new inodes), so open mmaps of the old index stay valid
+    for name, array in arrays.items():
+        tmp_path = os.path.join(INDEX_DIR, f"{name}.tmp.npy")
+        np.save(tmp_path, array)
+        os.replace(tmp_path, os.path.join(INDEX_DIR, f"{name}.npy"))
+    meta_path = os.path.join(INDEX_DIR, 'meta.json')
+    with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'version': INDEX_VERSION, 'shows': shows, 'sources': source_signatures(shows)}, f,
+                  ensure_ascii=False)
+    os.replace(meta_path + '.tmp', meta_path)
+    print(f"Query index: {len(words)} words, {len(texts)} sentences, {len(bigrams)} bigrams "
+          f"in {time.time() - started:.1f}s")
+
+
+def read_meta():
+    meta_path = os.path.join(INDEX_DIR, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_index():
+    """
+    The index arrays (memory-mapped). Every CHECK_INTERVAL seconds the sources
+    are compared with the ones the index was built from; a change rebuilds it.
+    """
+    global _index, _checked_at
+    if _index is not None and time.monotonic() - _checked_at < CHECK_INTERVAL:
+        return _index
+    with _lock:
+        if _index is not None and time.monotonic() - _checked_at < CHECK_INTERVAL:
+            return _index
+        meta = read_meta()
+        shows = vocab_store.list_shows()
+        if not meta or meta['version'] != INDEX_VERSION or meta['shows'] != shows \
+                or meta['sources'] != source_signatures(shows):
+            build_index(shows)
+            meta = read_meta()
+        if _index is None or _index['sources'] != meta['sources']:
+            index = {name[:-4]: np.load(os.path.join(INDEX_DIR, name), mmap_mode='r')
+                     for name in os.listdir(INDEX_DIR) if name.endswith('.npy') and not name.endswith('.tmp.npy')}
+            # The raw sentence blob, for single-character scans (mmap.find works on the file pages)
+            with open(os.path.join(INDEX_DIR, 'sentence_utf8.npy'), 'rb') as f:
+                index['sentence_mmap'] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            index['shows'], index['sources'] = meta['shows'], meta['sources']
+            _index = index
+        _checked_at = time.monotonic()
+        return _index
+
+
+def catalog(index=None):
+    """The vocab store rows the word index points into, loaded once per index."""
+    index = load_index() if index is None else index
+    if 'catalog' not in index:
+        index['catalog'] = vocab_store.load_catalog(WORD_COLUMNS, index['shows'])[1]
+    return index['catalog']
+
+
+def text_at(index, column, i):
+    offsets = index[f'{column}_offsets']
+    return bytes(index[f'{column}_utf8'][offsets[i]:offsets[i + 1]]).decode('utf-8')
+
+
+def bigram_code(a, b):
+    return (ord(a) << 21) | ord(b)
+
+
+def scan_sentences(index, query, limit):
+    """Single-character queries have no bigram: find() over the memory-mapped UTF-8 blob (self-synchronising,
+    so a byte match is a character match) and map the hits back to sentence ids."""
+    blob, needle = index['sentence_mmap'], query.encode('utf-8')
+    start = index['sentence_utf8'].offset  # past the .npy header
+    end = start + len(index['sentence_utf8'])
+    hits, at = [], blob.find(needle, start, end)
+    while at != -1:
+        hits.append(at - start)
+        at = blob.find(needle, at + 1, end)
+    ids = np.unique(np.searchsorted(index['sentence_offsets'], hits, side='right') - 1)
+    return len(ids), [int(i) for i in ids[:limit]]
+
+
+def find_sentences(query, limit=DEFAULT_LIMIT):
+    """(total matches, [sentence id, ...] up to limit) for sentences containing `query`."""
+    index = load_index()
+    if len(query) < 2:
+        return scan_sentences(index, query, limit)
+    keys = index['bigrams']
+    lists = []
+    for code in {bigram_code(a, b) for a, b in zip(query, query[1:])}:
+        i = int(np.searchsorted(keys, code))
+        if i == len(keys) or keys[i] != code:
+            return 0, []
+        lists.append(index['postings'][index['posting_offsets'][i]:index['posting_offsets'][i + 1]])
+    lists.sort(key=len)
+    candidates = lists[0]
+    for other in lists[1:]:
+        candidates = np.intersect1d(candidates, other, assume_unique=True)
+        if not len(candidates):
+            return 0, []
+    if len(query) == 2:
+        return len(candidates), [int(i) for i in candidates[:limit]]
+    matches = [int(i) for i in candidates if query in text_at(index, 'sentence', int(i))]
+    return len(matches), matches[:limit]
+
+
+def sentence_entry(index, i):
+    return {'show': index['shows'][int(index['sentence_shows'][i])], 'sentence': text_at(index, 'sentence', i),
+            'translation': text_at(index, 'translation', i)}
+
+
+def query_search(query, limit=DEFAULT_LIMIT):
+    index = load_index()
+    total, ids = find_sentences(query, limit)
+    return {'query': query, 'total': total, 'results': [sentence_entry(index, i) for i in ids]}
+
+
+def query_word(word, examples=EXAMPLE_LIMIT):
+    index = load_index()
+    words = index['words']
+    i = int(np.searchsorted(words, word))
+    shows = []
+    if i < len(words) and words[i] == word:
+        data = catalog(index)
+        for row in index['word_rows'][index['word_offsets'][i]:index['word_offsets'][i + 1]].tolist():
+            shows.append({'show': index['shows'][int(data['show'][row])], 'frequency': int(data['frequency'][row]),
+                          'reading': str(data['reading'][row]), 'meaning': data['meaning'][row],
+                          'level': str(data['level'][row]), 'sentence': data['sentence'][row],
+                          'translation': data['translation'][row]})
+    total, ids = find_sentences(word, examples)
+    return {'word': word, 'total_frequency': sum(entry['frequency'] for entry in shows), 'shows': shows,
+            'sentence_matches': total, 'examples': [sentence_entry(index, i) for i in ids]}
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        query = params.get('q', '').strip()
+        try:
+            limit = max(1, int(params.get('limit', DEFAULT_LIMIT)))
+        except ValueError:
+            return self.send_json(400, {'error': "limit must be an integer"})
+        if url.path == '/shows':
+            return self.send_json(200, {'shows': load_index()['shows']})
+        if url.path in ('/word', '/search') and not query:
+            return self.send_json(400, {'error': "missing ?q="})
+        if url.path == '/word':
+            return self.send_json(200, query_word(query, min(limit, EXAMPLE_LIMIT)))
+        if url.path == '/search':
+            return self.send_json(200, query_search(query, limit))
+        self.send_json(404, {'error': f"unknown endpoint {url.path}"})
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(port=DEFAULT_PORT, host='127.0.0.1'):
+    load_index()
+    return ThreadingHTTPServer((host, port), QueryHandler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local JSON query server for the vocabulary CSVs.")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--host', default='127.0.0.1')
+    args = parser.parse_args()
+    server = make_server(args.port, args.host)
+    print(f"Serving on http://{args.host}:{args.port}/ (try /word?q=喪女 or /search?q=大丈夫)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,141 @@
+import os
+import sys
+import csv
+import json
+import gzip
+import shutil
+
+import vocab_store
+import catalog
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# ==========================================
+# PAGINATED VOCABULARY SHARDS
+# ==========================================
+# The web app's view of a show's vocabulary, so the browser never has to
+# download and parse the whole CSV. Written by main.py's csv stage and again by
+# graphs.py (which the site build runs) for every CSV. Folders are named by the
+# show's catalog id, and the catalog manifest has each index's URL:
+#
+#   SHARD_DIR/<catalog id>/index.json        fields, page size, row count, encodings
+#                                            and one entry per page (file, rows,
+#                                            first/last expression, sizes)
+#   SHARD_DIR/<catalog id>/page-0000.json    PAGE_SIZE rows as arrays in `fields` order
+#                          page-0000.json.gz / .br   pre-compressed copies
+#
+# Rows are sorted most frequent first (ties by expression), so page 0 is what a
+# learner wants first. Meaning is a list of senses (the CSV joins them with
+# <br>). The .gz/.br siblings are for servers that serve pre-compressed files
+# (nginx gzip_static / brotli_static); .br needs the optional brotli package,
+# and without it stale .br copies are removed rather than left out of date.
+# Unchanged files aren't rewritten and pages beyond the current count are removed.
+#
+# Usage: python vocab_shards.py [show ...]   (rebuilds from the CSVs)
+
+SHARD_DIR = 'react-anime/public/vocab'
+SHARD_VERSION = 3
+PAGE_SIZE = 200
+SHARD_FIELDS = ['Expression', 'Reading', 'Meaning', 'Level', 'Frequency', 'Sentence', 'Translation', 'Episodes']
+PAGE_NAME = 'page-{:04d}.json'
+
+
+def show_dir(show, shows=()):
+    """Shard folder of `show`, named by its catalog id (catalog.show_ids, with `show` and `shows` included)."""
+    return os.path.join(SHARD_DIR, catalog.show_ids(set(shows) | {show})[show])
+
+
+def index_path_for(show, shows=()):
+    return os.path.join(show_dir(show, shows), 'index.json')
+
+
+def sorted_rows(records):
+    """records: dicts with (at least) SHARD_FIELDS; returns row arrays, most frequent first."""
+    rows = [[record[field] for field in SHARD_FIELDS] for record in records]
+    frequency, expression = SHARD_FIELDS.index('Frequency'), SHARD_FIELDS.index('Expression')
+    meaning = SHARD_FIELDS.index('Meaning')
+    for row in rows:
+        row[frequency] = int(row[frequency])
+        row[meaning] = [sense.strip() for sense in row[meaning].split('<br>') if sense.strip()]
+    rows.sort(key=lambda row: (-row[frequency], row[expression]))
+    return rows
+
+
+def write_if_changed(path, blob):
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if f.read() == blob:
+                return False
+    with open(path, 'wb') as f:
+        f.write(blob)
+    return True
+
+
+def encodings(blob):
+    """{suffix: compressed bytes} for the pre-compressed copies (gzip with a fixed mtime, so it's reproducible)."""
+    compressed = {'.gz': gzip.compress(blob, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressed['.br'] = brotli.compress(blob, quality=11)
+    return compressed
+
+
+def write_shards(show, records, shows=(), page_size=PAGE_SIZE):
+    """Writes the pages and index of `show`; returns the index path."""
+    folder = show_dir(show, shows)
+    os.makedirs(folder, exist_ok=True)
+    rows = sorted_rows(records)
+    expression = SHARD_FIELDS.index('Expression')
+
+    pages, names = [], set()
+    for number, start in enumerate(range(0, len(rows), page_size)):
+        page = rows[start:start + page_size]
+        name = PAGE_NAME.format(number)
+        blob = json.dumps(page, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        write_if_changed(os.path.join(folder, name), blob)
+        entry = {'file': name, 'rows': len(page), 'first': page[0][expression], 'last': page[-1][expression],
+                 'bytes': len(blob)}
+        names.add(name)
+        for suffix, compressed in encodings(blob).items():
+            write_if_changed(os.path.join(folder, name + suffix), compressed)
+            entry[suffix[1:]] = len(compressed)
+            names.add(name + suffix)
+        pages.append(entry)
+
+    index = {'version': SHARD_VERSION, 'show': show, 'fields': SHARD_FIELDS, 'sort': 'frequency',
+             'page_size': page_size, 'total': len(rows), 'encodings': ['gz'] + (['br'] if brotli else []),
+             'pages': pages}
+    index_path = os.path.join(folder, 'index.json')
+    write_if_changed(index_path, json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+    for name in os.listdir(folder):
+        if name.startswith('page-') and name not in names:
+            os.remove(os.path.join(folder, name))
+    return index_path
+
+
+def prune(shows):
+    """Removes the shard folders of shows no longer listed (or whose id changed)."""
+    keep = set(catalog.show_ids(shows).values())
+    for name in os.listdir(SHARD_DIR) if os.path.isdir(SHARD_DIR) else []:
+        if name not in keep and os.path.isdir(os.path.join(SHARD_DIR, name)):
+            shutil.rmtree(os.path.join(SHARD_DIR, name))
+
+
+def write_from_csv(show, csv_folder=vocab_store.CSV_FOLDER):
+    with open(vocab_store.csv_path_for(show, csv_folder), 'r', encoding='utf-8', newline='') as f:
+        records = list(csv.DictReader(f))
+    return write_shards(show, records, vocab_store.list_shows(csv_folder))
+
+
+if __name__ == "__main__":
+    if not sys.argv[1:]:
+        prune(vocab_store.list_shows())
+    for show in sys.argv[1:] or vocab_store.list_shows():
+        index_path = write_from_csv(show)
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        print(f"{show}: {index['total']} words, {len(index['pages'])} pages, "
+              f"{sum(page['bytes'] for page in index['pages']) / 1024:.0f} KB "
+              f"({sum(page['gz'] for page in index['pages']) / 1024:.0f} KB gzipped)")
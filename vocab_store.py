@@ -0,0 +1,227 @@
+import os
+import re
+import csv
+import hashlib
+import numpy as np
+
+# ==========================================
+# COLUMNAR VOCABULARY STORE
+# ==========================================
+# A typed, column-per-array copy of each show's *_Vocabulary_Full.csv, saved as
+# an uncompressed .npz in STORE_DIR. np.load reads .npz members lazily, so a
+# consumer that asks for three columns only pays for those three.
+#
+#   expression, reading, level, media_tier
+#                                         fixed-width unicode
+#   meaning, sentence, translation, image, word_audio, sentence_audio
+#                                         one UTF-8 blob + offsets per column,
+#                                         loaded as object arrays (fixed width
+#                                         would pad every row to the longest)
+#   frequency                             int32
+#   media_flags                           uint8   (MEDIA_* bits)
+#   meaning_class                         uint8   (CLASS_* bits, from Meaning)
+#   episode_names / episode_ids / episode_offsets
+#                                         ragged episode list per word
+#
+# main.py writes the store next to the CSV; for CSVs produced before that (or
+# edited by hand) it's rebuilt from the CSV on first load. It also writes a
+# per-episode table, <show>_Episodes.csv (EPISODE_FIELDS), in natural episode order.
+# Tokens/Unique_Words count every token; New_Words and the level columns count
+# only the CSV words an episode introduces (New_Words = sum of the levels).
+
+CSV_FOLDER = 'react-anime/public/csv'
+STORE_DIR = 'cache/vocab_store'
+STORE_VERSION = 2  # bump when the layout changes
+
+# CSV header -> store column, for the plain text columns
+TEXT_COLUMNS = {
+    'Expression': 'expression', 'Reading': 'reading', 'Meaning': 'meaning', 'Level': 'level',
+    'Sentence': 'sentence', 'Translation': 'translation', 'MediaTier': 'media_tier',
+    'Image': 'image', 'WordAudio': 'word_audio', 'SentenceAudio': 'sentence_audio',
+}
+
+# Long/variable text columns, stored packed (see pack_text)
+PACKED_COLUMNS = ('meaning', 'sentence', 'translation', 'image', 'word_audio', 'sentence_audio')
+
+EPISODE_LEVELS = ['N5', 'N4', 'N3', 'N2', 'N1', 'Grammar', 'Proper Noun', 'Unlabeled']
+EPISODE_FIELDS = ['Episode', 'Tokens', 'Unique_Words', 'New_Words'] + EPISODE_LEVELS
+
+MEDIA_IMAGE, MEDIA_WORD_AUDIO, MEDIA_SENTENCE_AUDIO = 1, 2, 4
+CLASS_GRAMMAR, CLASS_PROPER_NOUN = 1, 2
+GRAMMAR_MARKERS = ("Grammar", "auxiliary", "particle", "Copula")
+
+
+def csv_path_for(show, csv_folder=CSV_FOLDER):
+    return os.path.join(csv_folder, f"{show}_Vocabulary_Full.csv")
+
+
+def episodes_path_for(show, csv_folder=CSV_FOLDER):
+    return os.path.join(csv_folder, f"{show}_Episodes.csv")
+
+
+def episode_sort_key(name):
+    """Natural sort so that 'Ep 2' comes before 'Ep 10'."""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', name)]
+
+
+def store_path_for(show, csv_folder=CSV_FOLDER):
+    """Stores of CSVs outside CSV_FOLDER live in a subfolder keyed by their folder, so they never mix."""
+    folder = os.path.normcase(os.path.abspath(csv_folder))
+    if folder == os.path.normcase(os.path.abspath(CSV_FOLDER)):
+        return os.path.join(STORE_DIR, f"{show}.npz")
+    return os.path.join(STORE_DIR, hashlib.sha1(folder.encode('utf-8')).hexdigest()[:12], f"{show}.npz")
+
+
+def list_shows(csv_folder=CSV_FOLDER):
+    if not os.path.isdir(csv_folder):
+        return []
+    return sorted(name[:-len("_Vocabulary_Full.csv")] for name in os.listdir(csv_folder)
+                  if name.endswith("_Vocabulary_Full.csv"))
+
+
+def meaning_class(meaning):
+    flags = 0
+    if any(marker in meaning for marker in GRAMMAR_MARKERS):
+        flags |= CLASS_GRAMMAR
+    if "[Proper Noun]" in meaning:
+        flags |= CLASS_PROPER_NOUN
+    return flags
+
+
+def pack_text(values):
+    joined = ''.join(values)
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in values], out=offsets[1:])
+    return np.frombuffer(joined.encode('utf-8'), dtype=np.uint8), offsets
+
+
+def unpack_text(blob, offsets):
+    # Offsets are in characters, so slice the decoded string
+    joined = blob.tobytes().decode('utf-8')
+    values = np.empty(len(offsets) - 1, dtype=object)
+    values[:] = [joined[start:end] for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+    return values
+
+
+def build_from_csv(show, csv_folder=CSV_FOLDER):
+    """Reads the show's CSV once and writes its .npz store. Returns the store path."""
+    csv_path = csv_path_for(show, csv_folder)
+    text = {column: [] for column in TEXT_COLUMNS.values()}
+    frequency, media_flags, classes = [], [], []
+    episode_names, episode_index, episode_ids, episode_offsets = [], {}, [], [0]
+
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            for header, column in TEXT_COLUMNS.items():
+                text[column].append(row.get(header) or '')
+            frequency.append(int(row.get('Frequency') or 0))
+            media_flags.append((MEDIA_IMAGE if '<img' in (row.get('Image') or '') else 0)
+                               | (MEDIA_WORD_AUDIO if '[sound:' in (row.get('WordAudio') or '') else 0)
+                               | (MEDIA_SENTENCE_AUDIO if '[sound:' in (row.get('SentenceAudio') or '') else 0))
+            classes.append(meaning_class(row.get('Meaning') or ''))
+            for episode in filter(None, (e.strip() for e in (row.get('Episodes') or '').split(','))):
+                if episode not in episode_index:
+                    episode_index[episode] = len(episode_names)
+                    episode_names.append(episode)
+                episode_ids.append(episode_index[episode])
+            episode_offsets.append(len(episode_ids))
+
+    st = os.stat(csv_path)
+    arrays = {}
+    for column, values in text.items():
+        if column in PACKED_COLUMNS:
+            arrays[f'{column}_utf8'], arrays[f'{column}_offsets'] = pack_text(values)
+        else:
+            arrays[column] = np.array(values, dtype=str)
+    arrays.update(
+        frequency=np.array(frequency, dtype=np.int32),
+        media_flags=np.array(media_flags, dtype=np.uint8),
+        meaning_class=np.array(classes, dtype=np.uint8),
+        episode_names=np.array(episode_names, dtype=str),
+        episode_ids=np.array(episode_ids, dtype=np.int32),
+        episode_offsets=np.array(episode_offsets, dtype=np.int32),
+        source=np.array([STORE_VERSION, st.st_size, st.st_mtime_ns], dtype=np.int64),
+    )
+    path = store_path_for(show, csv_folder)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+    return path
+
+
+def is_current(show, csv_folder=CSV_FOLDER):
+    path = store_path_for(show, csv_folder)
+    if not os.path.exists(path):
+        return False
+    st = os.stat(csv_path_for(show, csv_folder))
+    with np.load(path) as store:
+        return store['source'].tolist() == [STORE_VERSION, st.st_size, st.st_mtime_ns]
+
+
+def load_show(show, columns, csv_folder=CSV_FOLDER):
+    """{column: array} for one show, (re)building the store if the CSV is newer."""
+    if not is_current(show, csv_folder):
+        print(f"  Building vocab store for {show}...")
+        build_from_csv(show, csv_folder)
+    with np.load(store_path_for(show, csv_folder)) as store:
+        return {column: unpack_text(store[f'{column}_utf8'], store[f'{column}_offsets'])
+                if column in PACKED_COLUMNS else store[column] for column in columns}
+
+
+def load_catalog(columns, shows=None, csv_folder=CSV_FOLDER):
+    """
+    Every show's rows concatenated: {column: array} plus 'show' (index into the
+    returned show list). Episode columns are per-show and can't be requested here.
+    """
+    shows = list_shows(csv_folder) if shows is None else shows
+    parts = [load_show(show, columns, csv_folder) for show in shows]
+    catalog = {column: np.concatenate([part[column] for part in parts]) if parts else np.array([])
+               for column in columns}
+    catalog['show'] = np.repeat(np.arange(len(shows), dtype=np.int16),
+                                [len(part[columns[0]]) for part in parts]) if parts else np.array([], np.int16)
+    return shows, catalog
+
+
+def first_episodes(data):
+    """First episode (in natural order) each word appears in ('' if none), from the ragged episode columns."""
+    names, offsets = data['episode_names'], data['episode_offsets']
+    has_episode = np.diff(offsets) > 0
+    first = np.full(len(has_episode), '', dtype=names.dtype)
+    if has_episode.any():
+        natural = np.array(sorted(range(len(names)), key=lambda i: episode_sort_key(names[i])), dtype=np.int32)
+        rank = np.empty_like(natural)
+        rank[natural] = np.arange(len(natural), dtype=np.int32)
+        # Empty rows are skipped, so each start's segment runs to the next non-empty row's start
+        first_rank = np.minimum.reduceat(rank[data['episode_ids']], offsets[:-1][has_episode])
+        first[has_episode] = names[natural[first_rank]]
+    return first
+
+
+def episode_lists(data):
+    """Episode names per word as Python lists."""
+    names, ids, offsets = data['episode_names'], data['episode_ids'], data['episode_offsets']
+    return [names[ids[start:end]].tolist() for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def refined_levels(data, proper_noun='Proper Noun', unlabeled=None):
+    """
+    Level with the Meaning-based categories applied, as graphs.py / megagraph.py
+    chart them: grammar words become 'Grammar', proper nouns `proper_noun`
+    (None keeps the level), empty/Unlabeled levels `unlabeled` (None keeps it).
+    Needs the 'level' and 'meaning_class' columns.
+    """
+    levels = data['level'].astype(object)
+    classes = data['meaning_class']
+    if unlabeled is not None:
+        levels[(data['level'] == '') | (data['level'] == 'Unlabeled')] = unlabeled
+    if proper_noun is not None:
+        levels[(classes & CLASS_PROPER_NOUN) != 0] = proper_noun
+    levels[(classes & CLASS_GRAMMAR) != 0] = 'Grammar'
+    return levels
+
+
+if __name__ == "__main__":
+    # Usage: python vocab_store.py   (rebuild the store for every CSV)
+    for show in list_shows():
+        print(f"{show}: {build_from_csv(show)}")